@@ -99,7 +99,7 @@ class ConfigProvider:
 
         return {
             'export_dir': export_dir,
-            'formats': ['json', 'csv', 'xlsx']
+            'formats': ['json', 'jsonl', 'csv', 'xlsx', 'parquet']
         }
 
     def get_templates_dir(self):
@@ -1,5 +1,21 @@
 """Module de gestion des données"""
-from .database import Database
-from .exporter import DataExporter
+import importlib
 
-__all__ = ['Database', 'DataExporter']
\ No newline at end of file
+# Classes exposées par le paquet, importées au premier accès : importer un sous-module
+# (ex: core.data.parser) ne charge ni la base de données ni les exports
+_EXPORTS = {
+    'Database': '.database',
+    'ConnectionManager': '.connection',
+    'DataExporter': '.exporter',
+}
+
+__all__ = ['Database', 'ConnectionManager', 'DataExporter']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,180 @@
+import json
+import math
+
+# Histogramme logarithmique des latences : 4 classes par doublement (~9 % d'erreur relative)
+SKETCH_BASE_MS = 10.0
+SKETCH_GROWTH = 2 ** 0.25
+SKETCH_MAX_BIN = 80
+
+ROLLUP_TABLES = {
+    'hour': 'rollup_hourly',
+    'day': 'rollup_daily'
+}
+
+# Longueur du préfixe d'horodatage ISO identifiant la période
+BUCKET_LENGTHS = {
+    'hour': 13,  # AAAA-MM-JJTHH
+    'day': 10  # AAAA-MM-JJ
+}
+
+
+class LatencySketch:
+    """
+    Résumé de distribution des latences, fusionnable par simple addition
+
+    Les latences sont comptées par classes de largeur géométrique ; un percentile est
+    estimé au centre géométrique de la classe qui le contient.
+    """
+
+    __slots__ = ('bins',)
+
+    def __init__(self, bins=None):
+        self.bins = bins or {}
+
+    @staticmethod
+    def bin_for(duration_ms):
+        """Classe d'une latence (ms)"""
+        if duration_ms <= SKETCH_BASE_MS:
+            return 0
+        index = int(math.log(duration_ms / SKETCH_BASE_MS, SKETCH_GROWTH)) + 1
+        return min(index, SKETCH_MAX_BIN)
+
+    @staticmethod
+    def bin_value(index):
+        """Valeur représentative d'une classe (ms)"""
+        if index == 0:
+            return SKETCH_BASE_MS
+        return SKETCH_BASE_MS * SKETCH_GROWTH ** (index - 0.5)
+
+    def add(self, duration_ms, count=1):
+        """Ajoute une observation"""
+        index = self.bin_for(duration_ms)
+        self.bins[index] = self.bins.get(index, 0) + count
+
+    def merge(self, other):
+        """Ajoute les observations d'un autre résumé"""
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    @property
+    def count(self):
+        return sum(self.bins.values())
+
+    def percentile(self, p):
+        """
+        Estime un percentile
+
+        Args:
+            p (float): Percentile entre 0 et 1
+
+        Returns:
+            float: Latence estimée en ms (None sans observation)
+        """
+        total = self.count
+        if total == 0:
+            return None
+
+        rank = max(1, math.ceil(p * total))
+        seen = 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen >= rank:
+                return self.bin_value(index)
+        return self.bin_value(max(self.bins))
+
+    def to_json(self):
+        """Sérialise le résumé (classes non vides uniquement)"""
+        return json.dumps({str(k): v for k, v in sorted(self.bins.items())}, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data):
+        """Reconstruit un résumé sérialisé"""
+        if not data:
+            return cls()
+        return cls({int(k): v for k, v in json.loads(data).items()})
+
+
+class _SketchMerge:
+    """Agrégat SQL sketch_merge(latency_sketch) : fusionne les résumés d'un groupe"""
+
+    def __init__(self):
+        self.sketch = LatencySketch()
+
+    def step(self, data):
+        if data:
+            self.sketch.merge(LatencySketch.from_json(data))
+
+    def finalize(self):
+        return self.sketch.to_json()
+
+
+def register_analytics_functions(conn):
+    """
+    Déclare l'agrégat SQL sketch_merge sur une connexion
+
+    Args:
+        conn (sqlite3.Connection): Connexion à configurer
+    """
+    conn.create_aggregate('sketch_merge', 1, _SketchMerge)
+
+
+def bucket_for(timestamp, granularity):
+    """
+    Période de cumul d'un horodatage ISO
+
+    Args:
+        timestamp (str): Horodatage ISO
+        granularity (str): 'hour' ou 'day'
+
+    Returns:
+        str: Identifiant de période (préfixe de l'horodatage)
+    """
+    return timestamp[:BUCKET_LENGTHS[granularity]]
+
+
+def update_rollups(conn, timestamp, platform, operation_type, success, token_count=0, duration_ms=None):
+    """
+    Comptabilise une requête terminée dans les cumuls horaires et journaliers
+
+    Args:
+        conn (sqlite3.Connection): Connexion en cours de transaction
+        timestamp (str): Horodatage ISO de la réponse
+        platform (str): Plateforme d'IA
+        operation_type (str): Type d'opération
+        success (bool): Succès de la requête
+        token_count (int): Tokens du prompt
+        duration_ms (int, optional): Durée de la requête
+    """
+    platform = platform or 'unknown'
+    operation_type = operation_type or 'unknown'
+    has_duration = duration_ms is not None
+
+    for granularity, table in ROLLUP_TABLES.items():
+        bucket = bucket_for(timestamp, granularity)
+        key = (bucket, platform, operation_type)
+
+        conn.execute(f'''
+                     INSERT INTO {table} (bucket, platform, operation_type, request_count, success_count,
+                                          token_count, duration_count, duration_sum_ms, duration_max_ms)
+                     VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                     ON CONFLICT (bucket, platform, operation_type) DO UPDATE SET
+                         request_count   = request_count + 1,
+                         success_count   = success_count + excluded.success_count,
+                         token_count     = token_count + excluded.token_count,
+                         duration_count  = duration_count + excluded.duration_count,
+                         duration_sum_ms = duration_sum_ms + excluded.duration_sum_ms,
+                         duration_max_ms = MAX(duration_max_ms, excluded.duration_max_ms)
+                     ''', key + (int(bool(success)), token_count or 0, int(has_duration),
+                                 duration_ms or 0, duration_ms or 0))
+
+        if has_duration:
+            row = conn.execute(f'''
+                               SELECT latency_sketch FROM {table}
+                               WHERE bucket = ? AND platform = ? AND operation_type = ?
+                               ''', key).fetchone()
+            sketch = LatencySketch.from_json(row[0] if row else None)
+            sketch.add(duration_ms)
+            conn.execute(f'''
+                         UPDATE {table} SET latency_sketch = ?
+                         WHERE bucket = ? AND platform = ? AND operation_type = ?
+                         ''', (sketch.to_json(),) + key)
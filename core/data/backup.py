@@ -0,0 +1,313 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from utils.logger import logger
+from utils.exceptions import DatabaseError
+
+
+class _BackupRestarted(Exception):
+    """La source a trop souvent changé pendant une sauvegarde incrémentale"""
+
+
+class BackupService:
+    """
+    Sauvegardes à chaud de la base SQLite via l'API de backup
+
+    Les pages sont copiées par petits lots entre lesquels la base reste disponible ; en
+    mode WAL, la lecture de la sauvegarde ne bloque pas les écrivains. Les sauvegardes
+    sont éventuellement compressées (gzip), tournées selon une rétention et vérifiées
+    (integrity_check) avant toute restauration.
+    """
+
+    def __init__(self, db_path, backup_dir=None, keep=7, compress=True, pages_per_step=256,
+                 step_sleep=0.005, max_restarts=5):
+        """
+        Initialise le service
+
+        Args:
+            db_path (str): Chemin de la base à sauvegarder
+            backup_dir (str, optional): Répertoire des sauvegardes (data/backups par défaut)
+            keep (int): Nombre de sauvegardes conservées
+            compress (bool): Compresser les sauvegardes avec gzip
+            pages_per_step (int): Pages copiées par étape
+            step_sleep (float): Pause entre deux étapes (secondes)
+            max_restarts (int): Redémarrages tolérés (source modifiée) avant une copie en une étape
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), "backups")
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0] + "_"
+        self._thread = None
+        self._lock = threading.Lock()
+        self.last_result = None
+
+    def backup_to(self, target_path, progress=None):
+        """
+        Copie la base vers un fichier SQLite (non compressé) page par page
+
+        Args:
+            target_path (str): Fichier de destination
+            progress (callable, optional): Appelée avec la fraction copiée (0-1)
+
+        Returns:
+            str: Chemin de la sauvegarde
+        """
+        partial = target_path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+
+        state = {'restarts': 0, 'remaining': None}
+
+        def on_progress(status, remaining, total):
+            # Une hausse du nombre de pages restantes signale un redémarrage de la copie
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > self.max_restarts:
+                    raise _BackupRestarted()
+            state['remaining'] = remaining
+            if progress and total:
+                progress((total - remaining) / total)
+
+        source = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            target = sqlite3.connect(partial)
+            try:
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=on_progress, sleep=self.step_sleep)
+                except _BackupRestarted:
+                    # Base trop active : copie en une étape (lecture WAL, les écrivains ne sont pas bloqués)
+                    logger.warning("Sauvegarde incrémentale redémarrée trop souvent, copie en une étape")
+                    source.backup(target, pages=-1)
+                    if progress:
+                        progress(1.0)
+            finally:
+                target.close()
+        except Exception as e:
+            if os.path.exists(partial):
+                os.remove(partial)
+            logger.error(f"Erreur lors de la sauvegarde de {self.db_path}: {str(e)}")
+            raise DatabaseError(f"Échec de la sauvegarde: {str(e)}")
+        finally:
+            source.close()
+
+        os.replace(partial, target_path)
+        return target_path
+
+    def create_backup(self, progress=None):
+        """
+        Crée une sauvegarde horodatée puis applique la rétention
+
+        Args:
+            progress (callable, optional): Appelée avec la fraction copiée (0-1)
+
+        Returns:
+            str: Chemin de la sauvegarde
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+        started = time.time()
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.backup_dir, f"{self.prefix}{stamp}.db")
+        self.backup_to(path, progress)
+
+        if self.compress:
+            with open(path, 'rb') as src, gzip.open(path + ".gz", 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(path)
+            path += ".gz"
+
+        logger.info(f"Sauvegarde créée: {path} ({os.path.getsize(path)} octets, "
+                    f"{time.time() - started:.1f}s)")
+
+        self.rotate()
+        return path
+
+    def start_backup(self, progress=None, on_done=None):
+        """
+        Lance une sauvegarde en arrière-plan
+
+        Args:
+            progress (callable, optional): Appelée avec la fraction copiée (0-1)
+            on_done (callable, optional): Appelée avec (chemin, erreur) à la fin
+
+        Returns:
+            bool: False si une sauvegarde est déjà en cours
+        """
+        with self._lock:
+            if self.is_running():
+                return False
+
+            def run():
+                path, error = None, None
+                try:
+                    path = self.create_backup(progress)
+                except Exception as e:
+                    error = e
+                self.last_result = {'path': path, 'error': str(error) if error else None,
+                                    'finished_at': datetime.now().isoformat()}
+                if on_done:
+                    on_done(path, error)
+
+            self._thread = threading.Thread(target=run, name="DatabaseBackup", daemon=True)
+            self._thread.start()
+            return True
+
+    def is_running(self):
+        """Indique si une sauvegarde est en cours"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Attend la fin de la sauvegarde en cours"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def list_backups(self):
+        """
+        Liste les sauvegardes, de la plus récente à la plus ancienne
+
+        Returns:
+            list: Dictionnaires (path, size, created_at, compressed)
+        """
+        if not os.path.isdir(self.backup_dir):
+            return []
+
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            if not name.startswith(self.prefix) or not (name.endswith(".db") or name.endswith(".db.gz")):
+                continue
+            path = os.path.join(self.backup_dir, name)
+            stat = os.stat(path)
+            backups.append({
+                'path': path,
+                'size': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                'compressed': name.endswith(".gz")
+            })
+
+        # Le nom horodaté trie chronologiquement
+        backups.sort(key=lambda b: os.path.basename(b['path']), reverse=True)
+        return backups
+
+    def rotate(self):
+        """
+        Supprime les sauvegardes au-delà de la rétention
+
+        Returns:
+            int: Nombre de sauvegardes supprimées
+        """
+        removed = 0
+        for backup in self.list_backups()[self.keep:]:
+            try:
+                os.remove(backup['path'])
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Impossible de supprimer la sauvegarde {backup['path']}: {str(e)}")
+
+        if removed:
+            logger.info(f"Rotation des sauvegardes: {removed} supprimée(s)")
+        return removed
+
+    def _open_backup(self, path):
+        """
+        Rend une sauvegarde lisible par SQLite (décompression dans un fichier temporaire)
+
+        Returns:
+            tuple: (chemin SQLite, fichier temporaire à supprimer ou None)
+        """
+        if not path.endswith(".gz"):
+            return path, None
+
+        fd, temp_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+        with os.fdopen(fd, 'wb') as dst, gzip.open(path, 'rb') as src:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        return temp_path, temp_path
+
+    def verify_backup(self, path):
+        """
+        Vérifie l'intégrité d'une sauvegarde
+
+        Args:
+            path (str): Chemin de la sauvegarde
+
+        Returns:
+            tuple: (valide, message)
+        """
+        temp_path = None
+        try:
+            sqlite_path, temp_path = self._open_backup(path)
+            conn = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                if result != 'ok':
+                    return False, f"integrity_check: {result}"
+
+                tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                if 'schema_migrations' not in tables:
+                    return False, "Table schema_migrations absente"
+            finally:
+                conn.close()
+
+            return True, "ok"
+
+        except Exception as e:
+            return False, str(e)
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def restore(self, path, target_path=None):
+        """
+        Restaure une sauvegarde après vérification
+
+        La restauration passe par l'API de backup : les autres connexions à la base cible
+        doivent être fermées (Database.close) pour éviter qu'elles ne la modifient pendant la copie.
+
+        Args:
+            path (str): Sauvegarde à restaurer
+            target_path (str, optional): Base cible (base sauvegardée par défaut)
+
+        Returns:
+            bool: True si la restauration est réussie
+        """
+        is_valid, message = self.verify_backup(path)
+        if not is_valid:
+            logger.error(f"Sauvegarde invalide, restauration annulée: {path} ({message})")
+            raise DatabaseError(f"Sauvegarde invalide: {message}")
+
+        target_path = target_path or self.db_path
+        temp_path = None
+        try:
+            sqlite_path, temp_path = self._open_backup(path)
+            source = sqlite3.connect(sqlite_path)
+            target = sqlite3.connect(target_path, timeout=30)
+            try:
+                source.backup(target)
+                result = target.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+
+            if result != 'ok':
+                raise DatabaseError(f"Base restaurée incohérente: {result}")
+
+            logger.info(f"Sauvegarde restaurée: {path} -> {target_path}")
+            return True
+
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la restauration de {path}: {str(e)}")
+            raise DatabaseError(f"Échec de la restauration: {str(e)}")
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,108 @@
+import hashlib
+import zlib
+
+# Au-delà de cette taille (octets UTF-8), le contenu est compressé avec zlib
+COMPRESSION_THRESHOLD = 1024
+COMPRESSION_LEVEL = 6
+
+
+def encode_content(text):
+    """
+    Prépare un contenu texte pour la table content_blobs
+
+    Args:
+        text (str): Contenu à stocker
+
+    Returns:
+        tuple: (empreinte SHA-256, taille en octets, compressé, données)
+    """
+    raw = (text or '').encode('utf-8')
+    digest = hashlib.sha256(raw).digest()
+
+    if len(raw) > COMPRESSION_THRESHOLD:
+        packed = zlib.compress(raw, COMPRESSION_LEVEL)
+        # Garder la forme brute si la compression ne fait rien gagner
+        if len(packed) < len(raw):
+            return digest, len(raw), 1, packed
+
+    return digest, len(raw), 0, raw
+
+
+def decode_content(data, compressed):
+    """
+    Restitue le texte d'un blob
+
+    Args:
+        data (bytes): Données stockées
+        compressed (int): 1 si les données sont compressées
+
+    Returns:
+        str: Contenu texte (None si data est None)
+    """
+    if data is None:
+        return None
+    if compressed:
+        data = zlib.decompress(data)
+    return bytes(data).decode('utf-8')
+
+
+def store_blob(conn, text):
+    """
+    Stocke un contenu (dédupliqué par empreinte) et renvoie l'ID de son blob
+
+    Args:
+        conn (sqlite3.Connection): Connexion en cours de transaction
+        text (str): Contenu à stocker
+
+    Returns:
+        int: ID du blob
+    """
+    digest, size, compressed, data = encode_content(text)
+
+    row = conn.execute('SELECT id FROM content_blobs WHERE hash = ?', (digest,)).fetchone()
+    if row is not None:
+        return row[0]
+
+    cursor = conn.execute('''
+                          INSERT INTO content_blobs (hash, size, compressed, data)
+                          VALUES (?, ?, ?, ?)
+                          ''', (digest, size, compressed, data))
+    return cursor.lastrowid
+
+
+def release_blobs(conn, blob_ids):
+    """
+    Supprime les blobs qui ne sont plus référencés par aucun prompt ni réponse
+
+    Args:
+        conn (sqlite3.Connection): Connexion en cours de transaction
+        blob_ids (iterable): Blobs potentiellement orphelins
+
+    Returns:
+        int: Nombre de blobs supprimés
+    """
+    removed = 0
+    for blob_id in set(blob_ids):
+        if blob_id is None:
+            continue
+        cursor = conn.execute('''
+                              DELETE FROM content_blobs
+                              WHERE id = ?
+                                AND NOT EXISTS (SELECT 1 FROM prompts WHERE content_blob_id = ?)
+                                AND NOT EXISTS (SELECT 1 FROM responses WHERE content_blob_id = ?)
+                              ''', (blob_id, blob_id, blob_id))
+        removed += cursor.rowcount
+    return removed
+
+
+def register_blob_functions(conn):
+    """
+    Déclare la fonction SQL blob_text(data, compressed) sur une connexion
+
+    Elle sert aux lectures (SELECT blob_text(...)) et à l'index FTS5, dont la table
+    de contenu est une vue décompressant les blobs.
+
+    Args:
+        conn (sqlite3.Connection): Connexion à configurer
+    """
+    conn.create_function('blob_text', 2, decode_content, deterministic=True)
@@ -0,0 +1,359 @@
+import json
+import os
+from utils.logger import logger
+from utils.exceptions import ExportError
+from utils.lazy_import import lazy_import, is_available
+
+# pyarrow et openpyxl ne sont chargés qu'au premier export Parquet / XLSX
+HAS_PYARROW = is_available('pyarrow')
+HAS_OPENPYXL = is_available('openpyxl')
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+openpyxl = lazy_import('openpyxl')
+openpyxl_cell = lazy_import('openpyxl.cell.cell')
+
+# Colonnes à faible cardinalité, encodées en dictionnaire (catégories à la relecture)
+DICTIONARY_COLUMNS = ('platform', 'operation_type', 'outcome_code', 'status', 'annotation_status')
+
+# Lignes par groupe de lignes Parquet (et par lot converti en mémoire)
+PARQUET_ROW_GROUP_SIZE = 10000
+
+# Longueur maximale d'une cellule Excel
+XLSX_MAX_CELL_LENGTH = 32767
+
+
+def prompt_history_schema():
+    """
+    Schéma Parquet de l'historique des prompts (Database.iter_prompt_history)
+
+    Returns:
+        pyarrow.Schema: Schéma typé (horodatage, entiers, catégories)
+    """
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.int64()),
+        ('session_id', pa.int64()),
+        ('timestamp', pa.timestamp('us')),
+        ('platform', category),
+        ('operation_type', category),
+        ('token_count', pa.int64()),
+        ('duration_ms', pa.int64()),
+        ('outcome_code', category),
+        ('content', pa.string()),
+        ('response', pa.string())
+    ])
+
+
+def _flat_value(value):
+    """Valeur de colonne plate (structures imbriquées encodées en JSON)"""
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _flat_row(row):
+    """Ligne sous forme de dictionnaire à colonnes plates"""
+    if not isinstance(row, dict):
+        return {'value': _flat_value(row)}
+    return {key: _flat_value(value) for key, value in row.items()}
+
+
+def _column_type(values):
+    """Type Arrow d'une colonne de valeurs Python (texte si les types sont mêlés)"""
+    try:
+        return pa.array(values).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.string()
+
+
+def _common_type(current, observed):
+    """
+    Type commun à deux types de colonne
+
+    Entiers et réels s'unifient en réels ; toute autre combinaison incompatible devient
+    du texte, qui accepte toutes les valeurs.
+    """
+    if current == observed or pa.types.is_null(observed):
+        return current
+    if pa.types.is_null(current):
+        return observed
+    if pa.types.is_integer(current) and pa.types.is_integer(observed):
+        return pa.int64()
+    numeric = (pa.types.is_integer, pa.types.is_floating)
+    if any(f(current) for f in numeric) and any(f(observed) for f in numeric):
+        return pa.float64()
+    return pa.string()
+
+
+def _text_value(value):
+    """Valeur d'une colonne texte (scalaires non textuels convertis)"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _column_array(values, storage_type):
+    """Colonne Arrow d'un lot (valeurs converties en texte pour une colonne texte)"""
+    try:
+        return pa.array(values, type=storage_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        if not pa.types.is_string(storage_type):
+            raise
+        return pa.array([_text_value(value) for value in values], type=storage_type)
+
+
+class _InferredSchema:
+    """
+    Schéma déduit au fil des lots, élargi quand une colonne change de type
+
+    Une colonne nulle jusque-là prend le type de ses premières valeurs ; une colonne dont
+    le type varie est élargie (entier -> réel -> texte) ; une clé apparue dans un lot
+    ultérieur devient une nouvelle colonne. Les colonnes encore entièrement nulles sont
+    typées texte dans le fichier, et les colonnes texte listées dans dictionary_columns
+    sont encodées en dictionnaire.
+    """
+
+    def __init__(self, dictionary_columns):
+        self.dictionary_columns = dictionary_columns
+        self.types = {}
+        self.schema = None
+        self.storage_schema = None
+
+    def update(self, batch):
+        """
+        Intègre les colonnes et les types d'un lot
+
+        Returns:
+            bool: True si le schéma du fichier change
+        """
+        names = dict.fromkeys(key for row in batch for key in row)
+        for name in names:
+            observed = _column_type([row.get(name) for row in batch])
+            self.types[name] = _common_type(self.types.get(name, pa.null()), observed)
+
+        storage = pa.schema([pa.field(name, pa.string() if pa.types.is_null(field_type) else field_type)
+                             for name, field_type in self.types.items()])
+        if storage == self.storage_schema:
+            return False
+
+        self.storage_schema = storage
+        self.schema = pa.schema([
+            pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+            if field.name in self.dictionary_columns and pa.types.is_string(field.type) else field
+            for field in storage
+        ])
+        return True
+
+    def table(self, batch):
+        """Table Arrow d'un lot au schéma courant"""
+        arrays = [_column_array([row.get(field.name) for row in batch], field.type)
+                  for field in self.storage_schema]
+        return pa.Table.from_arrays(arrays, schema=self.storage_schema).cast(self.schema)
+
+
+def _widen_file(path, schema, compression):
+    """
+    Recopie un fichier Parquet partiel sous un schéma élargi, groupe de lignes par groupe
+
+    Returns:
+        pyarrow.parquet.ParquetWriter: Écrivain ouvert sur le fichier, prêt pour les lots suivants
+    """
+    previous = path + '.previous'
+    os.replace(path, previous)
+
+    writer = pq.ParquetWriter(path, schema, compression=compression)
+    try:
+        source = pq.ParquetFile(previous)
+        for index in range(source.num_row_groups):
+            group = source.read_row_group(index)
+            columns = []
+            for field in schema:
+                if field.name in group.column_names:
+                    column = group.column(field.name)
+                    if pa.types.is_dictionary(column.type) and not pa.types.is_dictionary(field.type):
+                        column = column.cast(column.type.value_type)
+                    columns.append(column.cast(field.type))
+                else:
+                    columns.append(pa.nulls(group.num_rows, field.type))
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+    except Exception:
+        writer.close()
+        raise
+    finally:
+        os.remove(previous)
+    return writer
+
+
+def _storage_schema(schema):
+    """
+    Schéma de conversion des valeurs Python
+
+    Les horodatages (texte ISO) et les catégories sont lus comme texte puis convertis
+    par Arrow (cast), sans analyse ligne à ligne en Python.
+    """
+    fields = []
+    for field in schema:
+        field_type = field.type
+        if pa.types.is_timestamp(field_type) or pa.types.is_dictionary(field_type):
+            field_type = pa.string()
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields)
+
+
+def write_parquet(rows, filepath, schema=None, dictionary_columns=DICTIONARY_COLUMNS,
+                  row_group_size=PARQUET_ROW_GROUP_SIZE, compression='zstd', progress=None, total=None):
+    """
+    Écrit des lignes dans un fichier Parquet, un groupe de lignes à la fois
+
+    Seul le lot en cours de conversion est gardé en mémoire. Avec un schéma explicite, les
+    clés absentes du schéma sont ignorées. Sans schéma, il est déduit des lots successifs :
+    si un lot ajoute une colonne ou change le type d'une colonne, les groupes déjà écrits
+    sont recopiés sous le schéma élargi (voir _InferredSchema).
+
+    Args:
+        rows (iterable): Lignes (dictionnaires) à écrire
+        filepath (str): Chemin du fichier
+        schema (pyarrow.Schema, optional): Schéma cible
+        dictionary_columns (tuple): Colonnes texte encodées en dictionnaire (schéma déduit)
+        row_group_size (int): Lignes par groupe
+        compression (str): Compression des pages ('zstd', 'snappy', 'gzip', None)
+        progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+        total (int, optional): Nombre total de lignes, s'il est connu
+
+    Returns:
+        tuple: (chemin du fichier, nombre de lignes)
+    """
+    if not HAS_PYARROW:
+        raise ExportError("L'export Parquet nécessite pyarrow (pip install pyarrow)")
+
+    partial = filepath + '.partial'
+    writer = None
+    inferred = _InferredSchema(dictionary_columns) if schema is None else None
+    storage_schema = _storage_schema(schema) if schema is not None else None
+    count = 0
+
+    def write_batch(batch):
+        nonlocal writer
+        if inferred is None:
+            if writer is None:
+                writer = pq.ParquetWriter(partial, schema, compression=compression)
+            table = pa.Table.from_pylist(batch, schema=storage_schema).cast(schema)
+        else:
+            if inferred.update(batch) and writer is not None:
+                logger.debug(f"Parquet {filepath}: schéma élargi, {count} ligne(s) recopiée(s)")
+                writer.close()
+                writer = None
+                writer = _widen_file(partial, inferred.schema, compression)
+            if writer is None:
+                writer = pq.ParquetWriter(partial, inferred.schema, compression=compression)
+            table = inferred.table(batch)
+
+        writer.write_table(table, row_group_size=row_group_size)
+
+    try:
+        batch = []
+        for row in rows:
+            batch.append(_flat_row(row))
+            if len(batch) >= row_group_size:
+                write_batch(batch)
+                count += len(batch)
+                batch = []
+                if progress:
+                    progress(count, total)
+
+        if batch or writer is None:
+            write_batch(batch)
+            count += len(batch)
+
+        writer.close()
+        writer = None
+        os.replace(partial, filepath)
+
+    except Exception as e:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        if isinstance(e, ExportError):
+            raise
+        raise ExportError(f"Échec de l'écriture Parquet: {str(e)}")
+
+    if progress:
+        progress(count, total)
+    logger.debug(f"Parquet écrit: {filepath} ({count} lignes)")
+    return filepath, count
+
+
+def _xlsx_value(value):
+    """Valeur de cellule Excel (structures en JSON, caractères interdits retirés, longueur bornée)"""
+    value = _flat_value(value)
+    if isinstance(value, str):
+        value = openpyxl_cell.ILLEGAL_CHARACTERS_RE.sub('', value)
+        if len(value) > XLSX_MAX_CELL_LENGTH:
+            value = value[:XLSX_MAX_CELL_LENGTH]
+    return value
+
+
+def write_xlsx(rows, filepath, fieldnames=None, sheet_name='Data', extra_sheets=None, progress=None,
+               total=None):
+    """
+    Écrit des lignes dans un classeur Excel en mode écriture seule (openpyxl write_only)
+
+    Les lignes sont transmises une à une au classeur, qui les écrit sur disque au fur et à
+    mesure : la mémoire consommée ne dépend pas du nombre de lignes.
+
+    Args:
+        rows (iterable): Lignes (dictionnaires ou séquences)
+        filepath (str): Chemin du fichier
+        fieldnames (list, optional): Colonnes (celles de la première ligne dictionnaire par défaut)
+        sheet_name (str): Nom de la feuille principale
+        extra_sheets (dict, optional): Feuilles supplémentaires {nom: liste de dictionnaires}
+        progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+        total (int, optional): Nombre total de lignes, s'il est connu
+
+    Returns:
+        tuple: (chemin du fichier, nombre de lignes)
+    """
+    if not HAS_OPENPYXL:
+        raise ExportError("L'export XLSX nécessite openpyxl (pip install openpyxl)")
+
+    workbook = openpyxl.Workbook(write_only=True)
+
+    def fill(sheet, sheet_rows, columns, report=None):
+        if columns:
+            sheet.append(columns)
+
+        written = 0
+        for row in sheet_rows:
+            if isinstance(row, dict):
+                if columns is None:
+                    columns = list(row.keys())
+                    sheet.append(columns)
+                sheet.append([_xlsx_value(row.get(column)) for column in columns])
+            else:
+                sheet.append([_xlsx_value(value) for value in row])
+            written += 1
+            if report and written % 1000 == 0:
+                report(written, total)
+        return written
+
+    partial = filepath + '.partial'
+    try:
+        count = fill(workbook.create_sheet(sheet_name), rows, list(fieldnames) if fieldnames else None, progress)
+        for name, sheet_rows in (extra_sheets or {}).items():
+            fill(workbook.create_sheet(name), sheet_rows, None)
+
+        workbook.save(partial)
+        os.replace(partial, filepath)
+
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise ExportError(f"Échec de l'écriture XLSX: {str(e)}")
+
+    if progress:
+        progress(count, total)
+    return filepath, count
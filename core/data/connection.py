@@ -0,0 +1,224 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from utils.logger import logger
+from utils.exceptions import DatabaseError
+
+
+class ConnectionManager:
+    """
+    Gestionnaire de connexions SQLite : une connexion par thread, journal WAL et gestion du verrouillage
+
+    En mode WAL, les lecteurs ne bloquent pas l'écrivain et inversement ; chaque thread
+    (UI, générateur, annotateur, brainstorming...) obtient sa propre connexion et peut
+    écrire directement. Les conflits d'écriture sont absorbés par le busy_timeout puis
+    par quelques tentatives supplémentaires.
+    """
+
+    def __init__(self, db_path, busy_timeout_ms=10000, cache_size_kib=20000, synchronous='NORMAL',
+                 journal_mode='WAL', isolation_level='', lock_retries=5, on_connect=None):
+        """
+        Initialise le gestionnaire
+
+        Args:
+            db_path (str): Chemin vers le fichier de base de données
+            busy_timeout_ms (int): Attente maximale d'un verrou avant erreur "database is locked"
+            cache_size_kib (int): Taille du cache de pages par connexion (Kio)
+            synchronous (str): Niveau de synchronisation ('NORMAL' suffit en WAL)
+            journal_mode (str): Mode de journalisation
+            isolation_level (str, optional): Niveau d'isolation sqlite3 (None = autocommit)
+            lock_retries (int): Tentatives supplémentaires après un verrou persistant
+            on_connect (callable, optional): Configuration appliquée à chaque nouvelle connexion
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kib = cache_size_kib
+        self.synchronous = synchronous
+        self.journal_mode = journal_mode
+        self.isolation_level = isolation_level
+        self.lock_retries = lock_retries
+        self.on_connect = on_connect
+
+        self._local = threading.local()
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._journal_checked = False
+
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+    def _open(self):
+        """
+        Ouvre et configure une nouvelle connexion
+
+        Returns:
+            sqlite3.Connection: Connexion configurée
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=self.isolation_level,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        if self.on_connect is not None:
+            self.on_connect(conn)
+
+        # Le mode WAL est persistant dans le fichier : une seule vérification suffit
+        if not self._journal_checked and self.db_path != ':memory:':
+            mode = conn.execute(f"PRAGMA journal_mode = {self.journal_mode}").fetchone()[0]
+            if mode.upper() != self.journal_mode.upper():
+                logger.warning(f"Mode de journal {self.journal_mode} refusé, mode actuel: {mode}")
+            self._journal_checked = True
+
+        return conn
+
+    def get_connection(self):
+        """
+        Récupère la connexion du thread courant (créée à la première utilisation)
+
+        Returns:
+            sqlite3.Connection: Connexion propre au thread
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        try:
+            conn = self._open()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ouverture d'une connexion: {str(e)}")
+            raise DatabaseError(f"Échec de connexion à la base de données: {str(e)}")
+
+        thread = threading.current_thread()
+        self._local.conn = conn
+
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[thread.ident] = (thread, conn)
+
+        logger.debug(f"Connexion SQLite ouverte pour le thread {thread.name}")
+        return conn
+
+    def _prune_dead_threads(self):
+        """Ferme les connexions des threads terminés (verrou détenu)"""
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                del self._connections[ident]
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Ouvre une transaction sur la connexion du thread courant
+
+        Avec immediate=True, le verrou d'écriture est pris dès le début, ce qui évite
+        les impasses lecture -> écriture entre threads.
+
+        Args:
+            immediate (bool): Prendre le verrou d'écriture immédiatement
+
+        Yields:
+            sqlite3.Connection: Connexion en transaction
+        """
+        conn = self.get_connection()
+
+        # Transaction imbriquée : laisser la transaction englobante décider
+        if conn.in_transaction:
+            yield conn
+            return
+
+        self.run_with_retry(lambda: conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN"))
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
+    def run_with_retry(self, func):
+        """
+        Exécute une opération en la retentant si la base reste verrouillée
+
+        Args:
+            func (callable): Opération à exécuter
+
+        Returns:
+            Résultat de l'opération
+        """
+        for attempt in range(self.lock_retries + 1):
+            try:
+                return func()
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                if ('locked' not in message and 'busy' not in message) or attempt == self.lock_retries:
+                    raise
+                delay = 0.05 * (2 ** attempt)
+                logger.warning(f"Base verrouillée, nouvelle tentative dans {delay:.2f}s")
+                time.sleep(delay)
+
+    def close_thread_connection(self):
+        """
+        Ferme la connexion du thread courant
+
+        Returns:
+            bool: True si une connexion a été fermée
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return False
+
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+        return True
+
+    def close_all(self):
+        """
+        Ferme toutes les connexions ouvertes (à l'arrêt de l'application)
+
+        Returns:
+            int: Nombre de connexions fermées
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+
+        closed = 0
+        for _, conn in connections:
+            try:
+                conn.close()
+                closed += 1
+            except Exception as e:
+                logger.error(f"Erreur lors de la fermeture d'une connexion: {str(e)}")
+
+        # Les références locales aux threads pointent sur des connexions fermées
+        self._local = threading.local()
+        return closed
+
+    def checkpoint(self, mode='PASSIVE'):
+        """
+        Reporte le journal WAL dans le fichier principal
+
+        Args:
+            mode (str): PASSIVE, FULL, RESTART ou TRUNCATE
+
+        Returns:
+            tuple: (busy, pages du journal, pages reportées)
+        """
+        row = self.get_connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return tuple(row)
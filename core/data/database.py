@@ -1,9 +1,42 @@
-import sqlite3
 import os
 import json
 from datetime import datetime
+from itertools import islice
 from utils.logger import logger
 from utils.exceptions import DatabaseError
+from core.data.connection import ConnectionManager
+from core.data.write_behind import WriteBehindWriter
+from core.data.migrations import DatabaseMigration
+from core.data.backup import BackupService
+from core.data.retention import RetentionService, INCREMENTAL_VACUUM
+from core.data.pagination import (PromptRow, ResponseRow, DatasetRow, keyset_condition, order_clause,
+                                  build_page)
+from core.data.schema import SCHEMA_MIGRATIONS, LATEST_SCHEMA_VERSION
+from core.data.blobs import store_blob, release_blobs, register_blob_functions
+from core.data.analytics import (LatencySketch, ROLLUP_TABLES, bucket_for, update_rollups,
+                                 register_analytics_functions)
+from core.data.profiles import (ProfileCache, default_browser_config, migrate_browser_config,
+                                encode_profile)
+
+
+def _configure_connection(conn):
+    """Déclare les fonctions SQL de l'application sur une nouvelle connexion"""
+    register_blob_functions(conn)
+    register_analytics_functions(conn)
+
+
+def ensure_schema(db_path):
+    """
+    Applique les migrations versionnées à une base sans garder de Database ouverte
+
+    Pour les composants qui écrivent directement dans la base de l'application et
+    peuvent être créés avant elle. Sur une base à jour, le coût se limite à une lecture
+    de version.
+
+    Args:
+        db_path (str): Chemin vers le fichier de base de données
+    """
+    Database(db_path).close()
 
 
 class Database:
@@ -30,28 +63,37 @@ class Database:
 
         logger.info(f"Initialisation de la base de données: {self.db_path}")
 
+        # Connexions par thread (WAL) : les threads des modules écrivent directement
+        self.connections = None
+        self.writer = None
+        self.backup_service = None
+        self.retention_service = None
+
+        # Profils décodés en mémoire, mis à jour par save_platform / delete_platform
+        self.profile_cache = ProfileCache(self._load_profiles)
+
         # Établir la connexion
         self.connect()
 
-        # Initialiser les tables
+        # Initialiser les tables (et migrer les profils existants, une seule fois)
         self._init_tables()
 
-        # Effectuer la migration automatique des profils existants
-        self._migrate_existing_profiles()
-
     def connect(self):
         """
         Établit la connexion à la base de données
 
+        Idempotent : le gestionnaire de connexions n'est créé qu'une fois, chaque thread
+        ouvre ensuite sa propre connexion à la première utilisation de self.conn.
+
         Returns:
             bool: True si la connexion est établie, False sinon
         """
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            # Activer les foreign keys
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            # Configurer pour retourner les résultats comme des dictionnaires
-            self.conn.row_factory = sqlite3.Row
+            if self.connections is None:
+                self.connections = ConnectionManager(self.db_path, on_connect=_configure_connection)
+
+            # Ouvrir la connexion du thread appelant (et activer le WAL)
+            self.connections.get_connection()
 
             logger.debug("Connexion établie à la base de données")
             return True
@@ -60,304 +102,66 @@ class Database:
             logger.error(f"Erreur lors de la connexion à la base de données: {str(e)}")
             raise DatabaseError(f"Échec de connexion à la base de données: {str(e)}")
 
+    @property
+    def conn(self):
+        """
+        Connexion SQLite propre au thread courant
+
+        Returns:
+            sqlite3.Connection: Connexion du thread appelant
+        """
+        if self.connections is None:
+            self.connect()
+        return self.connections.get_connection()
+
+    def transaction(self):
+        """
+        Transaction d'écriture sur la connexion du thread courant (BEGIN IMMEDIATE)
+
+        Returns:
+            contextmanager: Contexte validant la transaction en sortie, l'annulant sur exception
+        """
+        if self.connections is None:
+            self.connect()
+        return self.connections.transaction()
+
     def _init_tables(self):
         """
-        Initialise les tables nécessaires dans la base de données
+        Met le schéma à jour via les migrations versionnées
+
+        Sur une base à jour, la vérification se limite à une lecture de version.
 
         Returns:
             bool: True si l'initialisation est réussie, False sinon
         """
         try:
-            cursor = self.conn.cursor()
-
-            # Table des plateformes et leurs configurations
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS platforms
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               name
-                               TEXT
-                               NOT
-                               NULL
-                               UNIQUE,
-                               profile_data
-                               TEXT
-                               NOT
-                               NULL,
-                               created_at
-                               TEXT
-                               NOT
-                               NULL,
-                               updated_at
-                               TEXT
-                               NOT
-                               NULL
-                           )
-                           ''')
+            migration = DatabaseMigration(self.db_path, on_connect=_configure_connection)
+            current_version = migration.get_current_version()
 
-            # Table de configuration du clavier (simplifiée)
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS keyboard_config
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               layout_type
-                               TEXT
-                               NOT
-                               NULL,
-                               key_delay
-                               INTEGER
-                               DEFAULT
-                               50,
-                               accent_delay
-                               INTEGER
-                               DEFAULT
-                               100,
-                               accent_method
-                               TEXT
-                               NOT
-                               NULL,
-                               block_alt_tab
-                               BOOLEAN
-                               DEFAULT
-                               1,
-                               focus_lock
-                               BOOLEAN
-                               DEFAULT
-                               1,
-                               protection_timeout
-                               INTEGER
-                               DEFAULT
-                               30,
-                               created_at
-                               TEXT
-                               NOT
-                               NULL,
-                               updated_at
-                               TEXT
-                               NOT
-                               NULL,
-                               is_active
-                               BOOLEAN
-                               DEFAULT
-                               1
-                           )
-                           ''')
+            if current_version >= LATEST_SCHEMA_VERSION:
+                logger.debug(f"Schéma à jour (v{current_version})")
+                return True
 
-            # Table des sessions d'IA
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS ai_sessions
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               platform_name
-                               TEXT
-                               NOT
-                               NULL,
-                               session_date
-                               TEXT
-                               NOT
-                               NULL,
-                               prompt_count
-                               INTEGER
-                               DEFAULT
-                               0,
-                               token_count
-                               INTEGER
-                               DEFAULT
-                               0,
-                               status
-                               TEXT
-                               DEFAULT
-                               'active'
-                           )
-                           ''')
+            logger.info(f"Mise à jour du schéma v{current_version} -> v{LATEST_SCHEMA_VERSION}")
 
-            # Table des prompts
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS prompts
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               session_id
-                               INTEGER,
-                               timestamp
-                               TEXT
-                               NOT
-                               NULL,
-                               content
-                               TEXT
-                               NOT
-                               NULL,
-                               token_count
-                               INTEGER
-                               DEFAULT
-                               0,
-                               operation_type
-                               TEXT
-                               NOT
-                               NULL,
-                               FOREIGN
-                               KEY
-                           (
-                               session_id
-                           ) REFERENCES ai_sessions
-                           (
-                               id
-                           )
-                               )
-                           ''')
+            has_tables = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchone() is not None
 
-            # Table des réponses
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS responses
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               prompt_id
-                               INTEGER,
-                               timestamp
-                               TEXT
-                               NOT
-                               NULL,
-                               content
-                               TEXT
-                               NOT
-                               NULL,
-                               status
-                               TEXT
-                               DEFAULT
-                               'success',
-                               FOREIGN
-                               KEY
-                           (
-                               prompt_id
-                           ) REFERENCES prompts
-                           (
-                               id
-                           )
-                               )
-                           ''')
+            # Base vide : l'espace libéré par la rétention pourra être rendu par étapes
+            # (le mode ne peut être choisi qu'avant la création des tables ; le VACUUM d'une base
+            # vide est immédiat et inscrit le mode dans l'en-tête)
+            if current_version == 0 and not self.conn.execute("SELECT 1 FROM sqlite_master").fetchone():
+                self.conn.execute(f"PRAGMA auto_vacuum = {INCREMENTAL_VACUUM}")
+                self.conn.execute("VACUUM")
 
-            # Table des datasets générés
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS datasets
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               name
-                               TEXT
-                               NOT
-                               NULL,
-                               creation_date
-                               TEXT
-                               NOT
-                               NULL,
-                               type
-                               TEXT
-                               NOT
-                               NULL,
-                               format
-                               TEXT
-                               NOT
-                               NULL,
-                               item_count
-                               INTEGER
-                               DEFAULT
-                               0,
-                               filepath
-                               TEXT
-                               NOT
-                               NULL
-                           )
-                           ''')
+            # Sauvegarde avant de modifier le schéma d'une base existante, y compris une base
+            # antérieure aux migrations versionnées (sans table schema_migrations, donc en v0)
+            if has_tables:
+                migration.create_backup(f"v{current_version}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
 
-            # Table des sessions de brainstorming
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS brainstorming_sessions
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               name
-                               TEXT
-                               NOT
-                               NULL,
-                               creation_date
-                               TEXT
-                               NOT
-                               NULL,
-                               ai_platforms
-                               TEXT
-                               NOT
-                               NULL,
-                               context
-                               TEXT
-                               NOT
-                               NULL,
-                               status
-                               TEXT
-                               DEFAULT
-                               'in_progress'
-                           )
-                           ''')
-
-            # Table des résultats de brainstorming
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS brainstorming_results
-                           (
-                               id
-                               INTEGER
-                               PRIMARY
-                               KEY
-                               AUTOINCREMENT,
-                               session_id
-                               INTEGER,
-                               platform_name
-                               TEXT
-                               NOT
-                               NULL,
-                               solution
-                               TEXT
-                               NOT
-                               NULL,
-                               evaluations
-                               TEXT,
-                               final_score
-                               INTEGER,
-                               FOREIGN
-                               KEY
-                           (
-                               session_id
-                           ) REFERENCES brainstorming_sessions
-                           (
-                               id
-                           )
-                               )
-                           ''')
+            migration.migrate_to_latest(SCHEMA_MIGRATIONS)
 
-            self.conn.commit()
             logger.info("Initialisation des tables terminée")
             return True
 
@@ -365,17 +169,52 @@ class Database:
             logger.error(f"Erreur lors de l'initialisation des tables: {str(e)}")
             raise DatabaseError(f"Échec de l'initialisation des tables: {str(e)}")
 
+    def get_backup_service(self, **options):
+        """
+        Récupère le service de sauvegarde à chaud de la base
+
+        Args:
+            **options: Options de BackupService (backup_dir, keep, compress...) à la première création
+
+        Returns:
+            BackupService: Service de sauvegarde
+        """
+        if self.backup_service is None:
+            self.backup_service = BackupService(self.db_path, **options)
+        return self.backup_service
+
+    def get_retention_service(self, **options):
+        """
+        Récupère le service de rétention de l'historique
+
+        Args:
+            **options: Options de RetentionService (rules, archive_dir, batch_size...) à la première création
+
+        Returns:
+            RetentionService: Service de rétention
+        """
+        if self.retention_service is None:
+            self.retention_service = RetentionService(self, **options)
+        return self.retention_service
+
     def close(self):
         """
-        Ferme la connexion à la base de données
+        Ferme les connexions de tous les threads
 
         Returns:
             bool: True si la fermeture est réussie, False sinon
         """
         try:
-            if hasattr(self, 'conn') and self.conn:
-                self.conn.close()
-                logger.debug("Connexion à la base de données fermée")
+            if self.retention_service is not None:
+                self.retention_service.stop()
+
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+            if self.connections is not None:
+                closed = self.connections.close_all()
+                logger.debug(f"Connexions à la base de données fermées: {closed}")
             return True
         except Exception as e:
             logger.error(f"Erreur lors de la fermeture de la connexion: {str(e)}")
@@ -392,20 +231,7 @@ class Database:
         Returns:
             dict: Configuration par défaut
         """
-        return {
-            "type": "Chrome",
-            "path": "",
-            "url": "",
-            "fullscreen": False,
-            # NOUVELLES OPTIONS MULTI-FENÊTRES (avec valeurs par défaut conservant comportement actuel)
-            "window_selection_method": "auto",  # "auto" = comportement actuel (première fenêtre)
-            "window_order": 1,  # 1 = première fenêtre = comportement actuel
-            "window_title_pattern": "",  # Vide = pas de filtrage par titre
-            "window_position": None,  # None = pas de filtrage par position
-            "window_id": None,  # None = pas de fenêtre spécifique mémorisée
-            "window_size": None,  # None = pas de contrainte de taille
-            "remember_window": False  # False = ne pas mémoriser la sélection
-        }
+        return default_browser_config()
 
     def _migrate_browser_config(self, browser_config):
         """
@@ -417,79 +243,7 @@ class Database:
         Returns:
             dict: Configuration migrée
         """
-        if not browser_config:
-            return self._get_default_browser_config()
-
-        # Créer la nouvelle configuration en préservant l'existante
-        default_config = self._get_default_browser_config()
-        migrated_config = default_config.copy()
-
-        # Préserver toutes les valeurs existantes
-        for key, value in browser_config.items():
-            migrated_config[key] = value
-
-        # Ajouter les nouveaux champs s'ils n'existent pas
-        for key, default_value in default_config.items():
-            if key not in migrated_config:
-                migrated_config[key] = default_value
-
-        logger.debug(f"Configuration navigateur migrée: {list(migrated_config.keys())}")
-        return migrated_config
-
-    def _migrate_existing_profiles(self):
-        """
-        Migre automatiquement tous les profils existants vers le nouveau format
-        """
-        try:
-            logger.info("Vérification de la migration des profils existants...")
-
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT name, profile_data FROM platforms')
-            results = cursor.fetchall()
-
-            migration_count = 0
-
-            for row in results:
-                try:
-                    platform_name = row['name']
-                    profile_data = json.loads(row['profile_data'])
-
-                    # Vérifier si la migration est nécessaire
-                    browser_config = profile_data.get('browser', {})
-                    needs_migration = 'window_selection_method' not in browser_config
-
-                    if needs_migration:
-                        logger.debug(f"Migration du profil {platform_name}...")
-
-                        # Migrer la configuration navigateur
-                        profile_data['browser'] = self._migrate_browser_config(browser_config)
-
-                        # Sauvegarder le profil migré
-                        now = datetime.now().isoformat()
-                        profile_json = json.dumps(profile_data, ensure_ascii=False, indent=2)
-
-                        cursor.execute('''
-                                       UPDATE platforms
-                                       SET profile_data = ?,
-                                           updated_at   = ?
-                                       WHERE name = ?
-                                       ''', (profile_json, now, platform_name))
-
-                        migration_count += 1
-                        logger.debug(f"Profil {platform_name} migré avec succès")
-
-                except Exception as e:
-                    logger.error(f"Erreur migration profil {row['name']}: {str(e)}")
-                    continue
-
-            if migration_count > 0:
-                self.conn.commit()
-                logger.info(f"Migration terminée: {migration_count} profils migrés")
-            else:
-                logger.debug("Aucune migration nécessaire")
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la migration automatique: {str(e)}")
+        return migrate_browser_config(browser_config)
 
     def validate_browser_config(self, browser_config):
         """
@@ -664,8 +418,8 @@ class Database:
             cursor = self.conn.cursor()
             now = datetime.now().isoformat()
 
-            # Convertir le profil en JSON
-            profile_json = json.dumps(profile_data, ensure_ascii=False, indent=2)
+            # Convertir le profil en JSON compact
+            profile_json = encode_profile(profile_data)
 
             # Vérifier si la plateforme existe déjà
             cursor.execute('SELECT id FROM platforms WHERE name = ?', (platform_name,))
@@ -689,58 +443,49 @@ class Database:
                 logger.info(f"Nouveau profil {platform_name} créé en base de données")
 
             self.conn.commit()
+            self.profile_cache.store(platform_name, profile_data)
 
-            # Vérification de la sauvegarde
-            saved_profile = self.get_platform(platform_name)
-            if saved_profile:
-                logger.debug(f"Vérification sauvegarde {platform_name}: OK")
-                return True
-            else:
-                logger.error(f"Échec vérification sauvegarde {platform_name}")
-                return False
+            logger.debug(f"Sauvegarde {platform_name}: OK (version des profils {self.profile_cache.version})")
+            return True
 
         except Exception as e:
             logger.error(f"Erreur sauvegarde plateforme {platform_name}: {str(e)}")
             return False
 
-    def get_platform(self, platform_name):
+    def _load_profiles(self):
         """
-        Récupère un profil de plateforme depuis la base de données avec migration automatique
-
-        Args:
-            platform_name (str): Nom de la plateforme
+        Charge et décode tous les profils depuis la base (alimente le cache)
 
         Returns:
-            dict: Profil de la plateforme ou None si non trouvé
+            dict: Profils indexés par nom
         """
-        try:
-            logger.debug(f"Récupération plateforme {platform_name} depuis la base de données")
-
-            cursor = self.conn.cursor()
-
-            cursor.execute('SELECT profile_data FROM platforms WHERE name = ?', (platform_name,))
-            result = cursor.fetchone()
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT name, profile_data FROM platforms')
 
-            if result:
-                # Décoder le JSON
-                profile_data = json.loads(result['profile_data'])
+        platforms = {}
+        for row in cursor.fetchall():
+            try:
+                platforms[row['name']] = json.loads(row['profile_data'])
+            except Exception as e:
+                logger.error(f"Erreur décodage profil {row['name']}: {str(e)}")
 
-                # Migration automatique si nécessaire
-                browser_config = profile_data.get('browser', {})
-                if 'window_selection_method' not in browser_config:
-                    logger.debug(f"Migration automatique du profil {platform_name}")
-                    profile_data['browser'] = self._migrate_browser_config(browser_config)
+        return platforms
 
-                    # Sauvegarder la version migrée
-                    self.save_platform(platform_name, profile_data)
+    def get_platform(self, platform_name):
+        """
+        Récupère un profil de plateforme (depuis le cache mémoire)
 
-                logger.debug(
-                    f"Profil {platform_name} récupéré depuis la base (taille: {len(str(profile_data))} caractères)")
+        Args:
+            platform_name (str): Nom de la plateforme
 
-                return profile_data
-            else:
+        Returns:
+            dict: Copie du profil de la plateforme ou None si non trouvé
+        """
+        try:
+            profile_data = self.profile_cache.get(platform_name)
+            if profile_data is None:
                 logger.debug(f"Profil {platform_name} non trouvé en base de données")
-                return None
+            return profile_data
 
         except Exception as e:
             logger.error(f"Erreur récupération plateforme {platform_name}: {str(e)}")
@@ -748,57 +493,27 @@ class Database:
 
     def get_all_platforms(self):
         """
-        Récupère tous les profils de plateformes avec migration automatique
+        Récupère tous les profils de plateformes (depuis le cache mémoire)
 
         Returns:
             dict: Dictionnaire des profils {nom: profil}
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT name, profile_data FROM platforms')
-            results = cursor.fetchall()
-
-            platforms = {}
-            migration_needed = False
-
-            for row in results:
-                try:
-                    platform_name = row['name']
-                    profile_data = json.loads(row['profile_data'])
-
-                    # Migration automatique si nécessaire
-                    browser_config = profile_data.get('browser', {})
-                    if 'window_selection_method' not in browser_config:
-                        logger.debug(f"Migration automatique du profil {platform_name}")
-                        profile_data['browser'] = self._migrate_browser_config(browser_config)
-                        migration_needed = True
-
-                        # Sauvegarder la version migrée
-                        now = datetime.now().isoformat()
-                        profile_json = json.dumps(profile_data, ensure_ascii=False, indent=2)
-                        cursor.execute('''
-                                       UPDATE platforms
-                                       SET profile_data = ?,
-                                           updated_at   = ?
-                                       WHERE name = ?
-                                       ''', (profile_json, now, platform_name))
-
-                    platforms[platform_name] = profile_data
-
-                except Exception as e:
-                    logger.error(f"Erreur décodage profil {row['name']}: {str(e)}")
-
-            if migration_needed:
-                self.conn.commit()
-                logger.info("Migration automatique effectuée lors de get_all_platforms")
-
-            logger.debug(f"{len(platforms)} profils de plateformes récupérés")
-            return platforms
+            return self.profile_cache.get_all()
 
         except Exception as e:
             logger.error(f"Erreur récupération tous les profils: {str(e)}")
             return {}
 
+    def get_profiles_version(self):
+        """
+        Récupère le compteur de version des profils (incrémenté à chaque modification)
+
+        Returns:
+            int: Version courante
+        """
+        return self.profile_cache.version
+
     def platform_exists(self, platform_name):
         """
         Vérifie si une plateforme existe
@@ -810,9 +525,7 @@ class Database:
             bool: True si la plateforme existe
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('SELECT id FROM platforms WHERE name = ?', (platform_name,))
-            return cursor.fetchone() is not None
+            return self.profile_cache.contains(platform_name)
 
         except Exception as e:
             logger.error(f"Erreur vérification existence plateforme {platform_name}: {str(e)}")
@@ -847,6 +560,7 @@ class Database:
 
             if cursor.rowcount > 0:
                 self.conn.commit()
+                self.profile_cache.remove(platform_name)
                 logger.info(f"Plateforme {platform_name} supprimée de la base")
                 return True
             else:
@@ -979,7 +693,71 @@ class Database:
             logger.error(f"Erreur lors de la création de session: {str(e)}")
             raise DatabaseError(f"Échec de la création de session: {str(e)}")
 
-    def record_prompt(self, session_id, content, token_count, operation_type):
+    def _insert_prompt(self, conn, session_id, content, token_count, operation_type, duration_ms=None,
+                       outcome_code=None):
+        """
+        Insère un prompt (texte dédupliqué dans content_blobs) et met à jour les compteurs
+        de sa session (sans valider)
+
+        Returns:
+            int: ID du prompt inséré
+        """
+        now = datetime.now().isoformat()
+        blob_id = store_blob(conn, content)
+
+        cursor = conn.execute('''
+                              INSERT INTO prompts (session_id, timestamp, content_blob_id, token_count, operation_type,
+                                                   duration_ms, outcome_code)
+                              VALUES (?, ?, ?, ?, ?, ?, ?)
+                              ''', (session_id, now, blob_id, token_count, operation_type, duration_ms,
+                                    outcome_code))
+        prompt_id = cursor.lastrowid
+
+        # Mettre à jour les compteurs de la session
+        conn.execute('''
+                     UPDATE ai_sessions
+                     SET prompt_count = prompt_count + 1,
+                         token_count  = token_count + ?
+                     WHERE id = ?
+                     ''', (token_count, session_id))
+
+        return prompt_id
+
+    def _insert_response(self, conn, prompt_id, content, status, duration_ms=None, outcome_code=None):
+        """
+        Insère une réponse (texte dédupliqué dans content_blobs) et met à jour les cumuls
+        horaires et journaliers (sans valider)
+
+        Returns:
+            int: ID de la réponse insérée
+        """
+        now = datetime.now().isoformat()
+        blob_id = store_blob(conn, content)
+
+        cursor = conn.execute('''
+                              INSERT INTO responses (prompt_id, timestamp, content_blob_id, status,
+                                                     duration_ms, outcome_code)
+                              VALUES (?, ?, ?, ?, ?, ?)
+                              ''', (prompt_id, now, blob_id, status, duration_ms, outcome_code or status))
+        response_id = cursor.lastrowid
+
+        prompt = conn.execute('''
+                              SELECT p.operation_type, p.token_count, s.platform_name
+                              FROM prompts p
+                              LEFT JOIN ai_sessions s ON s.id = p.session_id
+                              WHERE p.id = ?
+                              ''', (prompt_id,)).fetchone()
+
+        update_rollups(conn, now,
+                       prompt['platform_name'] if prompt else None,
+                       prompt['operation_type'] if prompt else None,
+                       status == 'success',
+                       prompt['token_count'] if prompt else 0,
+                       duration_ms)
+
+        return response_id
+
+    def record_prompt(self, session_id, content, token_count, operation_type, duration_ms=None, outcome_code=None):
         """
         Enregistre un prompt envoyé
 
@@ -988,29 +766,16 @@ class Database:
             content (str): Contenu du prompt
             token_count (int): Nombre de tokens
             operation_type (str): Type d'opération (analyse, génération, annotation, brainstorming)
+            duration_ms (int, optional): Durée de l'envoi du prompt
+            outcome_code (str, optional): Code de résultat de l'envoi
 
         Returns:
             int: ID du prompt enregistré
         """
         try:
-            cursor = self.conn.cursor()
-            now = datetime.now().isoformat()
-
-            cursor.execute('''
-                           INSERT INTO prompts (session_id, timestamp, content, token_count, operation_type)
-                           VALUES (?, ?, ?, ?, ?)
-                           ''', (session_id, now, content, token_count, operation_type))
-
-            # Mettre à jour les compteurs de la session
-            cursor.execute('''
-                           UPDATE ai_sessions
-                           SET prompt_count = prompt_count + 1,
-                               token_count  = token_count + ?
-                           WHERE id = ?
-                           ''', (token_count, session_id))
-
-            self.conn.commit()
-            prompt_id = cursor.lastrowid
+            with self.transaction() as conn:
+                prompt_id = self._insert_prompt(conn, session_id, content, token_count, operation_type,
+                                                duration_ms, outcome_code)
 
             logger.debug(f"Prompt enregistré, ID: {prompt_id}")
             return prompt_id
@@ -1019,7 +784,7 @@ class Database:
             logger.error(f"Erreur lors de l'enregistrement du prompt: {str(e)}")
             raise DatabaseError(f"Échec de l'enregistrement du prompt: {str(e)}")
 
-    def record_response(self, prompt_id, content, status='success'):
+    def record_response(self, prompt_id, content, status='success', duration_ms=None, outcome_code=None):
         """
         Enregistre une réponse reçue
 
@@ -1027,21 +792,16 @@ class Database:
             prompt_id (int): ID du prompt correspondant
             content (str): Contenu de la réponse
             status (str): Statut de la réponse ('success', 'error', etc.)
+            duration_ms (int, optional): Durée de la requête (envoi -> réponse)
+            outcome_code (str, optional): Code de résultat détaillé ('timeout', 'rate_limited'...),
+                le statut par défaut
 
         Returns:
             int: ID de la réponse enregistrée
         """
         try:
-            cursor = self.conn.cursor()
-            now = datetime.now().isoformat()
-
-            cursor.execute('''
-                           INSERT INTO responses (prompt_id, timestamp, content, status)
-                           VALUES (?, ?, ?, ?)
-                           ''', (prompt_id, now, content, status))
-
-            self.conn.commit()
-            response_id = cursor.lastrowid
+            with self.transaction() as conn:
+                response_id = self._insert_response(conn, prompt_id, content, status, duration_ms, outcome_code)
 
             logger.debug(f"Réponse enregistrée, ID: {response_id}")
             return response_id
@@ -1050,6 +810,613 @@ class Database:
             logger.error(f"Erreur lors de l'enregistrement de la réponse: {str(e)}")
             raise DatabaseError(f"Échec de l'enregistrement de la réponse: {str(e)}")
 
+    def _get_writer(self):
+        """Récupère (ou crée) l'écrivain différé"""
+        if self.writer is None:
+            if self.connections is None:
+                self.connect()
+            self.writer = WriteBehindWriter(self.connections)
+        return self.writer
+
+    def record_prompt_async(self, session_id, content, token_count, operation_type, duration_ms=None,
+                            outcome_code=None):
+        """
+        Enregistre un prompt via l'écrivain différé (validation groupée)
+
+        Args:
+            session_id (int): ID de la session
+            content (str): Contenu du prompt
+            token_count (int): Nombre de tokens
+            operation_type (str): Type d'opération (analyse, génération, annotation, brainstorming)
+            duration_ms (int, optional): Durée de l'envoi du prompt
+            outcome_code (str, optional): Code de résultat de l'envoi
+
+        Returns:
+            Future: Résolu avec l'ID du prompt une fois le lot validé
+        """
+        return self._get_writer().submit(
+            lambda conn: self._insert_prompt(conn, session_id, content, token_count, operation_type,
+                                             duration_ms, outcome_code)
+        )
+
+    def record_response_async(self, prompt_id, content, status='success', duration_ms=None, outcome_code=None):
+        """
+        Enregistre une réponse via l'écrivain différé (validation groupée)
+
+        Args:
+            prompt_id (int|Future): ID du prompt, ou Future renvoyé par record_prompt_async
+            content (str): Contenu de la réponse
+            status (str): Statut de la réponse ('success', 'error', etc.)
+            duration_ms (int, optional): Durée de la requête (envoi -> réponse)
+            outcome_code (str, optional): Code de résultat détaillé
+
+        Returns:
+            Future: Résolu avec l'ID de la réponse une fois le lot validé
+        """
+        writer = self._get_writer()
+        return writer.submit(
+            lambda conn: self._insert_response(conn, writer.resolve(prompt_id), content, status,
+                                               duration_ms, outcome_code)
+        )
+
+    def flush_writes(self, timeout=None):
+        """
+        Barrière : attend la validation des écritures différées déjà soumises
+
+        Args:
+            timeout (float, optional): Délai d'attente maximum
+
+        Returns:
+            bool: True si toutes les écritures sont validées
+        """
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+
+    # =====================================================
+    # HISTORIQUE ET RECHERCHE PLEIN TEXTE
+    # =====================================================
+
+    @staticmethod
+    def _build_fts_query(text):
+        """
+        Convertit une saisie utilisateur en requête FTS5 sûre
+
+        Chaque mot est cité (les opérateurs FTS5 tapés par l'utilisateur restent du texte)
+        et le dernier mot est traité comme préfixe pour la recherche au fil de la frappe.
+
+        Args:
+            text (str): Texte recherché
+
+        Returns:
+            str: Requête MATCH ou None si le texte est vide
+        """
+        terms = [term.replace('"', '""') for term in (text or '').split()]
+        if not terms:
+            return None
+
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def search_history(self, query, platform=None, operation_type=None, scope='all', limit=50, offset=0,
+                       highlight=('<b>', '</b>'), snippet_tokens=16):
+        """
+        Recherche plein texte classée dans l'historique des prompts et réponses
+
+        Args:
+            query (str): Texte recherché
+            platform (str, optional): Filtrer par plateforme
+            operation_type (str, optional): Filtrer par type d'opération
+            scope (str): 'all', 'prompts' ou 'responses'
+            limit (int): Nombre de résultats par page
+            offset (int): Décalage de la page
+            highlight (tuple): Balises encadrant les termes trouvés dans l'extrait
+            snippet_tokens (int): Nombre de mots de l'extrait
+
+        Returns:
+            dict: Résultats (classés par pertinence bm25), offset, limit et présence d'une page suivante
+        """
+        page = {'results': [], 'offset': offset, 'limit': limit, 'has_more': False}
+
+        match = self._build_fts_query(query)
+        if match is None:
+            return page
+
+        filters = ""
+        filter_params = []
+        if platform:
+            filters += " AND s.platform_name = ?"
+            filter_params.append(platform)
+        if operation_type:
+            filters += " AND p.operation_type = ?"
+            filter_params.append(operation_type)
+
+        start, end = highlight
+        parts = []
+        params = []
+
+        if scope in ('all', 'prompts'):
+            parts.append(f'''
+                SELECT p.id AS prompt_id, NULL AS response_id, 'prompt' AS source,
+                       p.timestamp, s.platform_name AS platform, p.operation_type,
+                       snippet(blobs_fts, 0, ?, ?, '…', ?) AS snippet,
+                       bm25(blobs_fts) AS rank
+                FROM blobs_fts
+                JOIN prompts p ON p.content_blob_id = blobs_fts.rowid
+                LEFT JOIN ai_sessions s ON s.id = p.session_id
+                WHERE blobs_fts MATCH ?{filters}
+            ''')
+            params += [start, end, snippet_tokens, match] + filter_params
+
+        if scope in ('all', 'responses'):
+            parts.append(f'''
+                SELECT r.prompt_id AS prompt_id, r.id AS response_id, 'response' AS source,
+                       r.timestamp, s.platform_name AS platform, p.operation_type,
+                       snippet(blobs_fts, 0, ?, ?, '…', ?) AS snippet,
+                       bm25(blobs_fts) AS rank
+                FROM blobs_fts
+                JOIN responses r ON r.content_blob_id = blobs_fts.rowid
+                LEFT JOIN prompts p ON p.id = r.prompt_id
+                LEFT JOIN ai_sessions s ON s.id = p.session_id
+                WHERE blobs_fts MATCH ?{filters}
+            ''')
+            params += [start, end, snippet_tokens, match] + filter_params
+
+        if not parts:
+            raise DatabaseError(f"Portée de recherche invalide: {scope}")
+
+        # Une ligne de plus que la page pour savoir s'il existe une page suivante
+        sql = " UNION ALL ".join(parts) + " ORDER BY rank LIMIT ? OFFSET ?"
+        params += [limit + 1, offset]
+
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche dans l'historique: {str(e)}")
+            raise DatabaseError(f"Échec de la recherche dans l'historique: {str(e)}")
+
+        page['has_more'] = len(rows) > limit
+        page['results'] = [dict(row) for row in rows[:limit]]
+        return page
+
+    def get_prompts(self, platform=None, operation_type=None, search=None, limit=None, offset=0):
+        """
+        Récupère l'historique des prompts, du plus récent au plus ancien
+
+        Args:
+            platform (str, optional): Filtrer par plateforme
+            operation_type (str, optional): Filtrer par type d'opération
+            search (str, optional): Texte recherché dans le prompt ou ses réponses (index FTS5)
+            limit (int, optional): Nombre maximum de prompts
+            offset (int): Décalage
+
+        Returns:
+            list: Liste des prompts (avec le nom de la plateforme)
+        """
+        try:
+            query = '''
+                    SELECT p.id, p.session_id, p.timestamp, blob_text(b.data, b.compressed) AS content,
+                           p.token_count, p.operation_type, s.platform_name AS platform
+                    FROM prompts p
+                    JOIN content_blobs b ON b.id = p.content_blob_id
+                    LEFT JOIN ai_sessions s ON s.id = p.session_id
+                    WHERE 1=1
+                    '''
+            params = []
+
+            if platform:
+                query += " AND s.platform_name = ?"
+                params.append(platform)
+
+            if operation_type:
+                query += " AND p.operation_type = ?"
+                params.append(operation_type)
+
+            if search:
+                match = self._build_fts_query(search)
+                if match is not None:
+                    query += '''
+                             AND p.id IN (SELECT pm.id FROM prompts pm
+                                          WHERE pm.content_blob_id IN
+                                                (SELECT rowid FROM blobs_fts WHERE blobs_fts MATCH ?)
+                                          UNION
+                                          SELECT r.prompt_id FROM responses r
+                                          WHERE r.content_blob_id IN
+                                                (SELECT rowid FROM blobs_fts WHERE blobs_fts MATCH ?))
+                             '''
+                    params += [match, match]
+
+            query += " ORDER BY p.timestamp DESC, p.id DESC"
+
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                params += [limit, offset]
+
+            return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des prompts: {str(e)}")
+            raise DatabaseError(f"Échec de la récupération des prompts: {str(e)}")
+
+    def get_prompt(self, prompt_id):
+        """
+        Récupère un prompt avec sa dernière réponse
+
+        Args:
+            prompt_id (int): ID du prompt
+
+        Returns:
+            dict: Prompt (avec plateforme, réponse et statut) ou None s'il n'existe pas
+        """
+        try:
+            row = self.conn.execute('''
+                                    SELECT p.id, p.session_id, p.timestamp,
+                                           blob_text(b.data, b.compressed) AS content,
+                                           p.token_count, p.operation_type, s.platform_name AS platform
+                                    FROM prompts p
+                                    JOIN content_blobs b ON b.id = p.content_blob_id
+                                    LEFT JOIN ai_sessions s ON s.id = p.session_id
+                                    WHERE p.id = ?
+                                    ''', (prompt_id,)).fetchone()
+            if row is None:
+                return None
+
+            prompt = dict(row)
+
+            response = self.conn.execute('''
+                                         SELECT r.id, blob_text(b.data, b.compressed) AS content,
+                                                r.status, r.timestamp
+                                         FROM responses r
+                                         JOIN content_blobs b ON b.id = r.content_blob_id
+                                         WHERE r.prompt_id = ?
+                                         ORDER BY r.id DESC
+                                         LIMIT 1
+                                         ''', (prompt_id,)).fetchone()
+
+            prompt['response'] = response['content'] if response else ''
+            prompt['status'] = response['status'] if response else ''
+            prompt['response_timestamp'] = response['timestamp'] if response else ''
+            return prompt
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération du prompt {prompt_id}: {str(e)}")
+            raise DatabaseError(f"Échec de la récupération du prompt: {str(e)}")
+
+    def delete_prompt(self, prompt_id):
+        """
+        Supprime un prompt et ses réponses, puis les blobs de contenu devenus orphelins
+
+        Args:
+            prompt_id (int): ID du prompt
+
+        Returns:
+            bool: True si le prompt a été supprimé
+        """
+        try:
+            with self.transaction() as conn:
+                blob_ids = [row[0] for row in conn.execute('''
+                                                           SELECT content_blob_id FROM prompts WHERE id = ?
+                                                           UNION
+                                                           SELECT content_blob_id FROM responses WHERE prompt_id = ?
+                                                           ''', (prompt_id, prompt_id))]
+
+                conn.execute("DELETE FROM responses WHERE prompt_id = ?", (prompt_id,))
+                cursor = conn.execute("DELETE FROM prompts WHERE id = ?", (prompt_id,))
+                deleted = cursor.rowcount > 0
+
+                # Les blobs partagés avec d'autres prompts sont conservés
+                release_blobs(conn, blob_ids)
+
+            if deleted:
+                logger.info(f"Prompt {prompt_id} supprimé")
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la suppression du prompt {prompt_id}: {str(e)}")
+            raise DatabaseError(f"Échec de la suppression du prompt: {str(e)}")
+
+    # =====================================================
+    # LISTES PAGINÉES (PAR CLÉ)
+    # =====================================================
+
+    def list_prompts_page(self, cursor=None, page_size=100, platform=None, operation_type=None, search=None,
+                          descending=True):
+        """
+        Récupère une page de prompts (lignes légères, sans contenu)
+
+        Args:
+            cursor (tuple, optional): next_cursor de la page précédente (None = première page)
+            page_size (int): Nombre de lignes par page
+            platform (str, optional): Filtrer par plateforme
+            operation_type (str, optional): Filtrer par type d'opération
+            search (str, optional): Texte recherché dans le prompt ou ses réponses (index FTS5)
+            descending (bool): Du plus récent au plus ancien
+
+        Returns:
+            Page: Lignes PromptRow et curseur de la page suivante
+        """
+        query = '''
+                SELECT p.id, p.timestamp, p.session_id, s.platform_name, p.operation_type,
+                       p.token_count, p.duration_ms, p.outcome_code
+                FROM prompts p
+                LEFT JOIN ai_sessions s ON s.id = p.session_id
+                WHERE 1=1
+                '''
+        params = []
+
+        if platform:
+            query += " AND p.session_id IN (SELECT id FROM ai_sessions WHERE platform_name = ?)"
+            params.append(platform)
+
+        if operation_type:
+            query += " AND p.operation_type = ?"
+            params.append(operation_type)
+
+        match = self._build_fts_query(search) if search else None
+        if match is not None:
+            query += '''
+                     AND p.id IN (SELECT pm.id FROM prompts pm
+                                  WHERE pm.content_blob_id IN
+                                        (SELECT rowid FROM blobs_fts WHERE blobs_fts MATCH ?)
+                                  UNION
+                                  SELECT r.prompt_id FROM responses r
+                                  WHERE r.content_blob_id IN
+                                        (SELECT rowid FROM blobs_fts WHERE blobs_fts MATCH ?))
+                     '''
+            params += [match, match]
+
+        condition, condition_params = keyset_condition('p.timestamp', 'p.id', cursor, descending)
+        query += condition + order_clause('p.timestamp', 'p.id', descending) + " LIMIT ?"
+        params += condition_params + [page_size + 1]
+
+        try:
+            rows = self.conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des prompts: {str(e)}")
+            raise DatabaseError(f"Échec de la pagination des prompts: {str(e)}")
+
+        return build_page(rows, page_size, PromptRow, ('timestamp', 'id'))
+
+    def list_responses_page(self, cursor=None, page_size=100, prompt_id=None, status=None, descending=True):
+        """
+        Récupère une page de réponses (lignes légères, sans contenu)
+
+        Args:
+            cursor (tuple, optional): next_cursor de la page précédente (None = première page)
+            page_size (int): Nombre de lignes par page
+            prompt_id (int, optional): Réponses d'un prompt
+            status (str, optional): Filtrer par statut
+            descending (bool): Du plus récent au plus ancien
+
+        Returns:
+            Page: Lignes ResponseRow et curseur de la page suivante
+        """
+        query = '''
+                SELECT id, timestamp, prompt_id, status, duration_ms, outcome_code
+                FROM responses
+                WHERE 1=1
+                '''
+        params = []
+
+        if prompt_id is not None:
+            query += " AND prompt_id = ?"
+            params.append(prompt_id)
+
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+
+        # Les ID de réponse croissent avec le temps : l'ID seul sert de clé (index de la table)
+        condition, condition_params = keyset_condition('id', 'id', cursor, descending)
+        query += condition + order_clause('id', 'id', descending) + " LIMIT ?"
+        params += condition_params + [page_size + 1]
+
+        try:
+            rows = self.conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des réponses: {str(e)}")
+            raise DatabaseError(f"Échec de la pagination des réponses: {str(e)}")
+
+        return build_page(rows, page_size, ResponseRow, ('id', 'id'))
+
+    def list_datasets_page(self, cursor=None, page_size=100, dataset_type=None, format=None, name=None,
+                           descending=True):
+        """
+        Récupère une page de datasets
+
+        Args:
+            cursor (tuple, optional): next_cursor de la page précédente (None = première page)
+            page_size (int): Nombre de lignes par page
+            dataset_type (str, optional): Filtrer par type
+            format (str, optional): Filtrer par format
+            name (str, optional): Texte contenu dans le nom
+            descending (bool): Du plus récent au plus ancien
+
+        Returns:
+            Page: Lignes DatasetRow et curseur de la page suivante
+        """
+        query = '''
+                SELECT id, creation_date, name, type, format, item_count, filepath
+                FROM datasets
+                WHERE 1=1
+                '''
+        params = []
+
+        if dataset_type:
+            query += " AND type = ?"
+            params.append(dataset_type)
+
+        if format:
+            query += " AND format = ?"
+            params.append(format)
+
+        if name:
+            query += " AND name LIKE ? ESCAPE '\\'"
+            escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+
+        condition, condition_params = keyset_condition('creation_date', 'id', cursor, descending)
+        query += condition + order_clause('creation_date', 'id', descending) + " LIMIT ?"
+        params += condition_params + [page_size + 1]
+
+        try:
+            rows = self.conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de la pagination des datasets: {str(e)}")
+            raise DatabaseError(f"Échec de la pagination des datasets: {str(e)}")
+
+        return build_page(rows, page_size, DatasetRow, ('creation_date', 'id'))
+
+    def get_prompt_previews(self, prompt_ids, length=80):
+        """
+        Récupère les aperçus de contenu d'une page de prompts (chargement paresseux)
+
+        Args:
+            prompt_ids (list): IDs des prompts affichés
+            length (int): Longueur maximale de l'aperçu
+
+        Returns:
+            dict: {id du prompt: aperçu}
+        """
+        prompt_ids = list(prompt_ids)
+        if not prompt_ids:
+            return {}
+
+        placeholders = ', '.join('?' * len(prompt_ids))
+        try:
+            rows = self.conn.execute(f'''
+                                     SELECT p.id, substr(blob_text(b.data, b.compressed), 1, ?) AS preview
+                                     FROM prompts p
+                                     JOIN content_blobs b ON b.id = p.content_blob_id
+                                     WHERE p.id IN ({placeholders})
+                                     ''', [length] + prompt_ids).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des aperçus: {str(e)}")
+            raise DatabaseError(f"Échec de la récupération des aperçus: {str(e)}")
+
+        return {row['id']: row['preview'] for row in rows}
+
+    def iter_prompt_history(self, platform=None, operation_type=None, date_from=None, date_to=None,
+                            batch_size=500):
+        """
+        Parcourt l'historique des prompts par lots, du plus ancien au plus récent
+
+        Chaque lot reprend après le dernier prompt lu (pagination par clé) : la mémoire
+        consommée ne dépend pas de la taille de l'historique et aucune transaction de lecture
+        ne reste ouverte entre deux lots.
+
+        Args:
+            platform (str, optional): Filtrer par plateforme
+            operation_type (str, optional): Filtrer par type d'opération
+            date_from (str, optional): Date ISO de début (incluse)
+            date_to (str, optional): Date ISO de fin (exclue)
+            batch_size (int): Nombre de prompts lus par requête
+
+        Yields:
+            dict: Prompt avec son contenu et sa dernière réponse
+        """
+        query = '''
+                SELECT p.id, p.session_id, p.timestamp, s.platform_name AS platform, p.operation_type,
+                       p.token_count, p.duration_ms, p.outcome_code,
+                       blob_text(b.data, b.compressed) AS content,
+                       (SELECT blob_text(rb.data, rb.compressed)
+                        FROM responses r
+                        JOIN content_blobs rb ON rb.id = r.content_blob_id
+                        WHERE r.prompt_id = p.id
+                        ORDER BY r.id DESC LIMIT 1) AS response
+                FROM prompts p
+                JOIN content_blobs b ON b.id = p.content_blob_id
+                LEFT JOIN ai_sessions s ON s.id = p.session_id
+                WHERE 1=1
+                '''
+        params = []
+
+        if platform:
+            query += " AND p.session_id IN (SELECT id FROM ai_sessions WHERE platform_name = ?)"
+            params.append(platform)
+
+        if operation_type:
+            query += " AND p.operation_type = ?"
+            params.append(operation_type)
+
+        if date_from:
+            query += " AND p.timestamp >= ?"
+            params.append(date_from)
+
+        if date_to:
+            query += " AND p.timestamp < ?"
+            params.append(date_to)
+
+        cursor = None
+        while True:
+            condition, condition_params = keyset_condition('p.timestamp', 'p.id', cursor, descending=False)
+            try:
+                rows = self.conn.execute(query + condition + order_clause('p.timestamp', 'p.id', False) + " LIMIT ?",
+                                         params + condition_params + [batch_size]).fetchall()
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture de l'historique: {str(e)}")
+                raise DatabaseError(f"Échec de la lecture de l'historique: {str(e)}")
+
+            for row in rows:
+                yield dict(row)
+
+            if len(rows) < batch_size:
+                break
+            cursor = (rows[-1]['timestamp'], rows[-1]['id'])
+
+    def count_prompts(self, platform=None, operation_type=None, date_from=None, date_to=None):
+        """
+        Compte les prompts de l'historique (mêmes filtres que iter_prompt_history)
+
+        Returns:
+            int: Nombre de prompts
+        """
+        query = "SELECT COUNT(*) FROM prompts p WHERE 1=1"
+        params = []
+
+        if platform:
+            query += " AND p.session_id IN (SELECT id FROM ai_sessions WHERE platform_name = ?)"
+            params.append(platform)
+
+        if operation_type:
+            query += " AND p.operation_type = ?"
+            params.append(operation_type)
+
+        if date_from:
+            query += " AND p.timestamp >= ?"
+            params.append(date_from)
+
+        if date_to:
+            query += " AND p.timestamp < ?"
+            params.append(date_to)
+
+        try:
+            return self.conn.execute(query, params).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des prompts: {str(e)}")
+            raise DatabaseError(f"Échec du comptage des prompts: {str(e)}")
+
+    def get_all_datasets(self):
+        """
+        Récupère la liste des datasets enregistrés, du plus récent au plus ancien
+
+        Returns:
+            list: Liste des datasets (created_at = date de création)
+        """
+        try:
+            rows = self.conn.execute('''
+                                     SELECT id, name, creation_date AS created_at, type, format,
+                                            item_count, filepath
+                                     FROM datasets
+                                     ORDER BY creation_date DESC, id DESC
+                                     ''').fetchall()
+            return [dict(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des datasets: {str(e)}")
+            raise DatabaseError(f"Échec de la récupération des datasets: {str(e)}")
+
     def get_session_stats(self, platform_name=None, date_from=None, date_to=None):
         """
         Récupère les statistiques des sessions
@@ -1095,6 +1462,88 @@ class Database:
             logger.error(f"Erreur lors de la récupération des statistiques: {str(e)}")
             raise DatabaseError(f"Échec de la récupération des statistiques: {str(e)}")
 
+    def get_usage_aggregates(self, granularity='day', date_from=None, date_to=None, platform=None,
+                             operation_type=None, group_by=('platform',), percentiles=(0.5, 0.9, 0.99)):
+        """
+        Agrège l'activité depuis les tables de cumul (sans parcourir l'historique)
+
+        Args:
+            granularity (str): 'hour' ou 'day' (table de cumul interrogée)
+            date_from (str, optional): Début de la période (ISO, inclus)
+            date_to (str, optional): Fin de la période (ISO, inclus)
+            platform (str, optional): Filtrer par plateforme
+            operation_type (str, optional): Filtrer par type d'opération
+            group_by (tuple): Dimensions parmi 'bucket', 'platform', 'operation_type'
+            percentiles (tuple): Percentiles de latence à estimer (0-1)
+
+        Returns:
+            list: Agrégats par groupe (requêtes, succès, taux de succès, tokens, latences)
+        """
+        table = ROLLUP_TABLES.get(granularity)
+        if table is None:
+            raise DatabaseError(f"Granularité invalide: {granularity}")
+
+        dimensions = [d for d in group_by if d in ('bucket', 'platform', 'operation_type')]
+        if len(dimensions) != len(group_by):
+            raise DatabaseError(f"Dimension de regroupement invalide: {group_by}")
+
+        query = f'''
+                SELECT {''.join(d + ', ' for d in dimensions)}
+                       SUM(request_count) AS request_count,
+                       SUM(success_count) AS success_count,
+                       SUM(token_count) AS token_count,
+                       SUM(duration_count) AS duration_count,
+                       SUM(duration_sum_ms) AS duration_sum_ms,
+                       MAX(duration_max_ms) AS duration_max_ms,
+                       sketch_merge(latency_sketch) AS latency_sketch
+                FROM {table}
+                WHERE 1=1
+                '''
+        params = []
+
+        if date_from:
+            query += " AND bucket >= ?"
+            params.append(bucket_for(date_from, granularity))
+
+        if date_to:
+            query += " AND bucket <= ?"
+            params.append(bucket_for(date_to, granularity))
+
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+
+        if operation_type:
+            query += " AND operation_type = ?"
+            params.append(operation_type)
+
+        if dimensions:
+            query += f" GROUP BY {', '.join(dimensions)} ORDER BY {', '.join(dimensions)}"
+
+        try:
+            rows = self.conn.execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lors de l'agrégation des statistiques: {str(e)}")
+            raise DatabaseError(f"Échec de l'agrégation des statistiques: {str(e)}")
+
+        aggregates = []
+        for row in rows:
+            if not row['request_count']:
+                continue
+
+            entry = dict(row)
+            sketch = LatencySketch.from_json(entry.pop('latency_sketch'))
+
+            entry['success_rate'] = entry['success_count'] / entry['request_count']
+            entry['avg_duration_ms'] = (entry['duration_sum_ms'] / entry['duration_count']
+                                        if entry['duration_count'] else None)
+            for p in percentiles:
+                entry[f"latency_p{int(round(p * 100))}_ms"] = sketch.percentile(p)
+
+            aggregates.append(entry)
+
+        return aggregates
+
     def record_dataset(self, name, dataset_type, format, item_count, filepath):
         """
         Enregistre un dataset généré
@@ -1128,6 +1577,178 @@ class Database:
             logger.error(f"Erreur lors de l'enregistrement du dataset: {str(e)}")
             raise DatabaseError(f"Échec de l'enregistrement du dataset: {str(e)}")
 
+    # =====================================================
+    # ÉLÉMENTS DE DATASETS
+    # =====================================================
+
+    @staticmethod
+    def _encode_item(value):
+        """Sérialise un élément de dataset en JSON compact"""
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+    def add_dataset_items(self, dataset_id, items, start_index=None, batch_size=500):
+        """
+        Ajoute des éléments à un dataset par insertions groupées (executemany)
+
+        Chaque lot est validé séparément : les éléments déjà insérés sont consultables
+        pendant la génération et la mémoire consommée ne dépend pas de la taille du dataset
+        (items peut être un générateur).
+
+        Args:
+            dataset_id (int): ID du dataset
+            items (iterable): Éléments (dict, list ou texte)
+            start_index (int, optional): Position du premier élément (à la suite des existants par défaut)
+            batch_size (int): Nombre d'éléments par transaction
+
+        Returns:
+            int: Nombre d'éléments insérés
+        """
+        try:
+            if start_index is None:
+                row = self.conn.execute('''
+                                        SELECT COALESCE(MAX(item_index) + 1, 0) FROM dataset_items
+                                        WHERE dataset_id = ?
+                                        ''', (dataset_id,)).fetchone()
+                start_index = row[0]
+
+            inserted = 0
+            iterator = iter(items)
+            while True:
+                batch = [(dataset_id, start_index + inserted + offset, self._encode_item(item))
+                         for offset, item in enumerate(islice(iterator, batch_size))]
+                if not batch:
+                    break
+
+                with self.transaction() as conn:
+                    # Les positions déjà présentes sont remplacées sans être recomptées
+                    replaced = conn.execute('''
+                                            SELECT COUNT(*) FROM dataset_items
+                                            WHERE dataset_id = ? AND item_index BETWEEN ? AND ?
+                                            ''', (dataset_id, batch[0][1], batch[-1][1])).fetchone()[0]
+                    conn.executemany('''
+                                     INSERT OR REPLACE INTO dataset_items (dataset_id, item_index, data)
+                                     VALUES (?, ?, ?)
+                                     ''', batch)
+                    conn.execute('''
+                                 UPDATE datasets SET item_count = item_count + ?
+                                 WHERE id = ?
+                                 ''', (len(batch) - replaced, dataset_id))
+                inserted += len(batch)
+
+            logger.debug(f"Dataset {dataset_id}: {inserted} élément(s) ajouté(s)")
+            return inserted
+
+        except Exception as e:
+            logger.error(f"Erreur lors de l'ajout d'éléments au dataset {dataset_id}: {str(e)}")
+            raise DatabaseError(f"Échec de l'ajout des éléments: {str(e)}")
+
+    def iter_dataset_items(self, dataset_id, batch_size=500, annotation_status=None, decode=True):
+        """
+        Parcourt les éléments d'un dataset par lots, sans les charger tous en mémoire
+
+        Chaque lot est relu à partir de la dernière position vue : aucune transaction de
+        lecture ne reste ouverte pendant le traitement des éléments par l'appelant.
+
+        Args:
+            dataset_id (int): ID du dataset
+            batch_size (int): Nombre d'éléments lus par requête
+            annotation_status (str, optional): Filtrer par statut d'annotation ('pending' = non annotés)
+            decode (bool): Décoder les éléments (JSON brut sinon)
+
+        Yields:
+            dict: item_index, data, annotation, annotation_status, annotated_at
+        """
+        query = '''
+                SELECT item_index, data, annotation, annotation_status, annotated_at
+                FROM dataset_items
+                WHERE dataset_id = ? AND item_index > ?
+                '''
+        params = [dataset_id]
+
+        if annotation_status == 'pending':
+            query += " AND annotation_status IS NULL"
+        elif annotation_status:
+            query += " AND annotation_status = ?"
+            params.append(annotation_status)
+
+        query += " ORDER BY item_index LIMIT ?"
+
+        last_index = -1
+        while True:
+            try:
+                rows = self.conn.execute(query, [params[0], last_index] + params[1:] + [batch_size]).fetchall()
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture des éléments du dataset {dataset_id}: {str(e)}")
+                raise DatabaseError(f"Échec de la lecture des éléments: {str(e)}")
+
+            for row in rows:
+                item = dict(row)
+                if decode:
+                    item['data'] = json.loads(item['data'])
+                yield item
+
+            if len(rows) < batch_size:
+                break
+            last_index = rows[-1]['item_index']
+
+    def record_item_annotations(self, dataset_id, annotations):
+        """
+        Enregistre les annotations d'un lot d'éléments (executemany)
+
+        Args:
+            dataset_id (int): ID du dataset
+            annotations (iterable): Tuples (item_index, annotation, statut)
+
+        Returns:
+            int: Nombre d'éléments mis à jour
+        """
+        now = datetime.now().isoformat()
+        # Les annotations textuelles (réponses brutes) sont conservées telles quelles
+        rows = [(annotation if annotation is None or isinstance(annotation, str) else self._encode_item(annotation),
+                 status, now, dataset_id, item_index)
+                for item_index, annotation, status in annotations]
+        if not rows:
+            return 0
+
+        try:
+            with self.transaction() as conn:
+                conn.executemany('''
+                                 UPDATE dataset_items
+                                 SET annotation = ?, annotation_status = ?, annotated_at = ?
+                                 WHERE dataset_id = ? AND item_index = ?
+                                 ''', rows)
+            return len(rows)
+
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des annotations du dataset {dataset_id}: {str(e)}")
+            raise DatabaseError(f"Échec de l'enregistrement des annotations: {str(e)}")
+
+    def count_dataset_items(self, dataset_id, annotation_status=None):
+        """
+        Compte les éléments d'un dataset
+
+        Args:
+            dataset_id (int): ID du dataset
+            annotation_status (str, optional): Filtrer par statut d'annotation ('pending' = non annotés)
+
+        Returns:
+            int: Nombre d'éléments
+        """
+        query = "SELECT COUNT(*) FROM dataset_items WHERE dataset_id = ?"
+        params = [dataset_id]
+
+        if annotation_status == 'pending':
+            query += " AND annotation_status IS NULL"
+        elif annotation_status:
+            query += " AND annotation_status = ?"
+            params.append(annotation_status)
+
+        try:
+            return self.conn.execute(query, params).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des éléments du dataset {dataset_id}: {str(e)}")
+            raise DatabaseError(f"Échec du comptage des éléments: {str(e)}")
+
     def create_brainstorming_session(self, name, ai_platforms, context):
         """
         Crée une nouvelle session de brainstorming
@@ -1,10 +1,11 @@
 import os
 import json
 import csv
-import pandas as pd
 from datetime import datetime
 from utils.logger import logger
 from utils.exceptions import ExportError
+from core.data.streaming import STREAM_WRITERS, write_csv
+from core.data.columnar import write_parquet, write_xlsx, prompt_history_schema
 
 
 class DataExporter:
@@ -28,6 +29,45 @@ class DataExporter:
 
         logger.info(f"Exportateur initialisé: {self.export_dir}")
 
+    def stream_export(self, rows, name, format='jsonl', compress=False, progress=None, total=None,
+                      fieldnames=None, schema=None):
+        """
+        Exporte des lignes au fil de l'eau (mémoire indépendante du nombre de lignes)
+
+        Args:
+            rows (iterable): Lignes à exporter (itérateur, curseur de base de données...)
+            name (str): Préfixe du nom de fichier
+            format (str): 'jsonl', 'json', 'csv', 'parquet' (pyarrow) ou 'xlsx' (openpyxl)
+            compress (bool): Compresser la sortie avec gzip (formats texte ; Parquet et XLSX
+                sont compressés nativement)
+            progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+            total (int, optional): Nombre total de lignes, s'il est connu
+            fieldnames (list, optional): Colonnes CSV/XLSX (celles de la première ligne par défaut)
+            schema (pyarrow.Schema, optional): Schéma Parquet (déduit du premier groupe par défaut)
+
+        Returns:
+            str: Chemin du fichier exporté
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = os.path.join(self.export_dir, f"{name}_{timestamp}.{format}")
+        options = {'progress': progress, 'total': total}
+
+        if format == 'parquet':
+            filepath, count = write_parquet(rows, filepath, schema=schema, **options)
+        elif format == 'xlsx':
+            filepath, count = write_xlsx(rows, filepath, fieldnames=fieldnames, **options)
+        else:
+            writer = STREAM_WRITERS.get(format)
+            if writer is None:
+                raise ExportError(f"Format non supporté: {format}")
+
+            options['compress'] = compress
+            if format == 'csv':
+                options['fieldnames'] = fieldnames
+            filepath, count = writer(rows, filepath, **options)
+        logger.debug(f"{count} ligne(s) exportée(s) vers {filepath}")
+        return filepath
+
     def export_brainstorming_results(self, session_data, solutions, format='json'):
         """
         Exporte les résultats d'une session de brainstorming
@@ -61,46 +101,35 @@ class DataExporter:
                 filename = f"brainstorming_{session_id}_{timestamp}.csv"
                 filepath = os.path.join(self.export_dir, filename)
 
-                # Créer un DataFrame pour l'exportation CSV
-                rows = []
-                for solution in solutions:
-                    row = {
-                        'platform': solution.get('platform'),
-                        'content': solution.get('content', '').replace('\n', ' '),
-                        'score': solution.get('score', ''),
-                        'evaluations': json.dumps(solution.get('evaluations', {}))
-                    }
-                    rows.append(row)
+                rows = ({
+                    'platform': solution.get('platform'),
+                    'content': solution.get('content', '').replace('\n', ' '),
+                    'score': solution.get('score', ''),
+                    'evaluations': json.dumps(solution.get('evaluations', {}))
+                } for solution in solutions)
 
-                df = pd.DataFrame(rows)
-                df.to_csv(filepath, index=False, encoding='utf-8')
+                write_csv(rows, filepath, fieldnames=['platform', 'content', 'score', 'evaluations'])
 
             elif format == 'xlsx':
                 filename = f"brainstorming_{session_id}_{timestamp}.xlsx"
                 filepath = os.path.join(self.export_dir, filename)
 
-                # Créer un DataFrame pour l'exportation Excel
-                rows = []
+                # Une colonne par évaluateur (les solutions d'une session sont peu nombreuses)
+                evaluators = []
                 for solution in solutions:
-                    row = {
-                        'Platform': solution.get('platform'),
-                        'Solution': solution.get('content', ''),
-                        'Score': solution.get('score', ''),
-                    }
-
-                    # Ajouter les évaluations comme colonnes séparées
-                    for evaluator, evaluation in solution.get('evaluations', {}).items():
-                        row[f'Evaluation_{evaluator}'] = evaluation
+                    for evaluator in solution.get('evaluations', {}):
+                        if evaluator not in evaluators:
+                            evaluators.append(evaluator)
 
-                    rows.append(row)
+                rows = ([solution.get('platform'), solution.get('content', ''), solution.get('score', '')] +
+                        [solution.get('evaluations', {}).get(evaluator) for evaluator in evaluators]
+                        for solution in solutions)
 
-                df = pd.DataFrame(rows)
-                with pd.ExcelWriter(filepath) as writer:
-                    df.to_excel(writer, sheet_name='Brainstorming', index=False)
-
-                    # Ajouter une feuille avec les métadonnées
-                    metadata_df = pd.DataFrame([session_data])
-                    metadata_df.to_excel(writer, sheet_name='Session_Info', index=False)
+                # Feuille des solutions et feuille des métadonnées de la session
+                write_xlsx(rows, filepath,
+                           fieldnames=['Platform', 'Solution', 'Score'] +
+                                      [f'Evaluation_{evaluator}' for evaluator in evaluators],
+                           sheet_name='Brainstorming', extra_sheets={'Session_Info': [session_data]})
 
             else:
                 raise ExportError(f"Format non supporté: {format}")
@@ -112,40 +141,33 @@ class DataExporter:
             logger.error(f"Erreur lors de l'exportation du brainstorming: {str(e)}")
             raise ExportError(f"Échec de l'exportation: {str(e)}")
 
-    def export_dataset(self, dataset_id, content, format='json'):
+    def export_dataset(self, dataset_id, content, format='json', compress=False, progress=None):
         """
         Exporte un dataset
 
         Args:
             dataset_id (int): ID du dataset
-            content (dict): Contenu du dataset
-            format (str): Format d'exportation
+            content (dict|iterable): Contenu du dataset (une liste ou un itérateur de lignes est
+                écrit au fil de l'eau)
+            format (str): Format d'exportation ('json', 'jsonl', 'csv', 'parquet', 'xlsx')
+            compress (bool): Compresser la sortie avec gzip
+            progress (callable, optional): Appelée avec (lignes écrites, total ou None)
 
         Returns:
             str: Chemin du fichier exporté
         """
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            if format == 'json':
-                filename = f"dataset_{dataset_id}_{timestamp}.json"
-                filepath = os.path.join(self.export_dir, filename)
+            if isinstance(content, dict):
+                if format != 'json':
+                    raise ExportError("Le contenu doit être une liste pour l'exportation " + format.upper())
 
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filepath = os.path.join(self.export_dir, f"dataset_{dataset_id}_{timestamp}.json")
                 with open(filepath, 'w', encoding='utf-8') as f:
                     json.dump(content, f, indent=2, ensure_ascii=False)
-
-            elif format == 'csv':
-                filename = f"dataset_{dataset_id}_{timestamp}.csv"
-                filepath = os.path.join(self.export_dir, filename)
-
-                if isinstance(content, list):
-                    df = pd.DataFrame(content)
-                    df.to_csv(filepath, index=False, encoding='utf-8')
-                else:
-                    raise ExportError("Le contenu doit être une liste pour l'exportation CSV")
-
             else:
-                raise ExportError(f"Format non supporté: {format}")
+                total = len(content) if isinstance(content, list) else None
+                filepath = self.stream_export(content, f"dataset_{dataset_id}", format, compress, progress, total)
 
             logger.info(f"Dataset {dataset_id} exporté: {filepath}")
             return filepath
@@ -154,40 +176,88 @@ class DataExporter:
             logger.error(f"Erreur lors de l'exportation du dataset: {str(e)}")
             raise ExportError(f"Échec de l'exportation: {str(e)}")
 
-    def export_prompt_history(self, prompts, format='json'):
+    def export_dataset_items(self, database, dataset_id, format='jsonl', compress=False, progress=None,
+                             include_annotations=False):
         """
-        Exporte l'historique des prompts
+        Exporte un dataset stocké en base, élément par élément
 
         Args:
-            prompts (list): Liste des prompts
-            format (str): Format d'exportation
+            database (Database): Base contenant les éléments
+            dataset_id (int): ID du dataset
+            format (str): Format d'exportation ('jsonl', 'json', 'csv', 'parquet', 'xlsx')
+            compress (bool): Compresser la sortie avec gzip
+            progress (callable, optional): Appelée avec (lignes écrites, total)
+            include_annotations (bool): Exporter aussi les annotations (item_index, data, annotation, statut)
 
         Returns:
             str: Chemin du fichier exporté
         """
         try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            items = database.iter_dataset_items(dataset_id)
+            fieldnames = None
+            if include_annotations:
+                rows = ({key: item[key] for key in ('item_index', 'data', 'annotation', 'annotation_status')}
+                        for item in items)
+            else:
+                rows = (item['data'] for item in items)
+                if format in ('csv', 'xlsx'):
+                    # En-tête fixé avant l'écriture : union des clés de tous les éléments
+                    fieldnames = self._dataset_fieldnames(database, dataset_id)
 
-            if format == 'json':
-                filename = f"prompt_history_{timestamp}.json"
-                filepath = os.path.join(self.export_dir, filename)
+            filepath = self.stream_export(rows, f"dataset_{dataset_id}", format, compress, progress,
+                                          database.count_dataset_items(dataset_id), fieldnames=fieldnames)
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(prompts, f, indent=2, ensure_ascii=False)
+            logger.info(f"Dataset {dataset_id} exporté: {filepath}")
+            return filepath
 
-            elif format == 'csv':
-                filename = f"prompt_history_{timestamp}.csv"
-                filepath = os.path.join(self.export_dir, filename)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'exportation du dataset: {str(e)}")
+            raise ExportError(f"Échec de l'exportation: {str(e)}")
 
-                df = pd.DataFrame(prompts)
-                df.to_csv(filepath, index=False, encoding='utf-8')
+    def _dataset_fieldnames(self, database, dataset_id):
+        """
+        Colonnes d'un dataset stocké : clés de tous ses éléments, dans l'ordre d'apparition
 
-            else:
-                raise ExportError(f"Format non supporté: {format}")
+        Args:
+            database (Database): Base contenant les éléments
+            dataset_id (int): ID du dataset
+
+        Returns:
+            list: Colonnes, ou None si les éléments ne sont pas des dictionnaires
+        """
+        columns = {}
+        for item in database.iter_dataset_items(dataset_id):
+            if not isinstance(item['data'], dict):
+                return None
+            columns.update(dict.fromkeys(item['data']))
+        return list(columns) or None
+
+    def export_prompt_history(self, prompts, format='json', compress=False, progress=None, total=None):
+        """
+        Exporte l'historique des prompts
+
+        Args:
+            prompts (iterable): Prompts (liste, ou itérateur tel que Database.iter_prompt_history)
+            format (str): Format d'exportation ('json', 'jsonl', 'csv', 'parquet', 'xlsx')
+            compress (bool): Compresser la sortie avec gzip
+            progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+            total (int, optional): Nombre de prompts, s'il est connu
+
+        Returns:
+            str: Chemin du fichier exporté
+        """
+        try:
+            if total is None and isinstance(prompts, list):
+                total = len(prompts)
+
+            # Parquet : colonnes typées (horodatage, entiers) et plateformes/opérations en catégories
+            schema = prompt_history_schema() if format == 'parquet' else None
+            filepath = self.stream_export(prompts, "prompt_history", format, compress, progress, total,
+                                          schema=schema)
 
             logger.info(f"Historique des prompts exporté: {filepath}")
             return filepath
 
         except Exception as e:
             logger.error(f"Erreur lors de l'exportation de l'historique: {str(e)}")
-            raise ExportError(f"Échec de l'exportation: {str(e)}")
\ No newline at end of file
+            raise ExportError(f"Échec de l'exportation: {str(e)}")
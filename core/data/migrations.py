@@ -9,18 +9,22 @@ class DatabaseMigration:
     Classe pour gérer les migrations de schéma de base de données
     """
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, on_connect=None):
         """
         Initialise le gestionnaire de migrations
 
         Args:
             db_path (str): Chemin vers le fichier de base de données
+            on_connect (callable, optional): Configuration appliquée à chaque connexion
+                (ex: déclaration de fonctions SQL utilisées par les migrations)
         """
         self.db_path = db_path
-        logger.info(f"Initialisation du gestionnaire de migrations pour {db_path}")
+        self.on_connect = on_connect
+        logger.debug(f"Initialisation du gestionnaire de migrations pour {db_path}")
 
-        # Table des versions pour suivre les migrations
-        self._ensure_migrations_table()
+        # La table des versions est créée à la première migration : une base à jour
+        # ne coûte qu'une lecture de version au démarrage
+        self._table_ready = False
 
     def _connect(self):
         """
@@ -30,8 +34,10 @@ class DatabaseMigration:
             sqlite3.Connection: Objet de connexion
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
             conn.row_factory = sqlite3.Row
+            if self.on_connect is not None:
+                self.on_connect(conn)
             return conn
         except Exception as e:
             logger.error(f"Erreur de connexion pour migration: {str(e)}")
@@ -69,8 +75,8 @@ class DatabaseMigration:
                            )
                            ''')
 
-            conn.commit()
             conn.close()
+            self._table_ready = True
             return True
 
         except Exception as e:
@@ -86,23 +92,34 @@ class DatabaseMigration:
         """
         try:
             conn = self._connect()
-            cursor = conn.cursor()
+            try:
+                return self._read_version(conn)
+            finally:
+                conn.close()
 
-            cursor.execute("SELECT MAX(version) as version FROM schema_migrations")
-            result = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de la version: {str(e)}")
+            return 0
 
-            conn.close()
+    def _read_version(self, conn):
+        """
+        Lit la version du schéma sur une connexion ouverte
 
-            if result and result['version'] is not None:
-                return result['version']
-            else:
+        Returns:
+            int: Numéro de version ou 0 si aucune migration (ou table absente)
+        """
+        try:
+            result = conn.execute("SELECT MAX(version) as version FROM schema_migrations").fetchone()
+        except sqlite3.OperationalError as e:
+            if 'no such table' in str(e):
                 return 0
+            raise
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération de la version: {str(e)}")
-            return 0
+        if result and result['version'] is not None:
+            return result['version']
+        return 0
 
-    def run_migration(self, version, queries, description=None):
+    def run_migration(self, version, queries, description=None, function=None):
         """
         Exécute une migration de schéma
 
@@ -110,32 +127,46 @@ class DatabaseMigration:
             version (int): Numéro de version
             queries (list): Liste des requêtes SQL à exécuter
             description (str, optional): Description de la migration
+            function (callable, optional): Migration de données (connexion) exécutée après
+                les requêtes, dans la même transaction
 
         Returns:
             bool: True si la migration est réussie
         """
         try:
-            current_version = self.get_current_version()
-
-            if version <= current_version:
-                logger.debug(f"Migration {version} déjà appliquée, ignorée")
-                return True
+            if not self._table_ready:
+                self._ensure_migrations_table()
 
             conn = self._connect()
-            cursor = conn.cursor()
-
-            # Exécuter les requêtes
-            for query in queries:
-                cursor.execute(query)
-
-            # Enregistrer la migration
-            cursor.execute('''
-                           INSERT INTO schema_migrations (version, applied_at, description)
-                           VALUES (?, datetime('now'), ?)
-                           ''', (version, description))
-
-            conn.commit()
-            conn.close()
+            try:
+                # Verrou d'écriture pris avant la relecture de la version : deux processus
+                # lancés en même temps n'appliquent pas deux fois la même migration
+                conn.execute("BEGIN IMMEDIATE")
+
+                if version <= self._read_version(conn):
+                    conn.rollback()
+                    logger.debug(f"Migration {version} déjà appliquée, ignorée")
+                    return True
+
+                # Exécuter les requêtes et enregistrer la migration dans la même transaction
+                for query in queries:
+                    conn.execute(query)
+
+                if function is not None:
+                    function(conn)
+
+                conn.execute('''
+                             INSERT INTO schema_migrations (version, applied_at, description)
+                             VALUES (?, datetime('now'), ?)
+                             ''', (version, description))
+
+                conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                conn.close()
 
             logger.info(f"Migration {version} appliquée avec succès")
             return True
@@ -149,7 +180,8 @@ class DatabaseMigration:
         Applique toutes les migrations nécessaires jusqu'à la dernière version
 
         Args:
-            migrations (dict): Dictionnaire de migrations {version: {queries: [], description: ""}}
+            migrations (dict): Dictionnaire de migrations
+                {version: {queries: [], description: "", function: callable (optionnel)}}
 
         Returns:
             int: Nombre de migrations appliquées
@@ -167,7 +199,8 @@ class DatabaseMigration:
                     self.run_migration(
                         version,
                         migration.get('queries', []),
-                        migration.get('description', f"Migration vers v{version}")
+                        migration.get('description', f"Migration vers v{version}"),
+                        migration.get('function')
                     )
                     applied_count += 1
 
@@ -192,8 +225,8 @@ class DatabaseMigration:
         Returns:
             str: Chemin du fichier de sauvegarde
         """
-        import shutil
         from datetime import datetime
+        from core.data.backup import BackupService
 
         try:
             if not os.path.exists(self.db_path):
@@ -206,8 +239,8 @@ class DatabaseMigration:
 
             backup_path = f"{self.db_path}.bak_{backup_suffix}"
 
-            # Copier le fichier
-            shutil.copy2(self.db_path, backup_path)
+            # Copie page par page via l'API de backup (base utilisable pendant la copie)
+            BackupService(self.db_path).backup_to(backup_path)
 
             logger.info(f"Sauvegarde créée: {backup_path}")
             return backup_path
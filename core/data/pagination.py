@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+# Lignes légères des listes paginées (les contenus se chargent à la demande)
+PromptRow = namedtuple('PromptRow', ['id', 'timestamp', 'session_id', 'platform', 'operation_type',
+                                     'token_count', 'duration_ms', 'outcome_code'])
+
+ResponseRow = namedtuple('ResponseRow', ['id', 'timestamp', 'prompt_id', 'status', 'duration_ms',
+                                         'outcome_code'])
+
+DatasetRow = namedtuple('DatasetRow', ['id', 'creation_date', 'name', 'type', 'format', 'item_count',
+                                       'filepath'])
+
+# Page de résultats : next_cursor est à repasser tel quel pour obtenir la page suivante
+Page = namedtuple('Page', ['rows', 'next_cursor'])
+
+
+def keyset_condition(sort_column, id_column, cursor, descending=True):
+    """
+    Construit la condition de reprise d'une pagination par clé (tri, id)
+
+    Le coût d'une page ne dépend pas de sa position : l'index (tri, id) est parcouru
+    à partir de la dernière ligne de la page précédente au lieu de sauter OFFSET lignes.
+
+    Args:
+        sort_column (str): Colonne de tri
+        id_column (str): Colonne d'identifiant (départage les égalités)
+        cursor (tuple): (valeur de tri, id) de la dernière ligne vue, ou None
+        descending (bool): Ordre décroissant
+
+    Returns:
+        tuple: (fragment SQL " AND ..." ou "", paramètres)
+    """
+    if cursor is None:
+        return "", []
+
+    operator = "<" if descending else ">"
+    return f" AND ({sort_column}, {id_column}) {operator} (?, ?)", [cursor[0], cursor[1]]
+
+
+def order_clause(sort_column, id_column, descending=True):
+    """Clause ORDER BY cohérente avec keyset_condition"""
+    direction = "DESC" if descending else "ASC"
+    return f" ORDER BY {sort_column} {direction}, {id_column} {direction}"
+
+
+def build_page(rows, page_size, row_type, cursor_fields):
+    """
+    Construit une page à partir de page_size + 1 lignes lues
+
+    Args:
+        rows (list): Lignes lues (une de plus que la page pour détecter la suite)
+        page_size (int): Taille de page
+        row_type (type): namedtuple des lignes
+        cursor_fields (tuple): Champs (tri, id) formant le curseur
+
+    Returns:
+        Page: Lignes et curseur de la page suivante (None en fin de liste)
+    """
+    items = [row_type(*row) for row in rows[:page_size]]
+    next_cursor = None
+    if len(rows) > page_size and items:
+        last = items[-1]
+        next_cursor = tuple(getattr(last, field) for field in cursor_fields)
+    return Page(items, next_cursor)
@@ -1,8 +1,326 @@
 import re
 import json
 import html
+import bisect
+import os
+from functools import lru_cache
 from utils.logger import logger
 from utils.exceptions import DatabaseError
+from utils.lazy_import import lazy_import
+
+# multiprocessing n'est chargé qu'au premier traitement parallèle (parse_many)
+concurrent_process = lazy_import('concurrent.futures.process')
+
+_CODE_FENCE = re.compile(r'```')
+
+# Nettoyage du texte : balises HTML, blocs de code, mise en forme markdown, espaces
+_HTML_TAG = re.compile(r'<[^>]+>')
+_CODE_BLOCK = re.compile(r'```.*?```', re.DOTALL)
+_MARKDOWN_EMPHASIS = re.compile(r'\*\*(.*?)\*\*|\*(.*?)\*|__(.*?)__')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+# Blocs de code avec leur langage
+_CODE_BLOCK_LANG = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
+
+# Éléments de listes numérotées ou à puces, en une passe sur toutes les lignes
+_LIST_ITEM = re.compile(r'^[^\S\n]*(?:\d+\.|[-*])[^\S\n]+(\S[^\n]*?)[^\S\n]*$', re.MULTILINE)
+
+# Au-delà de cette taille de lot, parse_many répartit le travail sur plusieurs processus
+PROCESS_POOL_THRESHOLD = 500
+
+# Ensembles d'analyses disponibles pour parse_many
+PARSE_FIELDS = ('text', 'json', 'list_items', 'code_blocks')
+
+# Délimiteurs significatifs pour le repérage des structures JSON
+_JSON_DELIMITERS = re.compile(r'[{}\[\]"]')
+
+# Fin d'une chaîne JSON (guillemet fermant non échappé), à partir du caractère suivant l'ouvrant
+_JSON_STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+_JSON_CLOSERS = {'{': '}', '[': ']'}
+
+# Début plausible du contenu d'un objet ou d'un tableau (écarte le texte entre accolades)
+_JSON_OPENINGS = {
+    '{': re.compile(r'[ \t\n\r]*["}]'),
+    '[': re.compile(r'[ \t\n\r]*[\]"{\[\-0-9tfn]')
+}
+
+# Reprises tolérées après une accolade orpheline du texte libre suivie de guillemets
+_MAX_SCAN_RESTARTS = 3
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_candidate(text, node, payloads):
+    """
+    Décode une structure équilibrée, ou à défaut les structures qu'elle contient
+
+    Parcours itératif (pile explicite) : une imbrication très profonde ne dépasse pas la
+    limite de récursion.
+
+    Args:
+        text (str): Texte complet
+        node (tuple): (début, fin, structures imbriquées)
+        payloads (list): Tuples (début, fin, données) complétés
+    """
+    pending = [node]
+    while pending:
+        start, end, children = pending.pop()
+        if _JSON_OPENINGS[text[start]].match(text, start + 1):
+            try:
+                # Décodage de l'extrait seul : le coût d'un échec reste proportionnel à la structure
+                payload, stop = _JSON_DECODER.raw_decode(text[start:end])
+                if stop == end - start:
+                    payloads.append((start, end, payload))
+                    continue
+            except (ValueError, RecursionError):
+                pass
+
+        # Structures imbriquées dans l'ordre du texte
+        pending.extend(reversed(children))
+
+
+def _scan_structures(text, pos, payloads):
+    """
+    Parcourt le texte à partir de pos et décode chaque structure de premier niveau refermée
+
+    Returns:
+        list: Structures restées ouvertes en fin de texte [début, structures imbriquées, guillemets vus]
+    """
+    stack = []
+    length = len(text)
+
+    while pos < length:
+        match = _JSON_DELIMITERS.search(text, pos)
+        if match is None:
+            break
+
+        char = match.group()
+        pos = match.end()
+
+        if char == '"':
+            # Hors structure, les guillemets appartiennent au texte libre
+            if stack:
+                stack[0][2] = True
+                end = _JSON_STRING_END.match(text, pos)
+                if end is None:
+                    # Chaîne jamais fermée : texte tronqué
+                    break
+                pos = end.end()
+        elif char in _JSON_CLOSERS:
+            stack.append([match.start(), [], False])
+        elif stack:
+            start, children, _ = stack.pop()
+            if _JSON_CLOSERS[text[start]] == char:
+                node = (start, pos, children)
+                if stack:
+                    stack[-1][1].append(node)
+                else:
+                    _decode_candidate(text, node, payloads)
+            elif stack:
+                # Délimiteurs croisés : l'ouvrant n'était pas du JSON, ses structures remontent
+                stack[-1][1].extend(children)
+            else:
+                for child in children:
+                    _decode_candidate(text, child, payloads)
+
+    return stack
+
+
+def _salvage_array(text, start):
+    """
+    Récupère les éléments complets d'un tableau JSON tronqué
+
+    Args:
+        text (str): Texte complet
+        start (int): Position du crochet ouvrant
+
+    Returns:
+        list: Éléments décodés avant la troncature
+    """
+    items = []
+    pos = _JSON_WHITESPACE.match(text, start + 1).end()
+    while pos < len(text):
+        try:
+            item, pos = _JSON_DECODER.raw_decode(text, pos)
+        except (ValueError, RecursionError):
+            break
+        items.append(item)
+
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        if not text.startswith(',', pos):
+            break
+        pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+    return items
+
+
+def scan_json_payloads(text, salvage_truncated=False):
+    """
+    Repère et décode en une passe les objets et tableaux JSON d'un texte
+
+    Les structures équilibrées sont délimitées en suivant les chaînes (guillemets et
+    échappements) puis décodées avec raw_decode ; quand une structure est invalide, ses
+    structures imbriquées, déjà repérées, sont essayées à leur tour. Hors structure, les
+    guillemets du texte libre sont ignorés.
+
+    Args:
+        text (str): Texte à analyser
+        salvage_truncated (bool): Récupérer les éléments complets d'un tableau resté ouvert
+            en fin de texte (réponse tronquée)
+
+    Returns:
+        list: Tuples (début, fin, données) dans l'ordre du texte
+    """
+    payloads = []
+    pos = 0
+    restarts = 0
+
+    while True:
+        unclosed = _scan_structures(text, pos, payloads)
+        if not unclosed:
+            break
+
+        # Accolade orpheline du texte libre : les guillemets suivants ont pu être mal appariés
+        outer_start = unclosed[0][0]
+        looks_like_json = _JSON_OPENINGS[text[outer_start]].match(text, outer_start + 1) is not None
+        if unclosed[0][2] and not looks_like_json and restarts < _MAX_SCAN_RESTARTS:
+            restarts += 1
+            pos = outer_start + 1
+            continue
+
+        array_level = None
+        if salvage_truncated:
+            array_level = next((level for level, (start, _, _) in enumerate(unclosed)
+                                if text[start] == '['), None)
+
+        for start, children, _ in unclosed[:array_level]:
+            # Les éléments d'une structure JSON tronquée ne sont pas des contenus à part entière
+            if _JSON_OPENINGS[text[start]].match(text, start + 1) is None:
+                for child in children:
+                    _decode_candidate(text, child, payloads)
+
+        if array_level is not None:
+            array_start = unclosed[array_level][0]
+            items = _salvage_array(text, array_start)
+            if items:
+                logger.debug(f"Tableau JSON tronqué: {len(items)} élément(s) récupéré(s)")
+                payloads.append((array_start, len(text), items))
+        break
+
+    payloads.sort(key=lambda payload: payload[0])
+    return payloads
+
+
+def _emphasis_text(match):
+    """Contenu d'un passage en gras, italique ou souligné (un seul groupe participe)"""
+    return match.group(1) or match.group(2) or match.group(3) or ''
+
+
+def clean_text(response):
+    """
+    Extrait le contenu textuel d'une réponse HTML/markdown
+
+    Args:
+        response (str): Réponse brute
+
+    Returns:
+        str: Texte sans balises, blocs de code ni mise en forme, espaces normalisés
+    """
+    text = html.unescape(_HTML_TAG.sub(' ', response))
+    text = _CODE_BLOCK.sub('', text)
+    text = _MARKDOWN_EMPHASIS.sub(_emphasis_text, text)
+    return _WHITESPACE_RUN.sub(' ', text).strip()
+
+
+def find_code_blocks(response):
+    """
+    Extrait les blocs de code d'une réponse markdown
+
+    Returns:
+        list: Dictionnaires {'language', 'code'}
+    """
+    return [{'language': lang.strip() or 'text', 'code': code.strip()}
+            for lang, code in _CODE_BLOCK_LANG.findall(response)]
+
+
+def find_list_items(response):
+    """
+    Extrait les éléments de listes numérotées et à puces
+
+    Returns:
+        list: Texte des éléments, dans l'ordre de la réponse
+    """
+    return _LIST_ITEM.findall(response)
+
+
+@lru_cache(maxsize=64)
+def _error_matcher(patterns):
+    """Expression combinée d'une liste de patterns d'erreur (compilée une fois par liste)"""
+    return re.compile('|'.join(re.escape(pattern.lower()) for pattern in patterns))
+
+
+def find_error_pattern(text, error_patterns):
+    """
+    Cherche le premier pattern d'erreur (dans l'ordre de la liste) présent dans un texte
+
+    Une seule passe de l'expression combinée écarte le cas courant (aucune erreur) ; en
+    cas de correspondance, la liste est parcourue pour respecter sa priorité.
+
+    Args:
+        text (str): Texte nettoyé, en minuscules
+        error_patterns (list): Patterns d'erreur
+
+    Returns:
+        str: Pattern trouvé ou None
+    """
+    patterns = tuple(error_patterns)
+    if not patterns or not _error_matcher(patterns).search(text):
+        return None
+
+    return next(pattern for pattern in patterns if pattern.lower() in text)
+
+
+def _parse_response(response, fields, error_patterns, salvage_truncated):
+    """
+    Analyse une réponse selon les champs demandés
+
+    Returns:
+        dict: Résultats par champ (et 'error' si des patterns sont fournis)
+    """
+    result = {}
+    response = response or ''
+    text = None
+
+    if 'text' in fields or error_patterns:
+        text = clean_text(response)
+    if 'text' in fields:
+        result['text'] = text
+    if 'json' in fields:
+        payloads = scan_json_payloads(response, salvage_truncated)
+        result['json'] = payloads[0][2] if payloads else None
+    if 'list_items' in fields:
+        result['list_items'] = find_list_items(response)
+    if 'code_blocks' in fields:
+        result['code_blocks'] = find_code_blocks(response)
+    if error_patterns:
+        result['error'] = find_error_pattern(text.lower(), error_patterns)
+
+    return result
+
+
+def _parse_guarded(response, fields, error_patterns, salvage_truncated):
+    """Analyse une réponse ; une réponse inanalysable donne {'parse_error': message} sans interrompre le lot"""
+    try:
+        return _parse_response(response, fields, error_patterns, salvage_truncated)
+    except Exception as e:
+        return {'parse_error': f"{type(e).__name__}: {str(e)}"}
+
+
+def _parse_chunk(responses, fields, error_patterns, salvage_truncated):
+    """Analyse un lot de réponses (exécuté dans un processus de travail)"""
+    return [_parse_guarded(response, fields, error_patterns, salvage_truncated) for response in responses]
 
 
 class ResponseParser:
@@ -27,23 +345,7 @@ class ResponseParser:
             str: Contenu textuel nettoyé
         """
         try:
-            # Supprimer les balises HTML si présentes
-            text = re.sub(r'<[^>]+>', ' ', response)
-
-            # Décoder les entités HTML
-            text = html.unescape(text)
-
-            # Supprimer les formatages markdown
-            text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # Gras
-            text = re.sub(r'\*(.*?)\*', r'\1', text)  # Italique
-            text = re.sub(r'__(.*?)__', r'\1', text)  # Souligné
-            text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)  # Blocs de code
-
-            # Nettoyer les espaces multiples et retours à la ligne
-            text = re.sub(r'\s+', ' ', text)
-            text = text.strip()
-
-            return text
+            return clean_text(response)
 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction du texte: {str(e)}")
@@ -60,58 +362,59 @@ class ResponseParser:
             list: Liste des blocs de code avec leur langage
         """
         try:
-            # Regex pour capturer les blocs de code avec leur langage
-            code_pattern = r'```(\w*)\n(.*?)```'
-            matches = re.findall(code_pattern, response, re.DOTALL)
-
-            code_blocks = []
-            for lang, code in matches:
-                code_blocks.append({
-                    'language': lang.strip() or 'text',
-                    'code': code.strip()
-                })
-
-            return code_blocks
+            return find_code_blocks(response)
 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des blocs de code: {str(e)}")
             return []
 
-    def extract_json_data(self, response):
+    def extract_json_data(self, response, salvage_truncated=False):
         """
         Extrait les données JSON d'une réponse
 
+        Le premier contenu JSON valide d'un bloc de code est privilégié, à défaut le premier
+        de la réponse.
+
         Args:
             response (str): Réponse contenant du JSON
+            salvage_truncated (bool): Récupérer les éléments complets d'un tableau tronqué
 
         Returns:
             dict/list: Données JSON extraites ou None si aucune
         """
         try:
-            # Chercher des structures JSON dans la réponse
-            json_pattern = r'```(?:json)?\s*(\{.*?\}|\[.*?\])```'
-            matches = re.search(json_pattern, response, re.DOTALL)
-
-            if matches:
-                json_str = matches.group(1)
-                return json.loads(json_str)
+            payloads = scan_json_payloads(response, salvage_truncated)
+            if not payloads:
+                return None
 
-            # Si pas trouvé dans un bloc de code, chercher directement
-            json_pattern = r'(\{.*\}|\[.*\])'
-            matches = re.search(json_pattern, response, re.DOTALL)
+            fences = [match.start() for match in _CODE_FENCE.finditer(response)]
+            for start, _, payload in payloads:
+                # Un nombre impair de délimiteurs avant la position : à l'intérieur d'un bloc de code
+                if bisect.bisect_right(fences, start) % 2 == 1:
+                    return payload
 
-            if matches:
-                try:
-                    json_str = matches.group(1)
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass
+            return payloads[0][2]
 
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction des données JSON: {str(e)}")
             return None
 
+    def extract_all_json(self, response, salvage_truncated=False):
+        """
+        Extrait tous les contenus JSON valides d'une réponse, dans l'ordre du texte
+
+        Args:
+            response (str): Réponse contenant du JSON
+            salvage_truncated (bool): Récupérer les éléments complets d'un tableau tronqué
+
+        Returns:
+            list: Objets et tableaux JSON décodés
+        """
+        try:
+            return [payload for _, _, payload in scan_json_payloads(response, salvage_truncated)]
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des données JSON: {str(e)}")
-            return None
+            return []
 
     def extract_list_items(self, response):
         """
@@ -124,29 +427,7 @@ class ResponseParser:
             list: Liste des éléments extraits
         """
         try:
-            # Modèle pour les listes numérotées et à puces
-            numbered_list = r'^\d+\.\s+(.*?)$'
-            bullet_list = r'^[-*]\s+(.*?)$'
-
-            # Extraire les lignes
-            lines = response.split('\n')
-
-            items = []
-            for line in lines:
-                line = line.strip()
-
-                # Vérifier si c'est une liste numérotée
-                num_match = re.match(numbered_list, line)
-                if num_match:
-                    items.append(num_match.group(1))
-                    continue
-
-                # Vérifier si c'est une liste à puces
-                bullet_match = re.match(bullet_list, line)
-                if bullet_match:
-                    items.append(bullet_match.group(1))
-
-            return items
+            return find_list_items(response)
 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des listes: {str(e)}")
@@ -165,8 +446,8 @@ class ResponseParser:
         """
         try:
             if format == 'json' or format == 'auto':
-                # Essayer d'extraire du JSON
-                json_data = self.extract_json_data(response)
+                # Essayer d'extraire du JSON (une réponse tronquée garde ses éléments complets)
+                json_data = self.extract_json_data(response, salvage_truncated=True)
                 if json_data:
                     # Convertir en liste si c'est un dictionnaire
                     if isinstance(json_data, dict):
@@ -215,16 +496,58 @@ class ResponseParser:
             tuple: (erreur_détectée, pattern_correspondant)
         """
         try:
-            # Extraction du texte brut
-            text = self.extract_text_content(response).lower()
-
-            for pattern in error_patterns:
-                if pattern.lower() in text:
-                    logger.warning(f"Pattern d'erreur détecté: {pattern}")
-                    return True, pattern
+            pattern = find_error_pattern(clean_text(response).lower(), error_patterns)
+            if pattern is not None:
+                logger.warning(f"Pattern d'erreur détecté: {pattern}")
+                return True, pattern
 
             return False, None
 
         except Exception as e:
             logger.error(f"Erreur lors de la détection des patterns: {str(e)}")
-            return False, None
\ No newline at end of file
+            return False, None
+
+    def parse_many(self, responses, fields=PARSE_FIELDS, error_patterns=None, salvage_truncated=False,
+                   workers=None, chunk_size=250):
+        """
+        Analyse un lot de réponses
+
+        Au-delà de PROCESS_POOL_THRESHOLD réponses, le lot est découpé et réparti sur un
+        pool de processus (tous les cœurs par défaut) ; sinon il est traité sur place.
+
+        Args:
+            responses (list): Réponses brutes
+            fields (tuple): Analyses à effectuer parmi PARSE_FIELDS
+            error_patterns (list, optional): Patterns d'erreur à détecter (champ 'error')
+            salvage_truncated (bool): Récupérer les éléments d'un tableau JSON tronqué
+            workers (int, optional): Nombre de processus (os.cpu_count() par défaut, 1 = sur place)
+            chunk_size (int): Réponses envoyées à un processus par tâche
+
+        Returns:
+            list: Un dictionnaire de résultats par réponse, dans l'ordre du lot ({'parse_error': message}
+                pour une réponse dont l'analyse a échoué)
+        """
+        responses = list(responses)
+        fields = tuple(field for field in fields if field in PARSE_FIELDS)
+        error_patterns = tuple(error_patterns) if error_patterns else None
+        workers = workers or os.cpu_count() or 1
+
+        if workers > 1 and len(responses) >= PROCESS_POOL_THRESHOLD:
+            chunks = [responses[i:i + chunk_size] for i in range(0, len(responses), chunk_size)]
+            try:
+                with concurrent_process.ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                    results = []
+                    for chunk_results in executor.map(_parse_chunk, chunks,
+                                                      [fields] * len(chunks),
+                                                      [error_patterns] * len(chunks),
+                                                      [salvage_truncated] * len(chunks)):
+                        results.extend(chunk_results)
+
+                logger.debug(f"{len(responses)} réponse(s) analysée(s) sur {workers} processus")
+                return results
+
+            except Exception as e:
+                # Pool indisponible (environnement restreint, processus interrompu...) : traitement sur place
+                logger.warning(f"Analyse parallèle impossible, traitement séquentiel: {str(e)}")
+
+        return _parse_chunk(responses, fields, error_patterns, salvage_truncated)
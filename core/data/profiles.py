@@ -0,0 +1,170 @@
+import json
+import threading
+from utils.logger import logger
+
+
+def default_browser_config():
+    """
+    Retourne la configuration navigateur par défaut avec support multi-fenêtres
+
+    Returns:
+        dict: Configuration par défaut
+    """
+    return {
+        "type": "Chrome",
+        "path": "",
+        "url": "",
+        "fullscreen": False,
+        # NOUVELLES OPTIONS MULTI-FENÊTRES (avec valeurs par défaut conservant comportement actuel)
+        "window_selection_method": "auto",  # "auto" = comportement actuel (première fenêtre)
+        "window_order": 1,  # 1 = première fenêtre = comportement actuel
+        "window_title_pattern": "",  # Vide = pas de filtrage par titre
+        "window_position": None,  # None = pas de filtrage par position
+        "window_id": None,  # None = pas de fenêtre spécifique mémorisée
+        "window_size": None,  # None = pas de contrainte de taille
+        "remember_window": False  # False = ne pas mémoriser la sélection
+    }
+
+
+def migrate_browser_config(browser_config):
+    """
+    Migre une configuration navigateur vers le nouveau format multi-fenêtres
+
+    Args:
+        browser_config (dict): Configuration existante
+
+    Returns:
+        dict: Configuration migrée
+    """
+    if not browser_config:
+        return default_browser_config()
+
+    # Les valeurs existantes sont préservées, les nouveaux champs prennent leur valeur par défaut
+    migrated_config = default_browser_config()
+    migrated_config.update(browser_config)
+
+    logger.debug(f"Configuration navigateur migrée: {list(migrated_config.keys())}")
+    return migrated_config
+
+
+def encode_profile(profile_data):
+    """
+    Sérialise un profil en JSON compact pour le stockage
+
+    Args:
+        profile_data (dict): Profil à sérialiser
+
+    Returns:
+        str: JSON sans indentation ni espaces superflus
+    """
+    return json.dumps(profile_data, ensure_ascii=False, separators=(',', ':'))
+
+
+def clone_profile(value):
+    """
+    Copie profonde d'une structure JSON (dict, list, scalaires)
+
+    Plus rapide que copy.deepcopy pour des données déjà décodées depuis du JSON.
+
+    Args:
+        value: Valeur à copier
+
+    Returns:
+        Copie indépendante de la valeur
+    """
+    if isinstance(value, dict):
+        return {key: clone_profile(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone_profile(item) for item in value]
+    return value
+
+
+class ProfileCache:
+    """
+    Cache mémoire des profils de plateformes décodés
+
+    Les profils sont chargés une seule fois depuis la base ; save_platform et
+    delete_platform mettent à jour le cache et incrémentent le compteur de version,
+    ce qui permet aux consommateurs de savoir si leurs copies sont périmées. Les lectures
+    renvoient des copies : un appelant peut modifier le profil obtenu sans altérer le cache.
+    """
+
+    def __init__(self, loader):
+        """
+        Initialise le cache
+
+        Args:
+            loader (callable): Fonction renvoyant {nom: profil} depuis la base
+        """
+        self._loader = loader
+        self._profiles = None
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _ensure_loaded(self):
+        """Charge les profils si nécessaire (verrou détenu)"""
+        if self._profiles is None:
+            self._profiles = self._loader()
+            logger.debug(f"Cache des profils chargé: {len(self._profiles)} profil(s)")
+        return self._profiles
+
+    def get(self, name):
+        """
+        Récupère une copie d'un profil
+
+        Args:
+            name (str): Nom de la plateforme
+
+        Returns:
+            dict: Profil ou None si absent
+        """
+        with self._lock:
+            profile = self._ensure_loaded().get(name)
+        return clone_profile(profile) if profile is not None else None
+
+    def get_all(self):
+        """
+        Récupère une copie de tous les profils
+
+        Returns:
+            dict: Profils indexés par nom
+        """
+        with self._lock:
+            profiles = self._ensure_loaded()
+            return {name: clone_profile(profile) for name, profile in profiles.items()}
+
+    def contains(self, name):
+        """Indique si un profil existe"""
+        with self._lock:
+            return name in self._ensure_loaded()
+
+    def store(self, name, profile_data):
+        """
+        Met à jour un profil après son enregistrement en base
+
+        Args:
+            name (str): Nom de la plateforme
+            profile_data (dict): Profil enregistré
+        """
+        with self._lock:
+            if self._profiles is not None:
+                self._profiles[name] = clone_profile(profile_data)
+            self.version += 1
+
+    def remove(self, name):
+        """
+        Retire un profil après sa suppression en base
+
+        Args:
+            name (str): Nom de la plateforme
+        """
+        with self._lock:
+            if self._profiles is not None:
+                self._profiles.pop(name, None)
+            self.version += 1
+
+    def invalidate(self):
+        """Force le rechargement depuis la base à la prochaine lecture"""
+        with self._lock:
+            self._profiles = None
+            self.version += 1
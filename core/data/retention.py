@@ -0,0 +1,512 @@
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.logger import logger
+from utils.exceptions import DatabaseError, ConfigurationError
+from core.data.blobs import release_blobs
+from core.data.analytics import ROLLUP_TABLES, bucket_for
+
+# Actions possibles d'une règle :
+#   'archive'   : écrit les lignes dans une archive JSONL compressée puis les supprime
+#   'delete'    : supprime les lignes
+#   'aggregate' : supprime le détail (prompts/réponses) mais conserve les agrégats
+#                 (cumuls horaires/journaliers et compteurs des sessions)
+RETENTION_ACTIONS = ('archive', 'delete', 'aggregate')
+
+# Tables gérées : 'prompts' couvre aussi les réponses, 'brainstorming' les sessions et leurs résultats
+RETENTION_TABLES = ('prompts', 'brainstorming') + tuple(ROLLUP_TABLES.values())
+
+DEFAULT_RETENTION_RULES = [
+    {'table': 'prompts', 'operation_type': None, 'keep_days': 180, 'action': 'archive'},
+    {'table': 'brainstorming', 'keep_days': 365, 'action': 'archive'},
+    {'table': 'rollup_hourly', 'keep_days': 90, 'action': 'delete'}
+]
+
+# auto_vacuum = INCREMENTAL
+INCREMENTAL_VACUUM = 2
+
+
+def validate_rules(rules):
+    """
+    Vérifie et normalise des règles de rétention
+
+    Args:
+        rules (list): Règles {'table', 'keep_days', 'action', 'operation_type' (prompts uniquement)}
+
+    Returns:
+        list: Règles normalisées
+    """
+    normalized = []
+    for rule in rules:
+        table = rule.get('table')
+        action = rule.get('action', 'delete')
+        keep_days = rule.get('keep_days')
+
+        if table not in RETENTION_TABLES:
+            raise ConfigurationError(f"Table de rétention inconnue: {table}")
+        if action not in RETENTION_ACTIONS:
+            raise ConfigurationError(f"Action de rétention inconnue: {action}")
+        if action == 'aggregate' and table != 'prompts':
+            raise ConfigurationError(f"L'action 'aggregate' ne s'applique qu'aux prompts (règle sur {table})")
+        if not isinstance(keep_days, (int, float)) or keep_days < 0:
+            raise ConfigurationError(f"keep_days invalide pour {table}: {keep_days}")
+        if rule.get('operation_type') and table != 'prompts':
+            raise ConfigurationError(f"operation_type ne s'applique qu'aux prompts (règle sur {table})")
+
+        normalized.append({
+            'table': table,
+            'operation_type': rule.get('operation_type'),
+            'keep_days': keep_days,
+            'action': action
+        })
+    return normalized
+
+
+class RetentionService:
+    """
+    Application des règles de rétention de l'historique
+
+    Les lignes expirées sont traitées par petits lots, chacun dans sa propre transaction
+    suivie d'une pause : les écrivains de l'application ne sont jamais bloqués longtemps.
+    L'espace libéré est ensuite rendu au système par PRAGMA incremental_vacuum, lui aussi
+    par étapes, ce qui suppose une base en auto_vacuum = INCREMENTAL (voir
+    enable_incremental_vacuum pour une base créée avant).
+    """
+
+    def __init__(self, database, rules=None, archive_dir=None, batch_size=200, batch_pause=0.05,
+                 vacuum_pages=256):
+        """
+        Initialise le service
+
+        Args:
+            database (Database): Base de l'application
+            rules (list, optional): Règles de rétention (DEFAULT_RETENTION_RULES par défaut)
+            archive_dir (str, optional): Répertoire des archives (data/archives par défaut)
+            batch_size (int): Lignes traitées par transaction
+            batch_pause (float): Pause entre deux lots (secondes)
+            vacuum_pages (int): Pages rendues au système par étape de vacuum
+        """
+        self.database = database
+        self.rules = validate_rules(rules if rules is not None else DEFAULT_RETENTION_RULES)
+        self.archive_dir = archive_dir or os.path.join(os.path.dirname(os.path.abspath(database.db_path)),
+                                                       "archives")
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.last_result = None
+
+    # -----------------------------------------------------
+    # Exécution
+    # -----------------------------------------------------
+
+    def run(self, now=None):
+        """
+        Applique toutes les règles puis récupère l'espace libéré
+
+        Args:
+            now (datetime, optional): Date de référence (maintenant par défaut)
+
+        Returns:
+            dict: Lignes traitées par règle, archives écrites et pages récupérées
+        """
+        now = now or datetime.now()
+        started = time.time()
+        result = {'rules': [], 'archives': [], 'vacuumed_pages': 0}
+
+        # Types d'opération couverts par une règle spécifique (exclus de la règle générale)
+        specific_types = [rule['operation_type'] for rule in self.rules
+                          if rule['table'] == 'prompts' and rule['operation_type']]
+
+        for rule in self.rules:
+            if self._stop_event.is_set():
+                break
+
+            cutoff = (now - timedelta(days=rule['keep_days'])).isoformat()
+            archive = _ArchiveWriter(self._archive_path(rule, now)) if rule['action'] == 'archive' else None
+
+            try:
+                if rule['table'] == 'prompts':
+                    count = self._purge_prompts(rule, cutoff, specific_types, archive)
+                elif rule['table'] == 'brainstorming':
+                    count = self._purge_brainstorming(cutoff, archive)
+                else:
+                    count = self._purge_rollups(rule['table'], cutoff, archive)
+            finally:
+                if archive is not None:
+                    archive.close()
+
+            if archive is not None and archive.count:
+                result['archives'].append(archive.path)
+            result['rules'].append(dict(rule, processed=count))
+
+            if count:
+                logger.info(f"Rétention {rule['table']}"
+                            f"{' (' + rule['operation_type'] + ')' if rule['operation_type'] else ''}: "
+                            f"{count} ligne(s) traitée(s), action {rule['action']}")
+
+        if not self._stop_event.is_set():
+            result['vacuumed_pages'] = self.incremental_vacuum()
+
+        result['duration'] = round(time.time() - started, 3)
+        return result
+
+    def _archive_path(self, rule, now):
+        """Chemin de l'archive d'une règle pour cette exécution"""
+        name = rule['table'] + (f"_{rule['operation_type']}" if rule['operation_type'] else "")
+        return os.path.join(self.archive_dir, f"{name}_{now.strftime('%Y%m%d_%H%M%S')}.jsonl.gz")
+
+    def _pause(self):
+        """Laisse la main aux autres écrivains entre deux lots"""
+        if self.batch_pause:
+            self._stop_event.wait(self.batch_pause)
+
+    def _purge_prompts(self, rule, cutoff, specific_types, archive):
+        """
+        Traite les prompts expirés (et leurs réponses) par lots
+
+        Returns:
+            int: Nombre de prompts traités
+        """
+        query = "SELECT id FROM prompts WHERE timestamp < ?"
+        params = [cutoff]
+
+        if rule['operation_type']:
+            query += " AND operation_type = ?"
+            params.append(rule['operation_type'])
+        elif specific_types:
+            query += f" AND operation_type NOT IN ({', '.join('?' * len(specific_types))})"
+            params += specific_types
+
+        query += " ORDER BY timestamp LIMIT ?"
+        params.append(self.batch_size)
+
+        total = 0
+        while not self._stop_event.is_set():
+            with self.database.transaction() as conn:
+                ids = [row[0] for row in conn.execute(query, params)]
+                if not ids:
+                    break
+
+                placeholders = ', '.join('?' * len(ids))
+                if archive is not None:
+                    archive.write_all(self._export_prompts(conn, ids, placeholders))
+
+                blob_ids = [row[0] for row in conn.execute(f'''
+                            SELECT content_blob_id FROM responses WHERE prompt_id IN ({placeholders})
+                            UNION
+                            SELECT content_blob_id FROM prompts WHERE id IN ({placeholders})
+                            ''', ids + ids)]
+
+                conn.execute(f"DELETE FROM responses WHERE prompt_id IN ({placeholders})", ids)
+                conn.execute(f"DELETE FROM prompts WHERE id IN ({placeholders})", ids)
+                release_blobs(conn, blob_ids)
+
+            total += len(ids)
+            self._pause()
+
+        # Les sessions vidées ne sont supprimées que si leurs compteurs n'ont pas à être conservés
+        if rule['action'] != 'aggregate':
+            self._purge_empty_sessions(cutoff)
+
+        return total
+
+    @staticmethod
+    def _export_prompts(conn, ids, placeholders):
+        """
+        Lignes d'archive d'un lot de prompts (contenu et réponses inclus)
+
+        Returns:
+            list: Dictionnaires sérialisables
+        """
+        responses = {}
+        for row in conn.execute(f'''
+                                SELECT r.id, r.prompt_id, r.timestamp, r.status, r.duration_ms, r.outcome_code,
+                                       blob_text(b.data, b.compressed) AS content
+                                FROM responses r
+                                LEFT JOIN content_blobs b ON b.id = r.content_blob_id
+                                WHERE r.prompt_id IN ({placeholders})
+                                ORDER BY r.id
+                                ''', ids):
+            response = dict(row)
+            responses.setdefault(response.pop('prompt_id'), []).append(response)
+
+        records = []
+        for row in conn.execute(f'''
+                                SELECT p.id, p.timestamp, p.session_id, s.platform_name AS platform,
+                                       p.operation_type, p.token_count, p.duration_ms, p.outcome_code,
+                                       blob_text(b.data, b.compressed) AS content
+                                FROM prompts p
+                                LEFT JOIN ai_sessions s ON s.id = p.session_id
+                                LEFT JOIN content_blobs b ON b.id = p.content_blob_id
+                                WHERE p.id IN ({placeholders})
+                                ORDER BY p.timestamp, p.id
+                                ''', ids):
+            record = dict(row)
+            record['responses'] = responses.get(record['id'], [])
+            records.append(record)
+        return records
+
+    def _purge_empty_sessions(self, cutoff):
+        """
+        Supprime les sessions expirées qui n'ont plus aucun prompt
+
+        Returns:
+            int: Nombre de sessions supprimées
+        """
+        total = 0
+        while not self._stop_event.is_set():
+            with self.database.transaction() as conn:
+                cursor = conn.execute('''
+                                      DELETE FROM ai_sessions
+                                      WHERE id IN (SELECT s.id FROM ai_sessions s
+                                                   WHERE s.session_date < ?
+                                                     AND NOT EXISTS (SELECT 1 FROM prompts p
+                                                                     WHERE p.session_id = s.id)
+                                                   LIMIT ?)
+                                      ''', (cutoff, self.batch_size))
+            if cursor.rowcount <= 0:
+                break
+            total += cursor.rowcount
+            self._pause()
+        return total
+
+    def _purge_brainstorming(self, cutoff, archive):
+        """
+        Traite les sessions de brainstorming terminées et expirées (résultats inclus)
+
+        Returns:
+            int: Nombre de sessions traitées
+        """
+        total = 0
+        while not self._stop_event.is_set():
+            with self.database.transaction() as conn:
+                sessions = [dict(row) for row in conn.execute('''
+                                                              SELECT * FROM brainstorming_sessions
+                                                              WHERE creation_date < ? AND status != 'in_progress'
+                                                              ORDER BY creation_date
+                                                              LIMIT ?
+                                                              ''', (cutoff, self.batch_size))]
+                if not sessions:
+                    break
+
+                ids = [session['id'] for session in sessions]
+                placeholders = ', '.join('?' * len(ids))
+
+                if archive is not None:
+                    results = {}
+                    for row in conn.execute(f'''
+                                            SELECT * FROM brainstorming_results
+                                            WHERE session_id IN ({placeholders})
+                                            ORDER BY id
+                                            ''', ids):
+                        results.setdefault(row['session_id'], []).append(dict(row))
+                    for session in sessions:
+                        session['results'] = results.get(session['id'], [])
+                    archive.write_all(sessions)
+
+                conn.execute(f"DELETE FROM brainstorming_results WHERE session_id IN ({placeholders})", ids)
+                conn.execute(f"DELETE FROM brainstorming_sessions WHERE id IN ({placeholders})", ids)
+
+            total += len(ids)
+            self._pause()
+        return total
+
+    def _purge_rollups(self, table, cutoff, archive):
+        """
+        Traite les cumuls des périodes expirées
+
+        Returns:
+            int: Nombre de lignes traitées
+        """
+        granularity = next(g for g, name in ROLLUP_TABLES.items() if name == table)
+        cutoff_bucket = bucket_for(cutoff, granularity)
+
+        total = 0
+        while not self._stop_event.is_set():
+            with self.database.transaction() as conn:
+                rows = [dict(row) for row in conn.execute(f'''
+                                                          SELECT * FROM {table}
+                                                          WHERE bucket < ?
+                                                          ORDER BY bucket
+                                                          LIMIT ?
+                                                          ''', (cutoff_bucket, self.batch_size))]
+                if not rows:
+                    break
+
+                if archive is not None:
+                    archive.write_all(rows)
+
+                conn.executemany(f'''
+                                 DELETE FROM {table}
+                                 WHERE bucket = ? AND platform = ? AND operation_type = ?
+                                 ''', [(row['bucket'], row['platform'], row['operation_type']) for row in rows])
+
+            total += len(rows)
+            self._pause()
+        return total
+
+    # -----------------------------------------------------
+    # Récupération de l'espace
+    # -----------------------------------------------------
+
+    def is_incremental_vacuum_enabled(self):
+        """Indique si la base est en auto_vacuum = INCREMENTAL"""
+        return self.database.conn.execute("PRAGMA auto_vacuum").fetchone()[0] == INCREMENTAL_VACUUM
+
+    def enable_incremental_vacuum(self):
+        """
+        Passe une base existante en auto_vacuum = INCREMENTAL
+
+        Opération unique mais coûteuse : le changement ne prend effet qu'après un VACUUM
+        complet, qui bloque la base pendant toute sa durée. À lancer hors traitement par lots.
+
+        Returns:
+            bool: True si le mode a été changé, False s'il était déjà actif
+        """
+        if self.is_incremental_vacuum_enabled():
+            return False
+
+        try:
+            self.database.flush_writes()
+            conn = self.database.conn
+            conn.execute(f"PRAGMA auto_vacuum = {INCREMENTAL_VACUUM}")
+            started = time.time()
+            conn.execute("VACUUM")
+            logger.info(f"Base convertie en auto_vacuum incrémental ({time.time() - started:.1f}s)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur lors du passage en auto_vacuum incrémental: {str(e)}")
+            raise DatabaseError(f"Échec du passage en auto_vacuum incrémental: {str(e)}")
+
+    def incremental_vacuum(self):
+        """
+        Rend les pages libres au système par petites étapes
+
+        Returns:
+            int: Nombre de pages récupérées
+        """
+        conn = self.database.conn
+        if not self.is_incremental_vacuum_enabled():
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages:
+                logger.info(f"{free_pages} page(s) libre(s) réutilisables mais non rendues au système : "
+                            f"auto_vacuum incrémental non activé (enable_incremental_vacuum)")
+            return 0
+
+        reclaimed = 0
+        while not self._stop_event.is_set():
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free_pages:
+                break
+
+            step = min(free_pages, self.vacuum_pages)
+            with self.database.transaction():
+                conn.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+            reclaimed += step
+            self._pause()
+
+        if reclaimed:
+            logger.info(f"Vacuum incrémental: {reclaimed} page(s) récupérée(s)")
+        return reclaimed
+
+    # -----------------------------------------------------
+    # Arrière-plan
+    # -----------------------------------------------------
+
+    def start(self, interval=None, on_done=None):
+        """
+        Lance la rétention en arrière-plan
+
+        Args:
+            interval (float, optional): Période de répétition en secondes (exécution unique si None)
+            on_done (callable, optional): Appelée avec (résultat, erreur) après chaque exécution
+
+        Returns:
+            bool: False si la rétention est déjà en cours
+        """
+        with self._lock:
+            if self.is_running():
+                return False
+
+            self._stop_event.clear()
+
+            def loop():
+                while True:
+                    result, error = None, None
+                    try:
+                        result = self.run()
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'application de la rétention: {str(e)}")
+                        error = e
+                    self.last_result = {'result': result, 'error': str(error) if error else None,
+                                        'finished_at': datetime.now().isoformat()}
+                    if on_done:
+                        on_done(result, error)
+
+                    if interval is None or self._stop_event.wait(interval):
+                        break
+
+                # Connexion propre à ce thread
+                self.database.connections.close_thread_connection()
+
+            self._thread = threading.Thread(target=loop, name="DatabaseRetention", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout=None):
+        """Interrompt la rétention après le lot en cours"""
+        self._stop_event.set()
+        self.wait(timeout)
+
+    def is_running(self):
+        """Indique si la rétention est en cours"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Attend la fin de l'exécution en cours"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class _ArchiveWriter:
+    """Archive JSONL compressée, ouverte à la première ligne écrite"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._raw = None
+        self._file = None
+
+    def write_all(self, records):
+        """Écrit des lignes et les force sur disque (fsync) avant la suppression en base"""
+        if not records:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Fichier brut conservé pour fsync (gzip.open ne donne pas accès au descripteur)
+            self._raw = open(self.path, 'ab')
+            self._file = io.TextIOWrapper(gzip.GzipFile(fileobj=self._raw, mode='ab', compresslevel=6),
+                                          encoding='utf-8')
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            self._file.write('\n')
+        # Vidage du flux compressé (bloc synchronisé) puis du cache disque du système
+        self._file.flush()
+        os.fsync(self._raw.fileno())
+        self.count += len(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = None
+            self._raw = None
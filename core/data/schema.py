@@ -0,0 +1,488 @@
+"""
+Migrations du schéma de la base principale
+
+Chaque version est appliquée une seule fois par DatabaseMigration ; au démarrage,
+Database se contente de comparer la version enregistrée à LATEST_SCHEMA_VERSION.
+Toute évolution du schéma s'ajoute ici comme nouvelle version, jamais en modifiant
+une version existante.
+"""
+import json
+from utils.logger import logger
+from core.data.profiles import migrate_browser_config, encode_profile
+from core.data.blobs import store_blob
+from core.data.analytics import ROLLUP_TABLES, BUCKET_LENGTHS
+
+
+def _migrate_platform_profiles(conn):
+    """
+    Migre les profils stockés vers le format multi-fenêtres et le JSON compact
+
+    Exécutée une seule fois (version 4) : les lectures de profils n'ont plus à migrer.
+    """
+    rows = conn.execute('SELECT id, name, profile_data FROM platforms').fetchall()
+
+    for row in rows:
+        try:
+            profile_data = json.loads(row['profile_data'])
+        except ValueError as e:
+            logger.error(f"Profil {row['name']} illisible, non migré: {str(e)}")
+            continue
+
+        browser_config = profile_data.get('browser', {})
+        if 'window_selection_method' not in browser_config:
+            profile_data['browser'] = migrate_browser_config(browser_config)
+
+        conn.execute('UPDATE platforms SET profile_data = ? WHERE id = ?',
+                     (encode_profile(profile_data), row['id']))
+
+    logger.info(f"{len(rows)} profil(s) de plateforme migré(s)")
+
+
+# Tables prompts / responses référençant leur contenu par blob (version 5)
+_BLOB_TABLES = {
+    'prompts': {
+        'create': '''
+            CREATE TABLE prompts_new
+            (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id      INTEGER,
+                timestamp       TEXT    NOT NULL,
+                content_blob_id INTEGER NOT NULL,
+                token_count     INTEGER DEFAULT 0,
+                operation_type  TEXT    NOT NULL,
+                FOREIGN KEY (session_id) REFERENCES ai_sessions (id),
+                FOREIGN KEY (content_blob_id) REFERENCES content_blobs (id)
+            )
+            ''',
+        'copy': '''INSERT INTO prompts_new (id, session_id, timestamp, content_blob_id, token_count, operation_type)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+        'columns': ('session_id', 'timestamp', 'token_count', 'operation_type'),
+        'indexes': [
+            'CREATE INDEX idx_prompts_session ON prompts (session_id)',
+            'CREATE INDEX idx_prompts_timestamp ON prompts (timestamp, id, session_id)',
+            'CREATE INDEX idx_prompts_operation ON prompts (operation_type, timestamp, id, session_id)',
+            'CREATE INDEX idx_prompts_blob ON prompts (content_blob_id)'
+        ]
+    },
+    'responses': {
+        'create': '''
+            CREATE TABLE responses_new
+            (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                prompt_id       INTEGER,
+                timestamp       TEXT    NOT NULL,
+                content_blob_id INTEGER NOT NULL,
+                status          TEXT DEFAULT 'success',
+                FOREIGN KEY (prompt_id) REFERENCES prompts (id),
+                FOREIGN KEY (content_blob_id) REFERENCES content_blobs (id)
+            )
+            ''',
+        'copy': '''INSERT INTO responses_new (id, prompt_id, timestamp, content_blob_id, status)
+                   VALUES (?, ?, ?, ?, ?)''',
+        'columns': ('prompt_id', 'timestamp', 'status'),
+        'indexes': [
+            'CREATE INDEX idx_responses_prompt ON responses (prompt_id, status)',
+            'CREATE INDEX idx_responses_blob ON responses (content_blob_id)'
+        ]
+    }
+}
+
+
+def _move_content_to_blobs(conn):
+    """
+    Déplace le texte des prompts et réponses vers content_blobs (version 5)
+
+    Les tables sont reconstruites (création, copie, suppression, renommage) car SQLite
+    ne permet pas de retirer la colonne content NOT NULL sur place. La connexion doit
+    déclarer blob_text (voir register_blob_functions) pour l'index FTS.
+    """
+    for table, spec in _BLOB_TABLES.items():
+        conn.execute(spec['create'])
+
+        copied = 0
+        cursor = conn.execute(f'SELECT * FROM {table} ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                blob_id = store_blob(conn, row['content'])
+                values = [row['id']] + [row[column] for column in spec['columns']]
+                # Dans les deux tables, content_blob_id suit immédiatement timestamp
+                values.insert(3, blob_id)
+                conn.execute(spec['copy'], values)
+                copied += 1
+
+        conn.execute(f'DROP TABLE {table}')
+        conn.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+        for query in spec['indexes']:
+            conn.execute(query)
+
+        logger.info(f"{copied} ligne(s) de {table} déplacée(s) vers content_blobs")
+
+
+def _backfill_rollups(conn):
+    """
+    Initialise les cumuls à partir des réponses existantes (version 6)
+
+    L'historique ne contient pas de durées : seuls les compteurs sont reconstitués.
+    """
+    for granularity, table in ROLLUP_TABLES.items():
+        length = BUCKET_LENGTHS[granularity]
+        conn.execute(f'''
+                     INSERT INTO {table} (bucket, platform, operation_type, request_count,
+                                          success_count, token_count)
+                     SELECT substr(r.timestamp, 1, {length}),
+                            COALESCE(s.platform_name, 'unknown'),
+                            COALESCE(p.operation_type, 'unknown'),
+                            COUNT(*),
+                            SUM(r.status = 'success'),
+                            SUM(COALESCE(p.token_count, 0))
+                     FROM responses r
+                     LEFT JOIN prompts p ON p.id = r.prompt_id
+                     LEFT JOIN ai_sessions s ON s.id = p.session_id
+                     GROUP BY 1, 2, 3
+                     ''')
+
+
+SCHEMA_MIGRATIONS = {
+    1: {
+        'description': "Schéma initial",
+        'queries': [
+            '''
+            CREATE TABLE IF NOT EXISTS platforms
+            (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                name         TEXT NOT NULL UNIQUE,
+                profile_data TEXT NOT NULL,
+                created_at   TEXT NOT NULL,
+                updated_at   TEXT NOT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS keyboard_config
+            (
+                id                 INTEGER PRIMARY KEY AUTOINCREMENT,
+                layout_type        TEXT    NOT NULL,
+                key_delay          INTEGER DEFAULT 50,
+                accent_delay       INTEGER DEFAULT 100,
+                accent_method      TEXT    NOT NULL,
+                block_alt_tab      BOOLEAN DEFAULT 1,
+                focus_lock         BOOLEAN DEFAULT 1,
+                protection_timeout INTEGER DEFAULT 30,
+                created_at         TEXT    NOT NULL,
+                updated_at         TEXT    NOT NULL,
+                is_active          BOOLEAN DEFAULT 1
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS ai_sessions
+            (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                platform_name TEXT NOT NULL,
+                session_date  TEXT NOT NULL,
+                prompt_count  INTEGER DEFAULT 0,
+                token_count   INTEGER DEFAULT 0,
+                status        TEXT    DEFAULT 'active'
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS prompts
+            (
+                id             INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id     INTEGER,
+                timestamp      TEXT NOT NULL,
+                content        TEXT NOT NULL,
+                token_count    INTEGER DEFAULT 0,
+                operation_type TEXT NOT NULL,
+                FOREIGN KEY (session_id) REFERENCES ai_sessions (id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS responses
+            (
+                id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                prompt_id INTEGER,
+                timestamp TEXT NOT NULL,
+                content   TEXT NOT NULL,
+                status    TEXT DEFAULT 'success',
+                FOREIGN KEY (prompt_id) REFERENCES prompts (id)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS datasets
+            (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                name          TEXT NOT NULL,
+                creation_date TEXT NOT NULL,
+                type          TEXT NOT NULL,
+                format        TEXT NOT NULL,
+                item_count    INTEGER DEFAULT 0,
+                filepath      TEXT NOT NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS brainstorming_sessions
+            (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                name          TEXT NOT NULL,
+                creation_date TEXT NOT NULL,
+                ai_platforms  TEXT NOT NULL,
+                context       TEXT NOT NULL,
+                status        TEXT DEFAULT 'in_progress'
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS brainstorming_results
+            (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id    INTEGER,
+                platform_name TEXT NOT NULL,
+                solution      TEXT NOT NULL,
+                evaluations   TEXT,
+                final_score   INTEGER,
+                FOREIGN KEY (session_id) REFERENCES brainstorming_sessions (id)
+            )
+            '''
+        ]
+    },
+    2: {
+        'description': "Index des tables d'historique et de statistiques",
+        'queries': [
+            # Clés étrangères utilisées par les jointures
+            'CREATE INDEX IF NOT EXISTS idx_prompts_session ON prompts (session_id)',
+            'CREATE INDEX IF NOT EXISTS idx_responses_prompt ON responses (prompt_id, status)',
+            'CREATE INDEX IF NOT EXISTS idx_brainstorming_results_session ON brainstorming_results (session_id)',
+
+            # Historique : tri chronologique, éventuellement filtré par type d'opération
+            'CREATE INDEX IF NOT EXISTS idx_prompts_timestamp ON prompts (timestamp, id, session_id)',
+            '''CREATE INDEX IF NOT EXISTS idx_prompts_operation
+                   ON prompts (operation_type, timestamp, id, session_id)''',
+
+            # Statistiques de session : index couvrants (pas d'accès à la table)
+            '''CREATE INDEX IF NOT EXISTS idx_ai_sessions_platform_date
+                   ON ai_sessions (platform_name, session_date, prompt_count, token_count)''',
+            'CREATE INDEX IF NOT EXISTS idx_ai_sessions_date ON ai_sessions (session_date)',
+
+            'CREATE INDEX IF NOT EXISTS idx_datasets_creation ON datasets (creation_date, id)',
+
+            'ANALYZE'
+        ]
+    },
+    3: {
+        'description': "Recherche plein texte (FTS5) sur l'historique des prompts et réponses",
+        'queries': [
+            # Tables FTS à contenu externe : seul l'index est stocké, le texte reste dans la table source
+            '''CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+                   content, content='prompts', content_rowid='id',
+                   tokenize='unicode61 remove_diacritics 2')''',
+            '''CREATE VIRTUAL TABLE IF NOT EXISTS responses_fts USING fts5(
+                   content, content='responses', content_rowid='id',
+                   tokenize='unicode61 remove_diacritics 2')''',
+
+            # Synchronisation par triggers
+            '''CREATE TRIGGER IF NOT EXISTS prompts_fts_insert AFTER INSERT ON prompts BEGIN
+                   INSERT INTO prompts_fts (rowid, content) VALUES (new.id, new.content);
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS prompts_fts_delete AFTER DELETE ON prompts BEGIN
+                   INSERT INTO prompts_fts (prompts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS prompts_fts_update AFTER UPDATE OF content ON prompts BEGIN
+                   INSERT INTO prompts_fts (prompts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                   INSERT INTO prompts_fts (rowid, content) VALUES (new.id, new.content);
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS responses_fts_insert AFTER INSERT ON responses BEGIN
+                   INSERT INTO responses_fts (rowid, content) VALUES (new.id, new.content);
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS responses_fts_delete AFTER DELETE ON responses BEGIN
+                   INSERT INTO responses_fts (responses_fts, rowid, content) VALUES ('delete', old.id, old.content);
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS responses_fts_update AFTER UPDATE OF content ON responses BEGIN
+                   INSERT INTO responses_fts (responses_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                   INSERT INTO responses_fts (rowid, content) VALUES (new.id, new.content);
+               END''',
+
+            # Indexation de l'historique existant
+            "INSERT INTO prompts_fts (prompts_fts) VALUES ('rebuild')",
+            "INSERT INTO responses_fts (responses_fts) VALUES ('rebuild')"
+        ]
+    },
+    4: {
+        'description': "Profils de plateformes au format multi-fenêtres, JSON compact",
+        'queries': [],
+        'function': _migrate_platform_profiles
+    },
+    5: {
+        'description': "Contenus des prompts et réponses dédupliqués et compressés (content_blobs)",
+        'queries': [
+            # L'index plein texte est reconstruit sur les blobs : chaque texte n'est indexé qu'une fois
+            'DROP TRIGGER IF EXISTS prompts_fts_insert',
+            'DROP TRIGGER IF EXISTS prompts_fts_delete',
+            'DROP TRIGGER IF EXISTS prompts_fts_update',
+            'DROP TRIGGER IF EXISTS responses_fts_insert',
+            'DROP TRIGGER IF EXISTS responses_fts_delete',
+            'DROP TRIGGER IF EXISTS responses_fts_update',
+            'DROP TABLE IF EXISTS prompts_fts',
+            'DROP TABLE IF EXISTS responses_fts',
+            '''
+            CREATE TABLE IF NOT EXISTS content_blobs
+            (
+                id         INTEGER PRIMARY KEY,
+                hash       BLOB    NOT NULL UNIQUE,
+                size       INTEGER NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                data       BLOB    NOT NULL
+            )
+            ''',
+            # Vue servant de table de contenu à FTS5 (texte décompressé à la demande)
+            '''CREATE VIEW IF NOT EXISTS content_blob_texts AS
+                   SELECT id, blob_text(data, compressed) AS content FROM content_blobs''',
+            '''CREATE VIRTUAL TABLE IF NOT EXISTS blobs_fts USING fts5(
+                   content, content='content_blob_texts', content_rowid='id',
+                   tokenize='unicode61 remove_diacritics 2')''',
+            '''CREATE TRIGGER IF NOT EXISTS blobs_fts_insert AFTER INSERT ON content_blobs BEGIN
+                   INSERT INTO blobs_fts (rowid, content) VALUES (new.id, blob_text(new.data, new.compressed));
+               END''',
+            '''CREATE TRIGGER IF NOT EXISTS blobs_fts_delete AFTER DELETE ON content_blobs BEGIN
+                   INSERT INTO blobs_fts (blobs_fts, rowid, content)
+                   VALUES ('delete', old.id, blob_text(old.data, old.compressed));
+               END'''
+        ],
+        'function': _move_content_to_blobs
+    },
+    6: {
+        'description': "Durées, codes de résultat et cumuls horaires/journaliers",
+        'queries': [
+            'ALTER TABLE prompts ADD COLUMN duration_ms INTEGER',
+            'ALTER TABLE prompts ADD COLUMN outcome_code TEXT',
+            'ALTER TABLE responses ADD COLUMN duration_ms INTEGER',
+            'ALTER TABLE responses ADD COLUMN outcome_code TEXT',
+            '''
+            CREATE TABLE IF NOT EXISTS rollup_hourly
+            (
+                bucket          TEXT    NOT NULL,
+                platform        TEXT    NOT NULL,
+                operation_type  TEXT    NOT NULL,
+                request_count   INTEGER NOT NULL DEFAULT 0,
+                success_count   INTEGER NOT NULL DEFAULT 0,
+                token_count     INTEGER NOT NULL DEFAULT 0,
+                duration_count  INTEGER NOT NULL DEFAULT 0,
+                duration_sum_ms INTEGER NOT NULL DEFAULT 0,
+                duration_max_ms INTEGER NOT NULL DEFAULT 0,
+                latency_sketch  TEXT,
+                PRIMARY KEY (bucket, platform, operation_type)
+            ) WITHOUT ROWID
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS rollup_daily
+            (
+                bucket          TEXT    NOT NULL,
+                platform        TEXT    NOT NULL,
+                operation_type  TEXT    NOT NULL,
+                request_count   INTEGER NOT NULL DEFAULT 0,
+                success_count   INTEGER NOT NULL DEFAULT 0,
+                token_count     INTEGER NOT NULL DEFAULT 0,
+                duration_count  INTEGER NOT NULL DEFAULT 0,
+                duration_sum_ms INTEGER NOT NULL DEFAULT 0,
+                duration_max_ms INTEGER NOT NULL DEFAULT 0,
+                latency_sketch  TEXT,
+                PRIMARY KEY (bucket, platform, operation_type)
+            ) WITHOUT ROWID
+            '''
+        ],
+        'function': _backfill_rollups
+    },
+    7: {
+        'description': "Éléments de datasets stockés ligne par ligne (dataset_items)",
+        'queries': [
+            '''
+            CREATE TABLE IF NOT EXISTS dataset_items
+            (
+                dataset_id        INTEGER NOT NULL,
+                item_index        INTEGER NOT NULL,
+                data              TEXT    NOT NULL,
+                annotation        TEXT,
+                annotation_status TEXT,
+                annotated_at      TEXT,
+                PRIMARY KEY (dataset_id, item_index),
+                FOREIGN KEY (dataset_id) REFERENCES datasets (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+            ''',
+            'CREATE INDEX IF NOT EXISTS idx_dataset_items_annotation ON dataset_items(dataset_id, annotation_status)'
+        ]
+    },
+    8: {
+        'description': "Archive des résultats de tâches évincés de la mémoire (task_results)",
+        'queries': [
+            # IF NOT EXISTS : la table a pu être créée par l'archive avant cette migration
+            '''
+            CREATE TABLE IF NOT EXISTS task_results
+            (
+                queue_id   TEXT    NOT NULL,
+                task_id    INTEGER NOT NULL,
+                platform   TEXT,
+                status     TEXT    NOT NULL,
+                added_time REAL,
+                start_time REAL,
+                end_time   REAL,
+                result     TEXT,
+                error      TEXT,
+                PRIMARY KEY (queue_id, task_id)
+            )
+            '''
+        ]
+    },
+    9: {
+        'description': "Cache persistant prompt -> réponse (prompt_cache)",
+        'queries': [
+            '''
+            CREATE TABLE IF NOT EXISTS prompt_cache
+            (
+                cache_key   TEXT PRIMARY KEY,
+                platform    TEXT NOT NULL,
+                mode        TEXT NOT NULL,
+                response    TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                duration    REAL DEFAULT 0,
+                created_at  REAL NOT NULL,
+                expires_at  REAL,
+                last_access REAL NOT NULL,
+                hit_count   INTEGER DEFAULT 0
+            )
+            ''',
+            'CREATE INDEX IF NOT EXISTS idx_prompt_cache_access ON prompt_cache (last_access)',
+            'CREATE INDEX IF NOT EXISTS idx_prompt_cache_platform ON prompt_cache (platform)'
+        ]
+    },
+    10: {
+        'description': "File de tâches durable avec baux et clés d'idempotence (durable_tasks)",
+        'queries': [
+            # IF NOT EXISTS : la table a pu être créée par la file durable avant cette migration
+            '''
+            CREATE TABLE IF NOT EXISTS durable_tasks
+            (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id          TEXT,
+                idempotency_key TEXT UNIQUE,
+                handler         TEXT,
+                platform        TEXT,
+                payload         TEXT,
+                priority        INTEGER DEFAULT 0,
+                status          TEXT    NOT NULL DEFAULT 'pending',
+                attempts        INTEGER DEFAULT 0,
+                lease_owner     TEXT,
+                lease_expires   REAL,
+                heartbeat_at    REAL,
+                result          TEXT,
+                error           TEXT,
+                created_at      REAL    NOT NULL,
+                updated_at      REAL    NOT NULL
+            )
+            ''',
+            'CREATE INDEX IF NOT EXISTS idx_durable_tasks_status ON durable_tasks (status, priority, id)',
+            'CREATE INDEX IF NOT EXISTS idx_durable_tasks_job ON durable_tasks (job_id, status)'
+        ]
+    }
+}
+
+LATEST_SCHEMA_VERSION = max(SCHEMA_MIGRATIONS)
@@ -0,0 +1,200 @@
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import chain
+
+# Taille du tampon d'écriture des fichiers exportés
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Lignes écrites entre deux rapports de progression
+PROGRESS_EVERY = 1000
+
+
+class StreamingWriter:
+    """
+    Fichier d'export écrit au fil de l'eau
+
+    Le contenu est écrit dans un fichier temporaire (.partial), compressé en gzip si
+    demandé, puis renommé à la fermeture : un export interrompu ne laisse jamais de
+    fichier final incomplet.
+    """
+
+    def __init__(self, filepath, compress=False, newline=None):
+        """
+        Ouvre le fichier d'export
+
+        Args:
+            filepath (str): Chemin final (suffixe .gz ajouté si compress et absent)
+            compress (bool): Compresser la sortie avec gzip
+            newline (str, optional): Paramètre newline de l'ouverture texte ('' pour le CSV)
+        """
+        if compress and not filepath.endswith('.gz'):
+            filepath += '.gz'
+
+        self.filepath = filepath
+        self._partial = filepath + '.partial'
+
+        if compress:
+            raw = open(self._partial, 'wb', buffering=WRITE_BUFFER_SIZE)
+            self._raw = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+            self._underlying = raw
+        else:
+            self._raw = open(self._partial, 'wb', buffering=WRITE_BUFFER_SIZE)
+            self._underlying = None
+
+        self.file = io.TextIOWrapper(self._raw, encoding='utf-8', newline=newline,
+                                     write_through=False)
+
+    def close(self, success=True):
+        """
+        Ferme le fichier et le publie (ou le supprime en cas d'échec)
+
+        Returns:
+            str: Chemin du fichier final
+        """
+        self.file.close()
+        if self._underlying is not None:
+            self._underlying.close()
+
+        if success:
+            os.replace(self._partial, self.filepath)
+        elif os.path.exists(self._partial):
+            os.remove(self._partial)
+        return self.filepath
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(success=exc_type is None)
+        return False
+
+
+def _report(progress, count, total):
+    """Appelle le rapport de progression toutes les PROGRESS_EVERY lignes"""
+    if progress and count % PROGRESS_EVERY == 0:
+        progress(count, total)
+
+
+def write_jsonl(rows, filepath, compress=False, progress=None, total=None):
+    """
+    Écrit des lignes au format JSON Lines (un objet JSON par ligne)
+
+    Args:
+        rows (iterable): Lignes à écrire (itérateur, curseur...)
+        filepath (str): Chemin du fichier
+        compress (bool): Compresser la sortie avec gzip
+        progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+        total (int, optional): Nombre total de lignes, s'il est connu
+
+    Returns:
+        tuple: (chemin du fichier, nombre de lignes)
+    """
+    count = 0
+    with StreamingWriter(filepath, compress) as writer:
+        write = writer.file.write
+        for row in rows:
+            write(json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=str))
+            write('\n')
+            count += 1
+            _report(progress, count, total)
+
+    if progress:
+        progress(count, total)
+    return writer.filepath, count
+
+
+def write_json_array(rows, filepath, compress=False, progress=None, total=None, indent=2):
+    """
+    Écrit des lignes sous forme de tableau JSON, élément par élément
+
+    Args:
+        rows (iterable): Lignes à écrire
+        filepath (str): Chemin du fichier
+        compress (bool): Compresser la sortie avec gzip
+        progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+        total (int, optional): Nombre total de lignes, s'il est connu
+        indent (int): Indentation de chaque élément
+
+    Returns:
+        tuple: (chemin du fichier, nombre de lignes)
+    """
+    count = 0
+    prefix = ' ' * indent if indent else ''
+    with StreamingWriter(filepath, compress) as writer:
+        write = writer.file.write
+        write('[')
+        for row in rows:
+            text = json.dumps(row, ensure_ascii=False, indent=indent, default=str)
+            write(',\n' if count else '\n')
+            write(prefix + text.replace('\n', '\n' + prefix) if indent else text)
+            count += 1
+            _report(progress, count, total)
+        write('\n]\n' if count else ']\n')
+
+    if progress:
+        progress(count, total)
+    return writer.filepath, count
+
+
+def _csv_value(value):
+    """Valeur de cellule CSV (structures encodées en JSON)"""
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False)
+    return '' if value is None else value
+
+
+def write_csv(rows, filepath, fieldnames=None, compress=False, progress=None, total=None):
+    """
+    Écrit des lignes au format CSV
+
+    Pour des dictionnaires, les colonnes sont celles de fieldnames ou, à défaut, de la
+    première ligne : les clés supplémentaires des lignes suivantes sont ignorées (le
+    fichier n'est jamais relu pour élargir l'en-tête). Les listes sont écrites telles quelles.
+
+    Args:
+        rows (iterable): Lignes à écrire (dictionnaires ou séquences)
+        filepath (str): Chemin du fichier
+        fieldnames (list, optional): Colonnes des lignes dictionnaires
+        compress (bool): Compresser la sortie avec gzip
+        progress (callable, optional): Appelée avec (lignes écrites, total ou None)
+        total (int, optional): Nombre total de lignes, s'il est connu
+
+    Returns:
+        tuple: (chemin du fichier, nombre de lignes)
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    count = 0
+
+    with StreamingWriter(filepath, compress, newline='') as writer:
+        if first is not None:
+            csv_writer = csv.writer(writer.file)
+
+            if isinstance(first, dict):
+                columns = list(fieldnames or first.keys())
+                csv_writer.writerow(columns)
+                for row in chain([first], rows):
+                    csv_writer.writerow([_csv_value(row.get(column)) for column in columns])
+                    count += 1
+                    _report(progress, count, total)
+            else:
+                if fieldnames:
+                    csv_writer.writerow(fieldnames)
+                for row in chain([first], rows):
+                    csv_writer.writerow([_csv_value(value) for value in row])
+                    count += 1
+                    _report(progress, count, total)
+
+    if progress:
+        progress(count, total)
+    return writer.filepath, count
+
+
+STREAM_WRITERS = {
+    'jsonl': write_jsonl,
+    'json': write_json_array,
+    'csv': write_csv
+}
@@ -0,0 +1,243 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from utils.logger import logger
+from utils.exceptions import DatabaseError
+
+
+# Marqueurs internes de la file d'écriture
+_BARRIER = object()
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Écrivain différé : un thread dédié regroupe les écritures et les valide par lots
+
+    Les appelants soumettent une opération (fonction recevant la connexion) et reçoivent
+    immédiatement un Future résolu avec son résultat (typiquement l'ID de ligne) après
+    la validation du lot. Un lot est validé tous les batch_size éléments ou toutes les
+    flush_interval_ms millisecondes. Les écritures encore en mémoire sont perdues en cas
+    d'arrêt brutal du processus ; flush() sert de barrière pour les appelants qui en ont besoin.
+    """
+
+    def __init__(self, connections, batch_size=100, flush_interval_ms=50):
+        """
+        Initialise l'écrivain
+
+        Args:
+            connections (ConnectionManager): Gestionnaire de connexions
+            batch_size (int): Nombre d'opérations maximum par transaction
+            flush_interval_ms (int): Délai maximum avant validation d'un lot incomplet
+        """
+        self.connections = connections
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._batch_results = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.stats = {'operations': 0, 'batches': 0, 'failures': 0}
+
+    def _ensure_started(self):
+        """Démarre le thread d'écriture à la première soumission"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+                self._thread.start()
+                logger.debug("Thread d'écriture différée démarré")
+
+    def submit(self, operation):
+        """
+        Soumet une opération d'écriture
+
+        Args:
+            operation (callable): Fonction (connexion) -> résultat, exécutée dans le thread d'écriture
+
+        Returns:
+            Future: Résolu avec le résultat de l'opération une fois le lot validé
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((operation, future))
+        return future
+
+    def resolve(self, value):
+        """
+        Résout une valeur pouvant être le Future d'une écriture antérieure
+
+        À utiliser dans une opération : le résultat d'une écriture du même lot est
+        disponible avant la validation.
+
+        Args:
+            value: Valeur ou Future
+
+        Returns:
+            Valeur résolue
+        """
+        if not isinstance(value, Future):
+            return value
+        if value in self._batch_results:
+            return self._batch_results[value]
+        return value.result()
+
+    def flush(self, timeout=None):
+        """
+        Attend la validation de toutes les écritures soumises avant l'appel
+
+        Args:
+            timeout (float, optional): Délai d'attente maximum
+
+        Returns:
+            bool: True si les écritures sont validées
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+
+        barrier = Future()
+        self._queue.put((_BARRIER, barrier))
+        try:
+            barrier.result(timeout)
+            return True
+        except Exception:
+            logger.warning("Délai dépassé lors du vidage des écritures différées")
+            return False
+
+    def close(self, timeout=None):
+        """
+        Valide les écritures en attente et arrête le thread d'écriture
+
+        Args:
+            timeout (float, optional): Délai d'attente maximum
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _collect(self, first):
+        """
+        Regroupe les opérations disponibles dans la limite de taille et de délai
+
+        Returns:
+            tuple: (lot, marqueurs rencontrés)
+        """
+        batch = [first]
+        markers = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if item[0] is _BARRIER or item[0] is _STOP:
+                markers.append(item)
+                break
+            batch.append(item)
+
+        return batch, markers
+
+    def _run(self):
+        """Boucle du thread d'écriture"""
+        while True:
+            item = self._queue.get()
+            if item[0] is _STOP:
+                break
+            if item[0] is _BARRIER:
+                item[1].set_result(True)
+                continue
+
+            batch, markers = self._collect(item)
+            self._write_batch(batch)
+
+            stop = False
+            for marker, future in markers:
+                if marker is _BARRIER:
+                    future.set_result(True)
+                else:
+                    stop = True
+            if stop:
+                break
+
+        # Vider ce qui reste avant l'arrêt
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] is _BARRIER:
+                item[1].set_result(True)
+            elif item[0] is not _STOP:
+                pending.append(item)
+        if pending:
+            self._write_batch(pending)
+
+        self.connections.close_thread_connection()
+        logger.debug("Thread d'écriture différée arrêté")
+
+    def _write_batch(self, batch):
+        """
+        Exécute un lot dans une seule transaction
+
+        En cas d'échec, le lot est rejoué opération par opération afin qu'une
+        écriture invalide n'entraîne pas les autres.
+        """
+        self._batch_results = {}
+        try:
+            with self.connections.transaction():
+                conn = self.connections.get_connection()
+                for operation, future in batch:
+                    self._batch_results[future] = operation(conn)
+        except Exception as e:
+            logger.warning(f"Échec du lot d'écritures ({len(batch)}), rejeu individuel: {str(e)}")
+            self._batch_results = {}
+            for operation, future in batch:
+                self._write_single(operation, future)
+            self.stats['batches'] += 1
+            return
+
+        for _, future in batch:
+            future.set_result(self._batch_results[future])
+        self._batch_results = {}
+
+        self.stats['operations'] += len(batch)
+        self.stats['batches'] += 1
+
+    def _write_single(self, operation, future):
+        """Exécute une opération dans sa propre transaction"""
+        try:
+            with self.connections.transaction():
+                result = operation(self.connections.get_connection())
+        except Exception as e:
+            self.stats['failures'] += 1
+            logger.error(f"Erreur lors d'une écriture différée: {str(e)}")
+            future.set_exception(DatabaseError(f"Échec de l'écriture différée: {str(e)}"))
+            return
+
+        self.stats['operations'] += 1
+        future.set_result(result)
+
+    def get_stats(self):
+        """
+        Récupère les statistiques de l'écrivain
+
+        Returns:
+            dict: Opérations écrites, lots validés, échecs et éléments en attente
+        """
+        stats = dict(self.stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
@@ -1,7 +1,10 @@
 import time
-import pyautogui
 from utils.logger import logger
 from utils.exceptions import InteractionError
+from utils.lazy_import import lazy_import
+
+# Chargé au premier usage
+pyautogui = lazy_import('pyautogui')
 
 
 class KeyboardController:
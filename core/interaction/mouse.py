@@ -1,8 +1,11 @@
 import time
-import pyautogui
 import random
 from utils.logger import logger
 from utils.exceptions import InteractionError
+from utils.lazy_import import lazy_import
+
+# Chargé au premier usage
+pyautogui = lazy_import('pyautogui')
 
 
 class MouseController:
@@ -1,12 +1,15 @@
 import os
 import time
-import pyautogui
-import cv2
-import numpy as np
 from datetime import datetime
 from utils.logger import logger
+from utils.lazy_import import lazy_import
 from utils.exceptions import InteractionError
 
+# Dépendances lourdes chargées au premier usage
+pyautogui = lazy_import('pyautogui')
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
 
 class ScreenManager:
     """
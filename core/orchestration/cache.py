@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from utils.logger import logger
+from utils.exceptions import DatabaseError
+from core.data.connection import ConnectionManager
+
+# Durée de vie par défaut d'une réponse en cache (secondes)
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Bornes de taille du cache (au-delà, les entrées les moins récemment utilisées sont évincées)
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Part des entrées évincées en plus lors d'un dépassement (évite une éviction à chaque ajout)
+EVICTION_SLACK = 0.05
+
+# Recomptage exact de l'occupation toutes les N écritures (entrées ajoutées par d'autres processus)
+COUNTER_RESYNC_PUTS = 1000
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt):
+    """
+    Forme normalisée d'un prompt pour la clé de cache
+
+    Unicode NFC, espaces consécutifs réduits, extrémités retirées. La casse est conservée :
+    elle peut changer la réponse.
+    """
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', str(prompt))).strip()
+
+
+def cache_key(platform, prompt, mode="standard"):
+    """
+    Clé de cache d'un prompt : SHA-256 de (plateforme, prompt normalisé, mode)
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    material = '\0'.join((str(platform).strip().lower(), str(mode), normalize_prompt(prompt)))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class PromptCache:
+    """
+    Cache persistant prompt -> réponse, stocké dans SQLite
+
+    Une réponse obtenue d'une plateforme est conservée sous la clé (plateforme, prompt
+    normalisé, mode) pendant sa durée de vie (TTL). La taille est bornée en nombre
+    d'entrées et en octets : les entrées les moins récemment utilisées sont évincées (LRU).
+    Les compteurs de succès, d'échecs et d'évictions sont tenus en mémoire pour la session.
+    """
+
+    def __init__(self, db_path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialise le cache
+
+        Args:
+            db_path (str, optional): Chemin vers le fichier de base de données (data/liris.db par défaut)
+            ttl (float): Durée de vie d'une entrée (secondes, None = sans expiration)
+            max_entries (int): Nombre maximal d'entrées
+            max_bytes (int): Taille maximale des réponses stockées (octets)
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                   "data", "liris.db")
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # Connexions par thread en autocommit (journal WAL partagé avec la base principale)
+        self.connections = ConnectionManager(db_path, isolation_level=None)
+
+        self._lock = threading.Lock()
+        self._metrics = dict.fromkeys(('hits', 'misses', 'stores', 'evictions', 'expired', 'bypassed'), 0)
+        self._saved_seconds = 0.0
+
+        # Occupation (entrées, octets) tenue à jour à chaque écriture : None = à recompter
+        self._entries = None
+        self._bytes = None
+        self._puts_since_sync = 0
+
+        self._ensure_table()
+        logger.info(f"Cache des prompts initialisé: {self.db_path}")
+
+    def _ensure_table(self):
+        """Vérifie la présence de la table du cache (créée par les migrations du schéma)"""
+        try:
+            conn = self.connections.get_connection()
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompt_cache'").fetchone()
+            if exists is None:
+                # Cache ouvert sur une base pas encore migrée
+                from core.data.database import ensure_schema
+                ensure_schema(self.db_path)
+        except Exception as e:
+            logger.error(f"Erreur lors de la création de la table du cache: {str(e)}")
+            raise DatabaseError(f"Échec de l'initialisation du cache: {str(e)}")
+
+    def _count(self, metric, amount=1):
+        with self._lock:
+            self._metrics[metric] += amount
+
+    def _adjust_usage(self, entries, size):
+        """Met à jour l'occupation tenue en mémoire après un ajout ou une suppression"""
+        with self._lock:
+            if self._entries is not None:
+                self._entries += entries
+                self._bytes += size
+
+    def _invalidate_usage(self):
+        """Force un recomptage de l'occupation (suppressions en masse)"""
+        with self._lock:
+            self._entries = None
+            self._bytes = None
+
+    def _sync_usage(self, conn):
+        """Recompte l'occupation réelle de la table (parcours complet)"""
+        entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM prompt_cache').fetchone()
+        with self._lock:
+            self._entries = entries
+            self._bytes = total
+            self._puts_since_sync = 0
+        return entries, total
+
+    def get(self, platform, prompt, mode="standard"):
+        """
+        Récupère la réponse en cache d'un prompt
+
+        Une entrée expirée est supprimée et compte comme un échec. Un succès rafraîchit
+        la date de dernier accès (LRU).
+
+        Args:
+            platform (str): Plateforme
+            prompt (str): Prompt
+            mode (str): Mode d'envoi
+
+        Returns:
+            dict: Résultat en cache (response, duration, metadata) augmenté de cached_at, ou None
+        """
+        key = cache_key(platform, prompt, mode)
+        now = time.time()
+        try:
+            conn = self.connections.get_connection()
+            row = conn.execute('SELECT response, size, duration, created_at, expires_at FROM prompt_cache '
+                               'WHERE cache_key = ?', (key,)).fetchone()
+
+            if row is None:
+                self._count('misses')
+                return None
+
+            if row['expires_at'] is not None and row['expires_at'] <= now:
+                if conn.execute('DELETE FROM prompt_cache WHERE cache_key = ?', (key,)).rowcount:
+                    self._adjust_usage(-1, -row['size'])
+                self._count('expired')
+                self._count('misses')
+                return None
+
+            conn.execute('UPDATE prompt_cache SET last_access = ?, hit_count = hit_count + 1 '
+                         'WHERE cache_key = ?', (now, key))
+
+            result = json.loads(row['response'])
+            result['cached_at'] = row['created_at']
+            with self._lock:
+                self._metrics['hits'] += 1
+                self._saved_seconds += row['duration'] or 0
+            return result
+
+        except Exception as e:
+            # Un cache défaillant ne doit jamais bloquer l'envoi réel
+            logger.warning(f"Lecture du cache impossible: {str(e)}")
+            self._count('misses')
+            return None
+
+    def put(self, platform, prompt, mode, result, ttl=None):
+        """
+        Enregistre le résultat d'un prompt
+
+        Args:
+            platform (str): Plateforme
+            prompt (str): Prompt
+            mode (str): Mode d'envoi
+            result (dict): Résultat de la plateforme (response, duration, metadata)
+            ttl (float, optional): Durée de vie propre à l'entrée (TTL du cache par défaut)
+
+        Returns:
+            bool: True si l'entrée est enregistrée
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        try:
+            payload = json.dumps(result, ensure_ascii=False, default=str)
+            size = len(payload.encode('utf-8'))
+            if size > self.max_bytes:
+                return False
+
+            key = cache_key(platform, prompt, mode)
+            conn = self.connections.get_connection()
+            previous = conn.execute('SELECT size FROM prompt_cache WHERE cache_key = ?', (key,)).fetchone()
+            conn.execute('''
+                         INSERT OR REPLACE INTO prompt_cache
+                         (cache_key, platform, mode, response, size, duration, created_at, expires_at,
+                          last_access, hit_count)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                         ''', (key, platform, mode, payload, size,
+                               float(result.get('duration') or 0), now, now + ttl if ttl else None, now))
+            if previous is None:
+                self._adjust_usage(1, size)
+            else:
+                self._adjust_usage(0, size - previous['size'])
+            self._count('stores')
+            self._evict(conn)
+            return True
+
+        except Exception as e:
+            logger.warning(f"Écriture dans le cache impossible: {str(e)}")
+            return False
+
+    def _evict(self, conn):
+        """
+        Évince les entrées les moins récemment utilisées au-delà des bornes de taille
+
+        Les bornes sont vérifiées sur l'occupation tenue en mémoire ; la table n'est recomptée
+        qu'en cas de dépassement apparent, après une suppression en masse ou toutes les
+        COUNTER_RESYNC_PUTS écritures.
+        """
+        with self._lock:
+            self._puts_since_sync += 1
+            entries, total = self._entries, self._bytes
+            stale = entries is None or self._puts_since_sync >= COUNTER_RESYNC_PUTS
+
+        if not stale and entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        entries, total = self._sync_usage(conn)
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        if entries > self.max_entries:
+            # Entrées en trop, plus une marge pour ne pas évincer à chaque ajout
+            excess = entries - self.max_entries + int(self.max_entries * EVICTION_SLACK)
+            evicted += conn.execute('''
+                                    DELETE FROM prompt_cache WHERE cache_key IN
+                                    (SELECT cache_key FROM prompt_cache ORDER BY last_access LIMIT ?)
+                                    ''', (excess,)).rowcount
+
+        target = self.max_bytes * (1 - EVICTION_SLACK)
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM prompt_cache').fetchone()[0]
+        if total > target:
+            # Parcours par ancienneté d'accès jusqu'à libérer l'excédent d'octets
+            keys, freed = [], 0
+            for key, size in conn.execute('SELECT cache_key, size FROM prompt_cache ORDER BY last_access'):
+                if total - freed <= target:
+                    break
+                keys.append((key,))
+                freed += size
+            conn.executemany('DELETE FROM prompt_cache WHERE cache_key = ?', keys)
+            evicted += len(keys)
+
+        if evicted:
+            self._sync_usage(conn)
+            self._count('evictions', evicted)
+            logger.debug(f"Cache des prompts: {evicted} entrée(s) évincée(s)")
+
+    def invalidate(self, platform=None, prompt=None, mode="standard"):
+        """
+        Supprime des entrées du cache
+
+        Args:
+            platform (str, optional): Plateforme (toutes par défaut)
+            prompt (str, optional): Prompt précis (avec platform et mode)
+            mode (str): Mode d'envoi du prompt précis
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        conn = self.connections.get_connection()
+        if prompt is not None and platform is not None:
+            cursor = conn.execute('DELETE FROM prompt_cache WHERE cache_key = ?',
+                                  (cache_key(platform, prompt, mode),))
+        elif platform is not None:
+            cursor = conn.execute('DELETE FROM prompt_cache WHERE platform = ?', (platform,))
+        else:
+            cursor = conn.execute('DELETE FROM prompt_cache')
+        if cursor.rowcount:
+            self._invalidate_usage()
+        return cursor.rowcount
+
+    def purge_expired(self):
+        """
+        Supprime les entrées expirées
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        conn = self.connections.get_connection()
+        removed = conn.execute('DELETE FROM prompt_cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                               (time.time(),)).rowcount
+        if removed:
+            self._invalidate_usage()
+            self._count('expired', removed)
+        return removed
+
+    def record_bypass(self):
+        """Compte un envoi qui a volontairement ignoré le cache (bypass ou refresh)"""
+        self._count('bypassed')
+
+    def get_stats(self):
+        """
+        Statistiques du cache
+
+        Returns:
+            dict: Compteurs de la session (hits, misses, hit_rate, stores, evictions, expired,
+                bypassed, saved_seconds) et occupation (entries, bytes)
+        """
+        with self._lock:
+            stats = dict(self._metrics)
+            stats['saved_seconds'] = round(self._saved_seconds, 1)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+
+        try:
+            entries, total = self.connections.get_connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM prompt_cache').fetchone()
+        except Exception:
+            entries, total = None, None
+        stats['entries'] = entries
+        stats['bytes'] = total
+        return stats
+
+    def close(self):
+        """Ferme les connexions du cache"""
+        self.connections.close_all()
@@ -11,15 +11,27 @@ import queue
 import os
 import json
 import random
-import pyautogui
-import pyperclip
 import re
 import sys
 import subprocess
-from datetime import datetime
+from datetime import datetime, timedelta
 from utils.logger import logger
 from utils.exceptions import OrchestrationError, SchedulingError
+from utils.lazy_import import lazy_import
 from core.orchestration.state_automation import StateBasedAutomation
+from core.orchestration.router import PlatformRouter
+from core.orchestration.hedging import HedgingPolicy
+from core.orchestration.cache import PromptCache
+
+# Historique persisté (cumuls journaliers) utilisé pour initialiser le routeur
+ROUTER_HISTORY_DAYS = 7
+
+# Quantiles de latence (1 %, 3 %, ... 99 %) tenant lieu d'observations passées
+ROUTER_HISTORY_QUANTILES = tuple((2 * i + 1) / 100 for i in range(50))
+
+# Chargés au premier usage
+pyautogui = lazy_import('pyautogui')
+pyperclip = lazy_import('pyperclip')
 
 try:
     import pygetwindow as gw
@@ -445,6 +457,11 @@ class AIConductor:
         self.task_counter = 0
         self.task_queue = queue.Queue()
         self.lock = threading.RLock()
+        # Une seule automatisation (souris, clavier, navigateur) : un envoi à la fois
+        self.automation_lock = threading.Lock()
+        self._automation_token = None
+        # Sessions d'historique par plateforme (durées et résultats alimentant les cumuls)
+        self._history_sessions = {}
         self._shutdown = False
         self.worker_thread = None
 
@@ -456,6 +473,48 @@ class AIConductor:
         self.browser_manager = BrowserManager()
         self.window_manager = WindowManager()
         self.js_executor = JSExecutor(self.keyboard_controller, self.window_manager)
+        self.router = PlatformRouter(self.scheduler)
+        self._seed_router_history()
+        self.hedging = HedgingPolicy(self.scheduler, self.router)
+
+        # Cache prompt -> réponse (opt-in, voir enable_cache)
+        self.cache = None
+
+    def _seed_router_history(self, days=ROUTER_HISTORY_DAYS):
+        """
+        Initialise le routeur avec les latences et taux de succès des derniers jours
+
+        Les cumuls journaliers de la base (get_usage_aggregates) fournissent, par plateforme,
+        le taux de succès et des quantiles de latence répartis uniformément, qui tiennent
+        lieu d'observations jusqu'aux premières requêtes de la session.
+
+        Args:
+            days (int): Nombre de jours d'historique pris en compte
+        """
+        if not hasattr(self.database, 'get_usage_aggregates'):
+            return
+
+        quantiles = ROUTER_HISTORY_QUANTILES
+        try:
+            aggregates = self.database.get_usage_aggregates(
+                'day', date_from=(datetime.now() - timedelta(days=days)).isoformat(), percentiles=quantiles)
+        except Exception as e:
+            logger.warning(f"Historique des plateformes indisponible pour le routeur: {str(e)}")
+            return
+
+        for entry in aggregates:
+            latencies = [entry[f"latency_p{int(round(q * 100))}_ms"] for q in quantiles]
+            latencies = [value / 1000 for value in latencies if value is not None]
+
+            # Pas plus d'observations simulées que de durées mesurées ni que la fenêtre du routeur
+            samples = min(len(latencies), entry['duration_count'] or 0, self.router.window)
+            if samples < len(latencies):
+                latencies = [latencies[int((j + 0.5) * len(latencies) / samples)] for j in range(samples)]
+
+            self.router.seed_history(entry['platform'], latencies, entry['success_rate'])
+
+        if aggregates:
+            logger.debug(f"Routeur initialisé avec l'historique de {len(aggregates)} plateforme(s)")
 
     def initialize(self):
         try:
@@ -657,11 +716,33 @@ class AIConductor:
             return None
 
     def test_platform(self, platform_name, test_message="Test", timeout=30, wait_for_response=12, 
-                     skip_browser=True, **kwargs):
+                     skip_browser=True, cancel_token=None, **kwargs):
         start_time = time.time()
         test_id = f"test_{platform_name}_{int(start_time)}"
 
+        # L'automatisation partagée (état, signal de fin, souris, clavier) n'est pas réentrante
+        with self.automation_lock:
+            with self.lock:
+                self._automation_token = cancel_token
+            try:
+                return self._test_platform_locked(platform_name, test_message, timeout, skip_browser,
+                                                  cancel_token, start_time, test_id)
+            finally:
+                with self.lock:
+                    self._automation_token = None
+
+    def _test_platform_locked(self, platform_name, test_message, timeout, skip_browser, cancel_token,
+                              start_time, test_id):
         try:
+            if cancel_token is not None and cancel_token.is_set():
+                return {
+                    'success': False,
+                    'error': 'cancelled',
+                    'message': "Request cancelled",
+                    'test_id': test_id,
+                    'duration': time.time() - start_time
+                }
+
             self.window_manager.clear_cache()
 
             config_result = self.validate_platform_config(platform_name)
@@ -701,7 +782,10 @@ class AIConductor:
                 'skip_browser_activation': True
             }
 
-            automation_result = self.run_automation(profile, automation_params, timeout, browser_type)
+            if cancel_token is not None and cancel_token.is_set():
+                automation_result = {'success': False, 'message': "Request cancelled"}
+            else:
+                automation_result = self.run_automation(profile, automation_params, timeout, browser_type)
             if not automation_result['success']:
                 return {
                     'success': False,
@@ -738,6 +822,18 @@ class AIConductor:
                 'duration': time.time() - start_time
             }
 
+    def cancel_automation(self, token):
+        """
+        Interrompt l'automatisation en cours si elle appartient à la requête du jeton
+
+        Args:
+            token (threading.Event): Jeton d'annulation passé à test_platform
+        """
+        token.set()
+        with self.lock:
+            if self._automation_token is token and self.state_automation.is_running:
+                self.state_automation.stop_automation()
+
     def wait_for_ai_response(self, platform_name, max_wait_time):
         js_code = self.js_executor.get_detection_script(platform_name)
         return self.js_executor.execute(js_code, platform_name, max_wait_time)
@@ -1037,6 +1133,20 @@ class AIConductor:
         except Exception:
             return []
 
+    def choose_platform(self, candidates=None, exclude=None):
+        """Plateforme qui terminera le plus tôt selon quotas, latence et taux de succès"""
+        if candidates is None:
+            candidates = self.get_available_platforms()
+        if not candidates:
+            return None
+        return self.router.choose_platform(candidates, exclude) or candidates[0]
+
+    def distribute_batch(self, count, candidates=None):
+        """Répartit un lot de prompts entre plateformes proportionnellement à leur capacité"""
+        if candidates is None:
+            candidates = self.get_available_platforms()
+        return self.router.distribute(count, candidates)
+
     def shutdown(self):
         try:
             self._shutdown = True
@@ -1044,6 +1154,8 @@ class AIConductor:
                 self.state_automation.stop_automation()
             if self.worker_thread and self.worker_thread.is_alive():
                 self.worker_thread.join(timeout=2)
+            if self.cache is not None:
+                self.cache.close()
         except Exception:
             pass
 
@@ -1066,33 +1178,196 @@ class AIConductor:
             except Exception:
                 break
 
-    def send_prompt(self, platform, prompt, mode="standard", priority=0, sync=False, timeout=None):
+    def send_prompt(self, platform, prompt, mode="standard", priority=0, sync=False, timeout=None, hedge=None,
+                    cache=None, refresh=False):
+        """
+        Envoie un prompt à une plateforme
+
+        Avec le cache activé (enable_cache), un prompt synchrone déjà envoyé à la même
+        plateforme dans le même mode est servi depuis le cache, sans consommer de quota.
+
+        Args:
+            platform (str): Plateforme cible
+            prompt (str): Prompt
+            mode (str): Mode d'envoi
+            priority (int): Priorité
+            sync (bool): Attendre la réponse
+            timeout (float, optional): Délai maximum d'attente
+            hedge (bool, optional): Couverture des requêtes lentes (réglage global par défaut)
+            cache (bool, optional): False pour ignorer le cache (ni lecture ni écriture)
+            refresh (bool): Ignorer l'entrée en cache et la remplacer par une réponse fraîche
+
+        Returns:
+            dict: Tâche terminée (id, status, result)
+        """
         try:
+            use_cache = sync and self.cache is not None and cache is not False
+            if use_cache and not refresh:
+                cached = self.cache.get(platform, prompt, mode)
+                if cached is not None:
+                    return self._cached_response(cached, platform)
+            elif sync and self.cache is not None:
+                self.cache.record_bypass()
+
             can_use, reason = self.scheduler.can_use_platform(platform)
             if not can_use:
                 raise SchedulingError(reason)
 
             if sync:
-                result = self.test_platform(platform, prompt, timeout or 30, 12)
-
-                if result['success']:
-                    return {
-                        'id': self.task_counter + 1,
-                        'status': 'completed',
-                        'result': {
-                            'response': result.get('response', ''),
-                            'duration': result.get('duration', 0),
-                            'metadata': result.get('metadata', {})
-                        }
-                    }
+                use_hedge = self.hedging.enabled if hedge is None else hedge
+                target = platform
+                if not use_hedge:
+                    response = self._send_sync(platform, prompt, timeout, mode=mode)
                 else:
-                    raise OrchestrationError(result['message'])
+                    # Couverture : dupliquer le prompt si la plateforme dépasse son p90
+                    target, response, hedged = self.hedging.execute(
+                        platform, lambda target_platform, token, remaining: self._send_sync(
+                            target_platform, prompt, remaining, token, mode),
+                        timeout=timeout, cancel_func=self.cancel_automation
+                    )
+                    response['result']['metadata'] = dict(response['result'].get('metadata', {}),
+                                                           hedged=hedged, platform=target)
+
+                if use_cache:
+                    # Réponse rangée sous la plateforme qui l'a produite (celle du hedge le cas échéant)
+                    self.cache.put(target, prompt, mode, response['result'])
+                return response
 
             raise NotImplementedError("Async mode not implemented")
 
         except Exception as e:
             raise OrchestrationError(f"Send failed: {str(e)}")
 
+    def _send_sync(self, platform, prompt, timeout=None, cancel_token=None, mode="standard"):
+        self.router.begin_request(platform)
+        started = time.time()
+        try:
+            result = self.test_platform(platform, prompt, timeout or 30, 12, cancel_token=cancel_token)
+        except Exception as e:
+            duration = time.time() - started
+            self.router.record_outcome(platform, duration, False)
+            self._record_exchange(platform, prompt, mode, str(e), duration,
+                                  'timeout' if isinstance(e, TimeoutError) else 'unexpected_error')
+            raise
+
+        duration = time.time() - started
+        if cancel_token is not None and cancel_token.is_set() and not result['success']:
+            # Interrompue par la couverture : ni latence ni échec à imputer à la plateforme
+            self.router.cancel_request(platform)
+        else:
+            self.router.record_outcome(platform, duration, result['success'])
+            if result['success']:
+                self._record_exchange(platform, prompt, mode, result.get('response', ''), duration, 'success')
+            else:
+                self._record_exchange(platform, prompt, mode, result.get('message', ''), duration,
+                                      result.get('error', 'error'))
+
+        if not result['success']:
+            raise OrchestrationError(result['message'])
+
+        return {
+            'id': self.task_counter + 1,
+            'status': 'completed',
+            'result': {
+                'response': result.get('response', ''),
+                'duration': result.get('duration', 0),
+                'metadata': result.get('metadata', {})
+            }
+        }
+
+    def _record_exchange(self, platform, prompt, mode, response, duration, outcome_code):
+        """
+        Historise un envoi synchrone (prompt, réponse, durée et résultat) par l'écrivain différé
+
+        Les durées enregistrées alimentent les cumuls de latence qui initialisent le routeur
+        au démarrage (_seed_router_history). Une erreur d'historisation n'interrompt pas l'envoi.
+
+        Args:
+            platform (str): Plateforme ayant traité le prompt
+            prompt (str): Prompt envoyé
+            mode (str): Mode d'envoi (type d'opération)
+            response (str): Réponse, ou message d'erreur
+            duration (float): Durée de la requête (secondes)
+            outcome_code (str): 'success' ou code d'erreur ('timeout', 'automation_failed'...)
+        """
+        if not hasattr(self.database, 'record_prompt_async'):
+            return
+
+        try:
+            with self.lock:
+                session_id = self._history_sessions.get(platform)
+                if session_id is None:
+                    session_id = self._history_sessions[platform] = self.database.create_session(platform)
+
+            duration_ms = int(duration * 1000)
+            prompt_id = self.database.record_prompt_async(session_id, prompt, len(prompt.split()), mode)
+            self.database.record_response_async(prompt_id, response or '',
+                                                'success' if outcome_code == 'success' else 'error',
+                                                duration_ms, outcome_code)
+        except Exception as e:
+            logger.warning(f"Historisation de l'envoi vers {platform} impossible: {str(e)}")
+
+    def _cached_response(self, cached, platform):
+        """Réponse synchrone construite à partir d'une entrée du cache"""
+        cached_at = cached.pop('cached_at', None)
+        metadata = dict(cached.get('metadata') or {}, cached=True)
+        metadata.setdefault('platform', platform)
+        if cached_at:
+            metadata['cache_age'] = round(time.time() - cached_at, 1)
+
+        return {
+            'id': self.task_counter + 1,
+            'status': 'completed',
+            'result': dict(cached, metadata=metadata)
+        }
+
+    def enable_cache(self, enabled=True, db_path=None, ttl=None, max_entries=None, max_bytes=None):
+        """
+        Active le cache persistant des réponses (opt-in)
+
+        Args:
+            enabled (bool): Activer (True) ou désactiver (False) le cache
+            db_path (str, optional): Base SQLite du cache (base de l'application par défaut)
+            ttl (float, optional): Durée de vie des entrées (secondes)
+            max_entries (int, optional): Nombre maximal d'entrées
+            max_bytes (int, optional): Taille maximale des réponses stockées (octets)
+
+        Returns:
+            PromptCache: Cache actif, None s'il est désactivé
+        """
+        if not enabled:
+            if self.cache is not None:
+                self.cache.close()
+            self.cache = None
+            return None
+
+        if db_path is None and self.database is not None:
+            db_path = getattr(self.database, 'db_path', None)
+
+        options = {key: value for key, value in
+                   (('ttl', ttl), ('max_entries', max_entries), ('max_bytes', max_bytes)) if value is not None}
+
+        if self.cache is None or (db_path and db_path != self.cache.db_path):
+            if self.cache is not None:
+                self.cache.close()
+            self.cache = PromptCache(db_path, **options)
+        else:
+            for key, value in options.items():
+                setattr(self.cache, key, value)
+        return self.cache
+
+    def get_cache_stats(self):
+        """Statistiques du cache des réponses (None s'il est désactivé)"""
+        return self.cache.get_stats() if self.cache is not None else None
+
+    def enable_hedging(self, enabled=True, percentile=None, min_delay=None):
+        """Active la couverture des prompts synchrones lents (opt-in)"""
+        self.hedging.enabled = enabled
+        if percentile is not None:
+            self.hedging.percentile = percentile
+        if min_delay is not None:
+            self.hedging.min_delay = min_delay
+
     def detect_platform_elements(self, platform_name, browser_type='Chrome', browser_path='', url='', fullscreen=False):
         return {
             'success': False,
@@ -0,0 +1,259 @@
+import threading
+import time
+from datetime import date
+from utils.logger import logger
+
+
+class HedgeBudget:
+    """
+    Quota journalier propre aux requêtes de couverture (hedges)
+
+    Chaque plateforme dispose d'une petite fraction de sa limite journalière pour les
+    duplicatas, comptée à part, afin que la couverture ne consomme pas les quotas utiles.
+    """
+
+    def __init__(self, scheduler, fraction=0.05, unlimited_allowance=20):
+        """
+        Initialise le budget
+
+        Args:
+            scheduler (AIScheduler): Planificateur (limites par plateforme)
+            fraction (float): Part de la limite journalière réservée aux hedges
+            unlimited_allowance (int): Allocation pour une plateforme sans limite journalière
+        """
+        self.scheduler = scheduler
+        self.fraction = fraction
+        self.unlimited_allowance = unlimited_allowance
+
+        self.used = {}
+        self.day = date.today()
+        self.lock = threading.Lock()
+
+    def _allowance(self, availability):
+        """Calcule l'allocation journalière à partir de la limite de la plateforme"""
+        max_prompts = availability.get('max_prompts', float('inf'))
+        if max_prompts == float('inf'):
+            return self.unlimited_allowance
+        return int(max_prompts * self.fraction)
+
+    def try_acquire(self, platform, availability):
+        """
+        Réserve un hedge sur une plateforme si son budget et son quota restant le permettent
+
+        Args:
+            platform (str): Plateforme de couverture
+            availability (dict): Entrée de get_platform_availability du planificateur
+
+        Returns:
+            bool: True si le hedge peut être lancé
+        """
+        if not availability or not availability.get('available', False):
+            return False
+
+        allowance = self._allowance(availability)
+
+        # Garder au moins l'allocation de hedge en réserve sur le quota principal
+        remaining = availability.get('max_prompts', float('inf')) - availability.get('used_prompts', 0)
+        if remaining <= allowance:
+            return False
+
+        with self.lock:
+            if date.today() != self.day:
+                self.used.clear()
+                self.day = date.today()
+
+            if self.used.get(platform, 0) >= allowance:
+                return False
+
+            self.used[platform] = self.used.get(platform, 0) + 1
+            return True
+
+    def release(self, platform):
+        """
+        Rend un hedge réservé mais finalement non lancé
+
+        Args:
+            platform (str): Plateforme de couverture
+        """
+        with self.lock:
+            if self.used.get(platform, 0) > 0:
+                self.used[platform] -= 1
+
+    def get_usage(self):
+        """
+        Récupère le nombre de hedges consommés aujourd'hui
+
+        Returns:
+            dict: Hedges utilisés par plateforme
+        """
+        with self.lock:
+            return dict(self.used)
+
+
+class HedgingPolicy:
+    """
+    Politique de couverture des requêtes lentes
+
+    Si la requête principale dépasse le p90 de latence de sa plateforme, elle est interrompue
+    et le même prompt est envoyé à la meilleure autre plateforme disposant de quota.
+    """
+
+    def __init__(self, scheduler, router, enabled=False, percentile=0.9, min_delay=2.0, budget=None):
+        """
+        Initialise la politique
+
+        Args:
+            scheduler (AIScheduler): Planificateur (quotas)
+            router (PlatformRouter): Routeur (latences observées, classement)
+            enabled (bool): Couverture activée par défaut pour les envois synchrones
+            percentile (float): Percentile de latence déclenchant le hedge
+            min_delay (float): Délai minimum avant un hedge (secondes)
+            budget (HedgeBudget, optional): Budget dédié aux hedges
+        """
+        self.scheduler = scheduler
+        self.router = router
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget = budget or HedgeBudget(scheduler)
+
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+        self.lock = threading.Lock()
+
+    def hedge_delay(self, platform):
+        """
+        Délai après lequel la requête principale est couverte
+
+        Args:
+            platform (str): Plateforme principale
+
+        Returns:
+            float: Délai en secondes
+        """
+        return max(self.min_delay, self.router.get_latency_percentile(platform, self.percentile))
+
+    def pick_backup(self, platform):
+        """
+        Choisit la plateforme de couverture et réserve son budget
+
+        Args:
+            platform (str): Plateforme principale
+
+        Returns:
+            str: Plateforme de couverture ou None
+        """
+        availability = self.scheduler.get_platform_availability() if self.scheduler else {}
+
+        for candidate, _ in self.router.rank_platforms(exclude=[platform]):
+            if self.budget.try_acquire(candidate, availability.get(candidate)):
+                return candidate
+
+        return None
+
+    def execute(self, platform, send_func, timeout=None, cancel_func=None):
+        """
+        Exécute une requête avec couverture séquentielle
+
+        Toutes les plateformes passent par la même automatisation (souris, clavier, navigateur) :
+        deux requêtes ne peuvent pas tourner en même temps. Si la principale n'a pas répondu
+        au p90 de sa plateforme, elle est interrompue puis le prompt est envoyé à la plateforme
+        de couverture. Un échec de la principale déclenche le hedge immédiatement.
+
+        Args:
+            platform (str): Plateforme principale
+            send_func (callable): Fonction (plateforme, jeton d'annulation, délai restant) -> résultat,
+                levant une exception en cas d'échec (délai None : pas de limite globale)
+            timeout (float, optional): Délai maximum global
+            cancel_func (callable, optional): Fonction (jeton) interrompant la requête de ce jeton
+
+        Returns:
+            tuple: (plateforme ayant répondu, résultat, True si la réponse vient du hedge)
+        """
+        outcome = {}
+        token = threading.Event()
+
+        with self.lock:
+            self.stats['requests'] += 1
+
+        started = time.time()
+        deadline = started + timeout if timeout else None
+
+        def remaining(until=None):
+            limits = [t for t in (until, deadline) if t is not None]
+            return max(0.0, min(limits) - time.time()) if limits else None
+
+        def run():
+            try:
+                outcome['result'] = send_func(platform, token, remaining())
+            except Exception as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(remaining(started + self.hedge_delay(platform)))
+
+        if 'result' in outcome:
+            return platform, outcome['result'], False
+
+        backup = self.pick_backup(platform)
+        if backup is None:
+            # Pas de couverture possible : attendre la principale jusqu'au délai global
+            worker.join(remaining())
+            if 'result' in outcome:
+                return platform, outcome['result'], False
+            if 'error' in outcome:
+                raise outcome['error']
+            token.set()
+            if cancel_func:
+                cancel_func(token)
+            raise TimeoutError(f"Aucune réponse valide après {timeout}s")
+
+        if worker.is_alive():
+            # Libérer l'automatisation avant d'envoyer le prompt à la plateforme de couverture
+            logger.info(f"Requête {platform} interrompue après {time.time() - started:.1f}s, "
+                        f"hedge vers {backup}")
+            token.set()
+            if cancel_func:
+                cancel_func(token)
+            worker.join(remaining())
+
+            if 'result' in outcome:
+                # Réponse arrivée pendant l'interruption : le hedge n'est pas consommé
+                self.budget.release(backup)
+                return platform, outcome['result'], False
+            if worker.is_alive():
+                self.budget.release(backup)
+                raise TimeoutError(f"Aucune réponse valide après {timeout}s")
+        else:
+            logger.info(f"Échec de la requête {platform}, hedge vers {backup}")
+
+        # La couverture n'a droit qu'au reste du délai global
+        backup_timeout = remaining()
+        if backup_timeout is not None and backup_timeout <= 0:
+            self.budget.release(backup)
+            if 'error' in outcome:
+                raise outcome['error']
+            raise TimeoutError(f"Aucune réponse valide après {timeout}s")
+
+        with self.lock:
+            self.stats['hedged'] += 1
+
+        # Une exception de la couverture remonte telle quelle : le hedge n'est pas gagnant
+        result = send_func(backup, threading.Event(), backup_timeout)
+        if result:
+            # Principale en échec ou interrompue, couverture réussie
+            with self.lock:
+                self.stats['hedge_wins'] += 1
+        return backup, result, True
+
+    def get_stats(self):
+        """
+        Récupère les statistiques de couverture
+
+        Returns:
+            dict: Requêtes, hedges lancés, hedges gagnants et budget consommé
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        stats['budget_used'] = self.budget.get_usage()
+        return stats
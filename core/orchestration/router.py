@@ -0,0 +1,328 @@
+import math
+import threading
+import time
+from collections import deque
+from utils.logger import logger
+
+
+class PlatformStats:
+    """
+    Historique glissant des latences et des résultats d'une plateforme
+    """
+
+    __slots__ = ('latencies', 'outcomes', 'ewma_latency', 'in_flight', 'last_failure')
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.ewma_latency = None
+        self.in_flight = 0
+        self.last_failure = None
+
+
+class PlatformRouter:
+    """
+    Choisit la plateforme d'IA qui terminera le plus tôt une requête
+
+    Le score d'une plateforme est un temps de fin estimé : latence observée corrigée par
+    le taux de succès (tentatives attendues), plus l'attente due aux requêtes déjà en vol
+    et au cooldown. Les plateformes sans quota restant sont exclues.
+    """
+
+    def __init__(self, scheduler, window=50, default_latency=30.0, ewma_alpha=0.3):
+        """
+        Initialise le routeur
+
+        Args:
+            scheduler (AIScheduler): Planificateur (quotas, cooldowns)
+            window (int): Nombre d'observations conservées par plateforme
+            default_latency (float): Latence supposée (secondes) sans historique
+            ewma_alpha (float): Poids des observations récentes dans la moyenne mobile
+        """
+        self.scheduler = scheduler
+        self.window = window
+        self.default_latency = default_latency
+        self.ewma_alpha = ewma_alpha
+
+        self.stats = {}
+        self.lock = threading.RLock()
+
+    def _get_stats(self, platform):
+        """Récupère (ou crée) l'historique d'une plateforme"""
+        stats = self.stats.get(platform)
+        if stats is None:
+            stats = PlatformStats(self.window)
+            self.stats[platform] = stats
+        return stats
+
+    def seed_history(self, platform, latencies, success_rate=None):
+        """
+        Initialise l'historique d'une plateforme à partir de mesures persistées
+
+        Args:
+            platform (str): Nom de la plateforme
+            latencies (list): Latences passées en secondes
+            success_rate (float, optional): Taux de succès passé (0-1)
+        """
+        with self.lock:
+            stats = self._get_stats(platform)
+            seeded = latencies[-self.window:]
+            for latency in seeded:
+                self._add_latency(stats, latency)
+            if seeded:
+                # Moyenne des mesures : la moyenne mobile dépendrait de leur ordre (quantiles triés)
+                stats.ewma_latency = sum(seeded) / len(seeded)
+
+            if success_rate is not None:
+                samples = max(len(stats.latencies), 1)
+                successes = int(round(success_rate * samples))
+                stats.outcomes.extend([True] * successes + [False] * (samples - successes))
+
+    def _add_latency(self, stats, latency):
+        """Ajoute une latence à l'historique et met à jour la moyenne mobile"""
+        stats.latencies.append(latency)
+        if stats.ewma_latency is None:
+            stats.ewma_latency = latency
+        else:
+            stats.ewma_latency = self.ewma_alpha * latency + (1 - self.ewma_alpha) * stats.ewma_latency
+
+    def begin_request(self, platform):
+        """
+        Signale le départ d'une requête vers une plateforme
+
+        Args:
+            platform (str): Nom de la plateforme
+        """
+        with self.lock:
+            self._get_stats(platform).in_flight += 1
+
+    def record_outcome(self, platform, duration, success):
+        """
+        Enregistre le résultat d'une requête terminée
+
+        Args:
+            platform (str): Nom de la plateforme
+            duration (float): Durée de la requête en secondes
+            success (bool): Succès de la requête
+        """
+        with self.lock:
+            stats = self._get_stats(platform)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.outcomes.append(bool(success))
+
+            if success:
+                self._add_latency(stats, duration)
+            else:
+                stats.last_failure = time.time()
+
+    def cancel_request(self, platform):
+        """
+        Signale une requête interrompue avant sa fin (ni succès ni échec)
+
+        Args:
+            platform (str): Nom de la plateforme
+        """
+        with self.lock:
+            stats = self._get_stats(platform)
+            stats.in_flight = max(0, stats.in_flight - 1)
+
+    def get_latency_percentile(self, platform, percentile):
+        """
+        Calcule un percentile des latences observées
+
+        Args:
+            platform (str): Nom de la plateforme
+            percentile (float): Percentile entre 0 et 1 (ex: 0.9)
+
+        Returns:
+            float: Latence en secondes (latence par défaut sans historique)
+        """
+        with self.lock:
+            stats = self.stats.get(platform)
+            if stats is None or not stats.latencies:
+                return self.default_latency
+            ordered = sorted(stats.latencies)
+
+        index = min(len(ordered) - 1, max(0, int(math.ceil(percentile * len(ordered))) - 1))
+        return ordered[index]
+
+    def get_success_rate(self, platform):
+        """
+        Calcule le taux de succès récent d'une plateforme (lissé, 1.0 sans historique)
+
+        Args:
+            platform (str): Nom de la plateforme
+
+        Returns:
+            float: Taux de succès entre 0 et 1
+        """
+        with self.lock:
+            stats = self.stats.get(platform)
+            if stats is None or not stats.outcomes:
+                return 1.0
+            successes = sum(stats.outcomes)
+            total = len(stats.outcomes)
+
+        # Lissage de Laplace pour ne pas exclure une plateforme après un seul échec
+        return (successes + 1) / (total + 2)
+
+    def get_platform_stats(self, platform):
+        """
+        Récupère les statistiques de routage d'une plateforme
+
+        Args:
+            platform (str): Nom de la plateforme
+
+        Returns:
+            dict: Latences (moyenne mobile, p50, p90), taux de succès et requêtes en vol
+        """
+        with self.lock:
+            stats = self._get_stats(platform)
+            return {
+                'samples': len(stats.outcomes),
+                'ewma_latency': stats.ewma_latency if stats.ewma_latency is not None else self.default_latency,
+                'p50_latency': self.get_latency_percentile(platform, 0.5),
+                'p90_latency': self.get_latency_percentile(platform, 0.9),
+                'success_rate': self.get_success_rate(platform),
+                'in_flight': stats.in_flight
+            }
+
+    def estimate_completion_time(self, platform, availability=None):
+        """
+        Estime le délai avant qu'une nouvelle requête sur la plateforme soit terminée
+
+        Args:
+            platform (str): Nom de la plateforme
+            availability (dict, optional): Entrée de get_platform_availability du planificateur
+
+        Returns:
+            float: Délai estimé en secondes (inf si la plateforme est indisponible)
+        """
+        if availability is not None and not availability.get('available', False):
+            return float('inf')
+
+        stats = self.get_platform_stats(platform)
+        latency = stats['ewma_latency']
+        cooldown = self.scheduler.get_cooldown_time(platform) if self.scheduler else 0.0
+
+        # Nombre de tentatives attendues pour obtenir un succès
+        expected_attempts = 1.0 / max(stats['success_rate'], 0.05)
+
+        # Les requêtes déjà en vol passent avant (une plateforme traite une requête à la fois)
+        queue_wait = stats['in_flight'] * (latency + cooldown)
+
+        return queue_wait + expected_attempts * latency + cooldown
+
+    def _get_availability(self):
+        """Récupère l'état des quotas depuis le planificateur"""
+        if self.scheduler is None:
+            return {}
+        return self.scheduler.get_platform_availability()
+
+    def rank_platforms(self, candidates=None, exclude=None):
+        """
+        Classe les plateformes utilisables par temps de fin estimé croissant
+
+        Args:
+            candidates (list, optional): Plateformes à considérer (toutes par défaut)
+            exclude (list, optional): Plateformes à écarter
+
+        Returns:
+            list: Tuples (plateforme, délai estimé) triés
+        """
+        availability = self._get_availability()
+        if candidates is None:
+            candidates = list(availability.keys())
+
+        ranked = []
+        for platform in candidates:
+            if exclude and platform in exclude:
+                continue
+            estimate = self.estimate_completion_time(platform, availability.get(platform))
+            if estimate != float('inf'):
+                ranked.append((platform, estimate))
+
+        # Tri stable : à estimation égale, l'ordre des candidats est conservé
+        ranked.sort(key=lambda entry: entry[1])
+        return ranked
+
+    def choose_platform(self, candidates=None, exclude=None):
+        """
+        Choisit la plateforme qui terminera le plus tôt
+
+        Args:
+            candidates (list, optional): Plateformes à considérer (toutes par défaut)
+            exclude (list, optional): Plateformes à écarter
+
+        Returns:
+            str: Nom de la plateforme ou None si aucune n'est utilisable
+        """
+        ranked = self.rank_platforms(candidates, exclude)
+        if not ranked:
+            return None
+
+        platform, estimate = ranked[0]
+        logger.debug(f"Plateforme choisie par le routeur: {platform} (fin estimée {estimate:.1f}s)")
+        return platform
+
+    def distribute(self, count, candidates=None):
+        """
+        Répartit un lot de requêtes entre les plateformes proportionnellement à leur capacité
+
+        La capacité d'une plateforme est son débit estimé (1 / temps de fin estimé),
+        plafonné par son quota restant.
+
+        Args:
+            count (int): Nombre de requêtes à répartir
+            candidates (list, optional): Plateformes à considérer (toutes par défaut)
+
+        Returns:
+            dict: Nombre de requêtes par plateforme
+        """
+        availability = self._get_availability()
+        ranked = self.rank_platforms(candidates)
+        if not ranked or count <= 0:
+            return {}
+
+        remaining = {}
+        for platform, _ in ranked:
+            info = availability.get(platform, {})
+            max_prompts = info.get('max_prompts', float('inf'))
+            remaining[platform] = max(0, max_prompts - info.get('used_prompts', 0))
+
+        allocation = dict.fromkeys(remaining, 0)
+        to_assign = count
+
+        # Répartition proportionnelle itérative : les plateformes saturées sortent du partage
+        while to_assign > 0:
+            open_platforms = [(p, e) for p, e in ranked if allocation[p] < remaining[p]]
+            if not open_platforms:
+                break
+
+            weights = {p: 1.0 / max(e, 1e-6) for p, e in open_platforms}
+            total_weight = sum(weights.values())
+
+            # Méthode du plus fort reste pour obtenir des entiers
+            shares = {p: to_assign * w / total_weight for p, w in weights.items()}
+            assigned = {p: min(int(shares[p]), remaining[p] - allocation[p]) for p in shares}
+            leftover = to_assign - sum(assigned.values())
+
+            for platform in sorted(shares, key=lambda p: shares[p] - int(shares[p]), reverse=True):
+                if leftover <= 0:
+                    break
+                if allocation[platform] + assigned[platform] < remaining[platform]:
+                    assigned[platform] += 1
+                    leftover -= 1
+
+            progress = sum(assigned.values())
+            for platform, value in assigned.items():
+                allocation[platform] += value
+            to_assign -= progress
+
+            if progress == 0:
+                break
+
+        if to_assign > 0:
+            logger.warning(f"Quota insuffisant: {to_assign} requête(s) non réparties")
+
+        return {platform: n for platform, n in allocation.items() if n > 0}
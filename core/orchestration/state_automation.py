@@ -7,9 +7,12 @@ core/orchestration/state_automation.py
 
 import time
 import json
-import pyperclip
 from PyQt5.QtCore import QObject, pyqtSignal
 from utils.logger import logger
+from utils.lazy_import import lazy_import
+
+# Chargé au premier usage
+pyperclip = lazy_import('pyperclip')
 
 try:
     import pygetwindow as gw
@@ -1,4 +1,7 @@
 """Module de planification et scheduling"""
 from .scheduler import AIScheduler
+from .queue import TaskQueue
+from .durable_queue import DurableTaskStore
+from .jobs import JobScheduler
 
-__all__ = ['AIScheduler']
+__all__ = ['AIScheduler', 'TaskQueue', 'DurableTaskStore', 'JobScheduler']
@@ -0,0 +1,587 @@
+import os
+import json
+import socket
+import sqlite3
+import threading
+import time
+from utils.logger import logger
+from utils.exceptions import DatabaseError, SchedulingError
+
+
+class DurableTaskStore:
+    """
+    File de tâches persistée dans SQLite avec baux (leases), heartbeats et clés d'idempotence
+
+    Une tâche passe par les statuts pending -> running -> completed/failed. Un worker
+    qui réclame une tâche obtient un bail qu'il doit renouveler ; si le processus meurt,
+    le bail expire et la tâche redevient réclamable au redémarrage.
+    """
+
+    def __init__(self, db_path=None, lease_seconds=60, max_attempts=3):
+        """
+        Initialise le stockage durable
+
+        Args:
+            db_path (str, optional): Chemin vers le fichier de base de données
+            lease_seconds (float): Durée d'un bail sans heartbeat
+            max_attempts (int): Nombre maximum de tentatives par tâche
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                   "data", "liris.db")
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # Identifiant du processus propriétaire des baux
+        self.owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._ensure_table()
+
+        logger.info(f"File de tâches durable initialisée: {self.db_path}")
+
+    def _connect(self):
+        """
+        Établit une connexion à la base de données
+
+        Returns:
+            sqlite3.Connection: Objet de connexion
+        """
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            logger.error(f"Erreur de connexion pour la file durable: {str(e)}")
+            raise DatabaseError(f"Échec de connexion pour la file durable: {str(e)}")
+
+    def _ensure_table(self):
+        """Vérifie la présence de la table de la file durable (créée par les migrations du schéma)"""
+        conn = self._connect()
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'durable_tasks'").fetchone()
+        except Exception as e:
+            logger.error(f"Erreur lors de la création de la file durable: {str(e)}")
+            raise DatabaseError(f"Échec de la création de la file durable: {str(e)}")
+        finally:
+            conn.close()
+
+        if exists is None:
+            # File ouverte sur une base pas encore migrée
+            from core.data.database import ensure_schema
+            ensure_schema(self.db_path)
+
+    def owner_id(self, worker_id):
+        """
+        Construit l'identifiant de bail d'un worker
+
+        Args:
+            worker_id: Identifiant du worker dans le processus
+
+        Returns:
+            str: Identifiant unique du worker
+        """
+        return f"{self.owner_prefix}:{worker_id}"
+
+    def enqueue(self, handler, platform=None, args=None, kwargs=None, priority=0, job_id=None,
+                idempotency_key=None):
+        """
+        Persiste une tâche
+
+        Args:
+            handler (str): Nom du gestionnaire enregistré qui exécutera la tâche
+            platform (str, optional): Plateforme d'IA
+            args (list, optional): Arguments positionnels (sérialisables en JSON)
+            kwargs (dict, optional): Arguments nommés (sérialisables en JSON)
+            priority (int): Priorité (valeurs négatives = plus haute priorité)
+            job_id (str, optional): Travail auquel appartient la tâche
+            idempotency_key (str, optional): Clé évitant les doublons ; si elle existe déjà,
+                la tâche existante est renvoyée
+
+        Returns:
+            int: ID de la tâche durable
+        """
+        now = time.time()
+        payload = json.dumps({'args': list(args or ()), 'kwargs': kwargs or {}}, ensure_ascii=False)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      INSERT OR IGNORE INTO durable_tasks
+                                      (job_id, idempotency_key, handler, platform, payload, priority,
+                                       status, created_at, updated_at)
+                                      VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)
+                                      ''', (job_id, idempotency_key, handler, platform, payload,
+                                            priority, now, now))
+
+                if cursor.rowcount == 0 and idempotency_key is not None:
+                    row = conn.execute('SELECT id FROM durable_tasks WHERE idempotency_key = ?',
+                                       (idempotency_key,)).fetchone()
+                    logger.debug(f"Tâche durable existante pour la clé {idempotency_key}: {row['id']}")
+                    return row['id']
+
+                return cursor.lastrowid
+
+            except Exception as e:
+                logger.error(f"Erreur lors de la persistance de la tâche: {str(e)}")
+                raise DatabaseError(f"Échec de la persistance de la tâche: {str(e)}")
+            finally:
+                conn.close()
+
+    def claim(self, task_id, owner, lease_seconds=None):
+        """
+        Réclame une tâche précise si elle est en attente ou si son bail a expiré
+
+        Args:
+            task_id (int): ID de la tâche durable
+            owner (str): Identifiant du worker
+            lease_seconds (float, optional): Durée du bail
+
+        Returns:
+            bool: True si le bail est obtenu
+        """
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET status        = 'running',
+                                          attempts      = attempts + 1,
+                                          lease_owner   = ?,
+                                          lease_expires = ?,
+                                          heartbeat_at  = ?,
+                                          updated_at    = ?
+                                      WHERE id = ?
+                                        AND (status = 'pending'
+                                          OR (status = 'running' AND lease_expires < ?))
+                                      ''', (owner, expires, now, now, task_id, now))
+                return cursor.rowcount == 1
+            finally:
+                conn.close()
+
+    def claim_next(self, owner, lease_seconds=None):
+        """
+        Réclame la prochaine tâche disponible (priorité puis ordre d'insertion)
+
+        Args:
+            owner (str): Identifiant du worker
+            lease_seconds (float, optional): Durée du bail
+
+        Returns:
+            dict: Tâche réclamée ou None si la file est vide
+        """
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('''
+                                   SELECT *
+                                   FROM durable_tasks
+                                   WHERE status = 'pending'
+                                      OR (status = 'running' AND lease_expires < ?)
+                                   ORDER BY priority, id LIMIT 1
+                                   ''', (now,)).fetchone()
+
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+
+                conn.execute('''
+                             UPDATE durable_tasks
+                             SET status        = 'running',
+                                 attempts      = attempts + 1,
+                                 lease_owner   = ?,
+                                 lease_expires = ?,
+                                 heartbeat_at  = ?,
+                                 updated_at    = ?
+                             WHERE id = ?
+                             ''', (owner, expires, now, now, row['id']))
+                conn.execute('COMMIT')
+
+                task = self._row_to_dict(row)
+                task['status'] = 'running'
+                task['attempts'] += 1
+                return task
+
+            except Exception as e:
+                conn.execute('ROLLBACK')
+                logger.error(f"Erreur lors de la réclamation d'une tâche durable: {str(e)}")
+                raise DatabaseError(f"Échec de la réclamation: {str(e)}")
+            finally:
+                conn.close()
+
+    def heartbeat(self, task_id, owner, lease_seconds=None):
+        """
+        Renouvelle le bail d'une tâche en cours
+
+        Args:
+            task_id (int): ID de la tâche durable
+            owner (str): Identifiant du worker détenteur du bail
+            lease_seconds (float, optional): Durée du bail
+
+        Returns:
+            bool: False si le bail a été perdu (expiré puis réclamé par un autre worker)
+        """
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET lease_expires = ?,
+                                          heartbeat_at  = ?
+                                      WHERE id = ?
+                                        AND lease_owner = ?
+                                        AND status = 'running'
+                                      ''', (now + (lease_seconds or self.lease_seconds), now, task_id, owner))
+                return cursor.rowcount == 1
+            finally:
+                conn.close()
+
+    def complete(self, task_id, owner, result=None):
+        """
+        Marque une tâche comme terminée et stocke son résultat
+
+        Args:
+            task_id (int): ID de la tâche durable
+            owner (str): Identifiant du worker détenteur du bail
+            result: Résultat sérialisable en JSON
+
+        Returns:
+            bool: True si la tâche a été mise à jour
+        """
+        return self._finish(task_id, owner, 'completed', result=result)
+
+    def fail(self, task_id, owner, error, retry=True):
+        """
+        Enregistre l'échec d'une tâche ; elle est remise en attente tant que
+        le nombre maximum de tentatives n'est pas atteint
+
+        Args:
+            task_id (int): ID de la tâche durable
+            owner (str): Identifiant du worker détenteur du bail
+            error (str): Message d'erreur
+            retry (bool): Autoriser une nouvelle tentative
+
+        Returns:
+            str: Nouveau statut de la tâche ('pending' ou 'failed')
+        """
+        task = self.get(task_id)
+        status = 'failed'
+        if retry and task and task['attempts'] < self.max_attempts:
+            status = 'pending'
+
+        self._finish(task_id, owner, status, error=error)
+        return status
+
+    def _finish(self, task_id, owner, status, result=None, error=None):
+        """Met à jour le statut final (ou la remise en attente) d'une tâche"""
+        now = time.time()
+        result_json = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET status        = ?,
+                                          result        = ?,
+                                          error         = ?,
+                                          lease_owner   = NULL,
+                                          lease_expires = NULL,
+                                          updated_at    = ?
+                                      WHERE id = ?
+                                        AND lease_owner = ?
+                                      ''', (status, result_json, error, now, task_id, owner))
+
+                if cursor.rowcount == 0:
+                    logger.warning(f"Bail perdu pour la tâche durable {task_id}, résultat ignoré")
+                    return False
+                return True
+            finally:
+                conn.close()
+
+    def cancel(self, task_id):
+        """
+        Annule une tâche en attente
+
+        Args:
+            task_id (int): ID de la tâche durable
+
+        Returns:
+            bool: True si la tâche a été annulée
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET status     = 'cancelled',
+                                          updated_at = ?
+                                      WHERE id = ?
+                                        AND status = 'pending'
+                                      ''', (time.time(), task_id))
+                return cursor.rowcount == 1
+            finally:
+                conn.close()
+
+    def requeue(self, task_id):
+        """
+        Remet en attente une tâche échouée ou annulée (nouvelle exécution d'un travail)
+
+        Args:
+            task_id (int): ID de la tâche durable
+
+        Returns:
+            bool: True si la tâche a été remise en attente
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET status     = 'pending',
+                                          attempts   = 0,
+                                          error      = NULL,
+                                          updated_at = ?
+                                      WHERE id = ?
+                                        AND status IN ('failed', 'cancelled')
+                                      ''', (time.time(), task_id))
+                return cursor.rowcount == 1
+            finally:
+                conn.close()
+
+    def recover_expired(self):
+        """
+        Remet en attente les tâches dont le bail a expiré (processus disparu)
+
+        Returns:
+            int: Nombre de tâches remises en attente
+        """
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                cursor = conn.execute('''
+                                      UPDATE durable_tasks
+                                      SET status        = 'pending',
+                                          lease_owner   = NULL,
+                                          lease_expires = NULL,
+                                          updated_at    = ?
+                                      WHERE status = 'running'
+                                        AND lease_expires < ?
+                                      ''', (now, now))
+                count = cursor.rowcount
+            finally:
+                conn.close()
+
+        if count:
+            logger.info(f"{count} tâche(s) durable(s) remise(s) en attente après expiration du bail")
+        return count
+
+    def get(self, task_id):
+        """
+        Récupère une tâche durable
+
+        Args:
+            task_id (int): ID de la tâche durable
+
+        Returns:
+            dict: Tâche ou None si absente
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM durable_tasks WHERE id = ?', (task_id,)).fetchone()
+            return self._row_to_dict(row) if row else None
+        finally:
+            conn.close()
+
+    def get_by_key(self, idempotency_key):
+        """
+        Récupère une tâche durable par sa clé d'idempotence
+
+        Args:
+            idempotency_key (str): Clé d'idempotence
+
+        Returns:
+            dict: Tâche ou None si absente
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM durable_tasks WHERE idempotency_key = ?',
+                               (idempotency_key,)).fetchone()
+            return self._row_to_dict(row) if row else None
+        finally:
+            conn.close()
+
+    def list_unfinished(self, job_id=None):
+        """
+        Liste les tâches non terminées (à reprendre au démarrage)
+
+        Args:
+            job_id (str, optional): Filtrer par travail
+
+        Returns:
+            list: Tâches en attente ou en cours
+        """
+        query = "SELECT * FROM durable_tasks WHERE status IN ('pending', 'running')"
+        params = []
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        query += " ORDER BY priority, id"
+
+        conn = self._connect()
+        try:
+            return [self._row_to_dict(row) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def get_job_progress(self, job_id):
+        """
+        Récupère l'avancement d'un travail
+
+        Args:
+            job_id (str): ID du travail
+
+        Returns:
+            dict: Nombre de tâches par statut et total
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                                SELECT status, COUNT(*) AS count
+                                FROM durable_tasks
+                                WHERE job_id = ?
+                                GROUP BY status
+                                ''', (job_id,)).fetchall()
+        finally:
+            conn.close()
+
+        counts = {row['status']: row['count'] for row in rows}
+        counts['total'] = sum(counts.values())
+        return counts
+
+    def _row_to_dict(self, row):
+        """Convertit une ligne SQLite en dictionnaire de tâche"""
+        task = dict(row)
+        payload = json.loads(task.pop('payload') or '{}')
+        task['args'] = tuple(payload.get('args', ()))
+        task['kwargs'] = payload.get('kwargs', {})
+        task['result'] = json.loads(task['result']) if task['result'] is not None else None
+        return task
+
+
+class LeaseKeeper:
+    """
+    Renouvelle périodiquement le bail d'une tâche durable pendant son exécution
+    """
+
+    def __init__(self, store, task_id, owner, lease_seconds=None):
+        """
+        Initialise le gardien de bail
+
+        Args:
+            store (DurableTaskStore): Stockage durable
+            task_id (int): ID de la tâche durable
+            owner (str): Identifiant du worker
+            lease_seconds (float, optional): Durée du bail
+        """
+        self.store = store
+        self.task_id = task_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds or store.lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        return False
+
+    def _run(self):
+        """Envoie un heartbeat toutes les lease_seconds / 3"""
+        interval = max(0.5, self.lease_seconds / 3)
+
+        while not self._stop.wait(interval):
+            try:
+                if not self.store.heartbeat(self.task_id, self.owner, self.lease_seconds):
+                    self.lost = True
+                    logger.warning(f"Bail perdu pour la tâche durable {self.task_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Erreur de heartbeat pour la tâche durable {self.task_id}: {str(e)}")
+
+
+def run_checkpointed(store, idempotency_key, func, *args, job_id=None, platform=None, **kwargs):
+    """
+    Exécute une fonction une seule fois par clé d'idempotence
+
+    Si la clé est déjà terminée dans le stockage, le résultat persistant est renvoyé
+    sans réexécution ; sinon la fonction est exécutée sous bail et son résultat persisté.
+
+    Args:
+        store (DurableTaskStore): Stockage durable
+        idempotency_key (str): Clé d'idempotence de l'étape
+        func (callable): Fonction à exécuter
+        job_id (str, optional): Travail auquel appartient l'étape
+        platform (str, optional): Plateforme d'IA
+
+    Returns:
+        tuple: (résultat, True si le résultat provient du stockage)
+    """
+    task_id = store.enqueue(func.__name__, platform=platform, job_id=job_id,
+                            idempotency_key=idempotency_key)
+    task = store.get(task_id)
+
+    if task and task['status'] == 'completed':
+        return task['result'], True
+    if task and task['status'] in ('failed', 'cancelled'):
+        store.requeue(task_id)
+
+    owner = store.owner_id(threading.get_ident())
+
+    # Un bail encore valide peut appartenir à un processus interrompu : attendre son expiration
+    deadline = time.time() + store.lease_seconds + 1
+    while not store.claim(task_id, owner):
+        task = store.get(task_id)
+        if task and task['status'] == 'completed':
+            return task['result'], True
+        if time.time() > deadline:
+            raise SchedulingError(f"Étape {idempotency_key} déjà en cours sur un autre worker")
+        time.sleep(1)
+
+    try:
+        with LeaseKeeper(store, task_id, owner) as keeper:
+            result = func(*args, **kwargs)
+    except Exception as e:
+        store.fail(task_id, owner, str(e))
+        raise
+
+    if keeper.lost or not store.complete(task_id, owner, result):
+        # Bail perdu : si un autre worker a terminé l'étape, son résultat persistant fait foi
+        task = store.get(task_id)
+        if task and task['status'] == 'completed':
+            return task['result'], True
+        logger.warning(f"Étape {idempotency_key}: bail perdu, résultat non persisté")
+
+    return result, False
@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+from utils.logger import logger
+from utils.exceptions import SchedulingError
+
+
+# Travaux créés par défaut
+DEFAULT_JOB = 'default'
+INTERACTIVE_JOB = 'interactive'
+
+
+class Job:
+    """
+    Travail regroupant des tâches et partageant équitablement les workers avec les autres travaux
+    """
+
+    __slots__ = ('id', 'name', 'weight', 'tag', 'heap', 'seq', 'submitted', 'dispatched', 'transient')
+
+    def __init__(self, job_id, weight, name, seq, transient=False):
+        self.id = job_id
+        self.name = name or job_id
+        self.weight = weight
+        self.tag = 0.0
+        self.heap = []
+        self.seq = seq
+        self.submitted = 0
+        self.dispatched = 0
+        # Créé implicitement par put() : supprimé dès qu'il n'a plus d'élément en attente
+        self.transient = transient
+
+
+class JobScheduler:
+    """
+    File multi-travaux à partage équitable pondéré
+
+    - Entre travaux : Start-time Fair Queuing. Chaque travail a une étiquette virtuelle qui
+      avance de coût / poids à chaque tâche servie ; le travail d'étiquette minimale est servi.
+      Un travail qui redevient actif reprend à l'horloge virtuelle courante, si bien qu'une
+      requête interactive attend au plus la tâche en cours, même derrière un gros lot.
+    - Dans un travail : Earliest Deadline First. Sans échéance explicite, la priorité est
+      convertie en échéance virtuelle (ajout + priorité * aging_seconds), ce qui fait vieillir
+      les priorités : une tâche ancienne finit par passer devant une tâche plus prioritaire récente.
+    - Égalités départagées par ordre d'arrivée (compteur monotone), jamais par les éléments.
+
+    L'interface reprend celle de queue.PriorityQueue (put/get/qsize/empty/task_done).
+    """
+
+    def __init__(self, aging_seconds=60.0, interactive_weight=4.0):
+        """
+        Initialise le planificateur de travaux
+
+        Args:
+            aging_seconds (float): Durée pendant laquelle un niveau de priorité est rattrapé
+            interactive_weight (float): Poids du travail interactif prédéfini
+        """
+        self.aging_seconds = aging_seconds
+        self.jobs = {}
+        self.virtual_time = 0.0
+
+        self._counter = itertools.count()
+        self._job_counter = itertools.count()
+        self._size = 0
+        self._unfinished = 0
+        self._cond = threading.Condition(threading.Lock())
+
+        self.create_job(DEFAULT_JOB, weight=1.0)
+        self.create_job(INTERACTIVE_JOB, weight=interactive_weight)
+
+    def create_job(self, job_id=None, weight=1.0, name=None):
+        """
+        Déclare un travail (ou met à jour son poids s'il existe)
+
+        Args:
+            job_id (str, optional): Identifiant du travail (généré si absent)
+            weight (float): Part relative des workers attribuée au travail
+            name (str, optional): Nom lisible
+
+        Returns:
+            str: Identifiant du travail
+        """
+        if weight <= 0:
+            raise SchedulingError(f"Poids de travail invalide: {weight}")
+
+        with self._cond:
+            if job_id is None:
+                job_id = f"job_{next(self._job_counter)}"
+
+            job = self.jobs.get(job_id)
+            if job is None:
+                self._add_job(job_id, weight, name)
+            else:
+                job.weight = weight
+                job.transient = False
+
+            return job_id
+
+    def _add_job(self, job_id, weight, name=None, transient=False):
+        """Crée un travail (verrou détenu)"""
+        job = Job(job_id, weight, name, next(self._job_counter), transient)
+        job.tag = self.virtual_time
+        self.jobs[job_id] = job
+        logger.debug(f"Travail {job_id} créé (poids {weight})")
+        return job
+
+    def close_job(self, job_id):
+        """
+        Supprime un travail vide
+
+        Args:
+            job_id (str): Identifiant du travail
+
+        Returns:
+            bool: True si le travail a été supprimé
+        """
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.heap or job_id in (DEFAULT_JOB, INTERACTIVE_JOB):
+                return False
+            del self.jobs[job_id]
+            return True
+
+    def put(self, item, job_id=None, priority=0, deadline=None, enqueued_at=None, cost=1.0):
+        """
+        Ajoute un élément à un travail
+
+        Args:
+            item: Élément à planifier
+            job_id (str, optional): Travail cible (travail par défaut si absent ; créé si inconnu,
+                puis supprimé quand il ne reste plus d'élément en attente)
+            priority (int): Priorité (valeurs négatives = plus haute priorité)
+            deadline (float, optional): Échéance absolue (time.time())
+            enqueued_at (float, optional): Date d'ajout d'origine (conservée lors d'une remise en file)
+            cost (float): Coût estimé de l'élément dans le partage équitable
+        """
+        job_id = job_id or DEFAULT_JOB
+
+        enqueued_at = enqueued_at if enqueued_at is not None else time.time()
+        if deadline is None:
+            deadline = enqueued_at + priority * self.aging_seconds
+
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                job = self._add_job(job_id, 1.0, transient=True)
+
+            # Un travail inactif reprend à l'horloge virtuelle courante (pas de crédit accumulé)
+            if not job.heap:
+                job.tag = max(job.tag, self.virtual_time)
+
+            heapq.heappush(job.heap, (deadline, priority, next(self._counter), cost, item))
+            job.submitted += 1
+            self._size += 1
+            self._unfinished += 1
+            self._cond.notify()
+
+    def _pop(self):
+        """Retire le prochain élément (verrou détenu, file non vide)"""
+        job = min((j for j in self.jobs.values() if j.heap), key=lambda j: (j.tag, j.seq))
+        _, _, _, cost, item = heapq.heappop(job.heap)
+
+        self.virtual_time = job.tag
+        job.tag += cost / job.weight
+        job.dispatched += 1
+        self._size -= 1
+
+        # Travail implicite vidé : un nouvel élément le recréera à l'horloge virtuelle courante
+        if job.transient and not job.heap:
+            del self.jobs[job.id]
+        return item
+
+    def get(self, block=True, timeout=None):
+        """
+        Retire le prochain élément selon le partage équitable
+
+        Args:
+            block (bool): Attendre qu'un élément soit disponible
+            timeout (float, optional): Délai d'attente maximum
+
+        Returns:
+            Élément planifié
+
+        Raises:
+            queue.Empty: Aucun élément disponible
+        """
+        with self._cond:
+            if not block:
+                if self._size == 0:
+                    raise queue.Empty
+            elif not self._cond.wait_for(lambda: self._size > 0, timeout):
+                raise queue.Empty
+
+            return self._pop()
+
+    def get_nowait(self):
+        """Retire le prochain élément sans attendre"""
+        return self.get(block=False)
+
+    def task_done(self):
+        """Signale la fin du traitement d'un élément retiré"""
+        with self._cond:
+            if self._unfinished <= 0:
+                raise ValueError("task_done() appelé trop de fois")
+            self._unfinished -= 1
+
+    def qsize(self):
+        """Nombre d'éléments en attente"""
+        with self._cond:
+            return self._size
+
+    def empty(self):
+        """True si aucun élément n'est en attente"""
+        return self.qsize() == 0
+
+    def get_jobs_status(self):
+        """
+        Récupère l'état des travaux
+
+        Returns:
+            dict: Par travail, poids, éléments en attente, soumis et servis
+        """
+        with self._cond:
+            return {
+                job.id: {
+                    'name': job.name,
+                    'weight': job.weight,
+                    'pending': len(job.heap),
+                    'submitted': job.submitted,
+                    'dispatched': job.dispatched
+                }
+                for job in self.jobs.values()
+            }
@@ -1,9 +1,202 @@
+import os
 import queue
+import json
+import sqlite3
 import threading
 import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 from utils.logger import logger
-from utils.exceptions import SchedulingError
+from utils.exceptions import SchedulingError, DatabaseError
+from .durable_queue import LeaseKeeper
+from .jobs import JobScheduler, INTERACTIVE_JOB
+
+
+# Statuts suivis par les compteurs de la file
+TASK_STATUSES = ('pending', 'running', 'completed', 'failed', 'cancelled')
+
+# Statuts terminaux (la tâche ne changera plus d'état)
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class TaskRecord:
+    """
+    Enregistrement compact d'une tâche de la file d'attente
+
+    Les horodatages sont stockés en secondes (float) et la fonction ainsi que
+    ses arguments sont libérés dès que la tâche est terminée.
+    """
+
+    __slots__ = ('id', 'platform', 'status', 'added_time', 'start_time', 'end_time',
+                 'result', 'error', 'func', 'args', 'kwargs', 'durable_id',
+                 'job_id', 'priority', 'deadline')
+
+    def __init__(self, task_id, platform, func, args, kwargs, durable_id=None,
+                 job_id=None, priority=0, deadline=None):
+        self.id = task_id
+        self.platform = platform
+        self.job_id = job_id
+        self.priority = priority
+        self.deadline = deadline
+        self.status = 'pending'
+        self.added_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self.result = None
+        self.error = None
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.durable_id = durable_id
+
+    def release_callable(self):
+        """Libère la fonction et ses arguments (fermetures, gros objets)"""
+        self.func = None
+        self.args = None
+        self.kwargs = None
+
+    def to_dict(self):
+        """
+        Convertit l'enregistrement au format historique de get_task_result
+
+        Returns:
+            dict: Informations sur la tâche et son résultat
+        """
+        return {
+            'status': self.status,
+            'platform': self.platform,
+            'start_time': _to_datetime(self.start_time),
+            'end_time': _to_datetime(self.end_time),
+            'result': self.result,
+            'error': self.error,
+            'durable_id': self.durable_id,
+            'job_id': self.job_id
+        }
+
+
+def _to_datetime(timestamp):
+    """Convertit un horodatage en datetime (None conservé)"""
+    return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+
+class TaskResultArchive:
+    """
+    Archive SQLite des résultats de tâches évincés de la mémoire
+    """
+
+    def __init__(self, db_path, queue_id):
+        """
+        Initialise l'archive
+
+        Args:
+            db_path (str): Chemin vers le fichier de base de données
+            queue_id (str): Identifiant de la file (les IDs de tâche sont propres à chaque file)
+        """
+        self.db_path = db_path
+        self.queue_id = queue_id
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """
+        Établit une connexion à la base de données
+
+        Returns:
+            sqlite3.Connection: Objet de connexion
+        """
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            logger.error(f"Erreur de connexion pour l'archive des tâches: {str(e)}")
+            raise DatabaseError(f"Échec de connexion pour l'archive des tâches: {str(e)}")
+
+    def _ensure_table(self, conn):
+        """Vérifie la présence de la table d'archive (créée par les migrations du schéma)"""
+        if self._table_ready:
+            return
+
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_results'").fetchone()
+        if exists is None:
+            # File créée avant Database sur une base pas encore migrée
+            from core.data.database import ensure_schema
+            ensure_schema(self.db_path)
+        self._table_ready = True
+
+    def store(self, records):
+        """
+        Archive un lot d'enregistrements terminés
+
+        Args:
+            records (list): Liste de TaskRecord
+
+        Returns:
+            int: Nombre d'enregistrements archivés
+        """
+        if not records:
+            return 0
+
+        rows = [
+            (self.queue_id, record.id, record.platform, record.status, record.added_time,
+             record.start_time, record.end_time,
+             json.dumps(record.result, ensure_ascii=False, default=str), record.error)
+            for record in records
+        ]
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                self._ensure_table(conn)
+                conn.executemany('''
+                                 INSERT OR REPLACE INTO task_results
+                                 (queue_id, task_id, platform, status, added_time, start_time,
+                                  end_time, result, error)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                 ''', rows)
+                conn.commit()
+            finally:
+                conn.close()
+
+        logger.debug(f"{len(rows)} résultat(s) de tâche archivé(s)")
+        return len(rows)
+
+    def load(self, task_id):
+        """
+        Récupère un résultat archivé
+
+        Args:
+            task_id (int): ID de la tâche
+
+        Returns:
+            dict: Résultat au format de get_task_result ou None si absent
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                self._ensure_table(conn)
+                row = conn.execute('''
+                                   SELECT *
+                                   FROM task_results
+                                   WHERE queue_id = ? AND task_id = ?
+                                   ''', (self.queue_id, task_id)).fetchone()
+            finally:
+                conn.close()
+
+        if row is None:
+            return None
+
+        return {
+            'status': row['status'],
+            'platform': row['platform'],
+            'start_time': _to_datetime(row['start_time']),
+            'end_time': _to_datetime(row['end_time']),
+            'result': json.loads(row['result']) if row['result'] is not None else None,
+            'error': row['error'],
+            'archived': True
+        }
 
 
 class TaskQueue:
@@ -11,17 +204,24 @@ class TaskQueue:
     Classe pour gérer une file d'attente des tâches d'automatisation
     """
 
-    def __init__(self, scheduler=None):
+    def __init__(self, scheduler=None, max_results=1000, retention_minutes=None, archive_path=None,
+                 durable_store=None):
         """
         Initialise la file d'attente des tâches
 
         Args:
             scheduler (AIScheduler, optional): Planificateur pour vérifier les disponibilités
+            max_results (int, optional): Nombre maximum de résultats terminés gardés en mémoire
+            retention_minutes (float, optional): Durée maximale de rétention en mémoire d'un résultat terminé
+            archive_path (str, optional): Base SQLite recevant les résultats évincés
+                (par défaut data/liris.db)
+            durable_store (DurableTaskStore, optional): Stockage persistant des tâches nommées,
+                repris au redémarrage
         """
         logger.info("Initialisation de la file d'attente des tâches")
 
-        # File d'attente des tâches
-        self.task_queue = queue.PriorityQueue()
+        # File d'attente des tâches (partage équitable entre travaux)
+        self.task_queue = JobScheduler()
 
         # Planificateur
         self.scheduler = scheduler
@@ -32,55 +232,186 @@ class TaskQueue:
         # Événement pour signaler l'arrêt
         self.stop_event = threading.Event()
 
-        # File d'attente des résultats
+        # Enregistrements des tâches présentes en mémoire {task_id: TaskRecord}
         self.results = {}
 
+        # Tâches terminées, dans l'ordre de fin, candidates à l'éviction
+        self._finished = OrderedDict()
+
+        # Compteurs par statut, mis à jour à chaque transition
+        self.status_counts = dict.fromkeys(TASK_STATUSES, 0)
+
         # Compteur pour les IDs de tâche
         self.task_counter = 0
 
-    def add_task(self, task_func, platform_name, priority=0, task_args=None, task_kwargs=None):
+        # Politique de rétention
+        self.max_results = max_results
+        self.retention_seconds = retention_minutes * 60 if retention_minutes else None
+
+        # Archive des résultats évincés
+        if archive_path is None:
+            archive_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                                        "data", "liris.db")
+        self.queue_id = uuid.uuid4().hex
+        self.archive = TaskResultArchive(archive_path, self.queue_id)
+
+        # File durable et gestionnaires nommés (les fonctions ne sont pas sérialisables)
+        self.durable_store = durable_store
+        self.handlers = {}
+        self._durable_index = {}
+
+    def register_handler(self, name, func):
+        """
+        Enregistre un gestionnaire nommé utilisable par les tâches durables
+
+        Args:
+            name (str): Nom du gestionnaire
+            func (callable): Fonction exécutée pour les tâches portant ce nom
+        """
+        with self.lock:
+            self.handlers[name] = func
+
+    def _set_status(self, record, status):
+        """
+        Change le statut d'une tâche en maintenant les compteurs
+
+        Args:
+            record (TaskRecord): Tâche concernée
+            status (str): Nouveau statut
+        """
+        self.status_counts[record.status] -= 1
+        self.status_counts[status] += 1
+        record.status = status
+
+        if status in FINISHED_STATUSES:
+            record.end_time = record.end_time or time.time()
+            record.release_callable()
+            self._finished[record.id] = record
+
+    def create_job(self, weight=1.0, name=None, job_id=None):
+        """
+        Crée un travail partageant équitablement les workers avec les autres
+
+        Args:
+            weight (float): Part relative des workers attribuée au travail
+            name (str, optional): Nom lisible du travail
+            job_id (str, optional): Identifiant imposé
+
+        Returns:
+            str: Identifiant du travail
+        """
+        return self.task_queue.create_job(job_id, weight=weight, name=name)
+
+    def add_task(self, task_func, platform_name, priority=0, task_args=None, task_kwargs=None,
+                 idempotency_key=None, job_id=None, deadline=None, interactive=False):
         """
         Ajoute une tâche à la file d'attente
 
         Args:
-            task_func (callable): Fonction de la tâche
+            task_func (callable/str): Fonction de la tâche, ou nom d'un gestionnaire enregistré
+                pour une tâche durable
             platform_name (str): Nom de la plateforme d'IA
             priority (int): Priorité (0 = normale, valeurs négatives = plus haute priorité)
             task_args (tuple, optional): Arguments positionnels
             task_kwargs (dict, optional): Arguments nommés
+            idempotency_key (str, optional): Clé d'idempotence (tâches durables uniquement)
+            job_id (str, optional): Travail auquel appartient la tâche (travail par défaut si absent)
+            deadline (float, optional): Échéance absolue (time.time()) pour l'ordonnancement EDF
+            interactive (bool): Placer la tâche dans le travail interactif (latence minimale)
 
         Returns:
             int: ID de la tâche
         """
+        durable_id = None
+
+        if interactive and job_id is None:
+            job_id = INTERACTIVE_JOB
+
+        if isinstance(task_func, str):
+            if self.durable_store is None:
+                raise SchedulingError(f"Tâche nommée '{task_func}' sans file durable configurée")
+
+            durable_id = self.durable_store.enqueue(
+                task_func, platform=platform_name, args=task_args, kwargs=task_kwargs,
+                priority=priority, job_id=job_id, idempotency_key=idempotency_key
+            )
+
+            with self.lock:
+                # Tâche déjà connue (clé d'idempotence rejouée)
+                if durable_id in self._durable_index:
+                    return self._durable_index[durable_id]
+
+            stored = self.durable_store.get(durable_id)
+            if stored['status'] in FINISHED_STATUSES:
+                return self._add_finished_durable(stored)
+
+        return self._enqueue_record(task_func, platform_name, priority, task_args, task_kwargs, durable_id,
+                                    job_id, deadline)
+
+    def _enqueue_record(self, task_func, platform_name, priority, task_args, task_kwargs, durable_id=None,
+                        job_id=None, deadline=None):
+        """Crée l'enregistrement en mémoire et le place dans la file"""
         with self.lock:
             self.task_counter += 1
             task_id = self.task_counter
 
-            # Initialiser le résultat
-            self.results[task_id] = {
-                'status': 'pending',
-                'start_time': None,
-                'end_time': None,
-                'result': None,
-                'error': None
-            }
-
             # Créer la tâche
-            task = {
-                'id': task_id,
-                'func': task_func,
-                'platform': platform_name,
-                'args': task_args or (),
-                'kwargs': task_kwargs or {},
-                'added_time': datetime.now()
-            }
+            record = TaskRecord(task_id, platform_name, task_func, task_args or (), task_kwargs or {},
+                                durable_id, job_id, priority, deadline)
+            self.results[task_id] = record
+            self.status_counts['pending'] += 1
+
+            if durable_id is not None:
+                self._durable_index[durable_id] = task_id
 
             # Ajouter à la file d'attente
-            self.task_queue.put((priority, task))
+            self._schedule(record)
 
             logger.debug(f"Tâche {task_id} ajoutée à la file d'attente pour {platform_name}")
             return task_id
 
+    def _add_finished_durable(self, stored):
+        """Expose en mémoire une tâche durable déjà terminée lors d'une session précédente"""
+        with self.lock:
+            self.task_counter += 1
+            task_id = self.task_counter
+
+            record = TaskRecord(task_id, stored['platform'], None, (), {}, stored['id'])
+            record.result = stored['result']
+            record.error = stored['error']
+            record.end_time = stored['updated_at']
+            self.results[task_id] = record
+            self.status_counts['pending'] += 1
+            self._set_status(record, stored['status'])
+            self._durable_index[stored['id']] = task_id
+            return task_id
+
+    def resume_durable_tasks(self):
+        """
+        Recharge dans la file les tâches durables non terminées (reprise après arrêt ou crash)
+
+        Returns:
+            int: Nombre de tâches reprises
+        """
+        if self.durable_store is None:
+            return 0
+
+        self.durable_store.recover_expired()
+
+        resumed = 0
+        for stored in self.durable_store.list_unfinished():
+            with self.lock:
+                if stored['id'] in self._durable_index:
+                    continue
+
+            self._enqueue_record(stored['handler'], stored['platform'], stored['priority'],
+                                 stored['args'], stored['kwargs'], stored['id'], stored['job_id'])
+            resumed += 1
+
+        if resumed:
+            logger.info(f"{resumed} tâche(s) durable(s) reprise(s)")
+        return resumed
+
     def get_task_result(self, task_id):
         """
         Récupère le résultat d'une tâche
@@ -92,7 +423,21 @@ class TaskQueue:
             dict: Informations sur la tâche et son résultat
         """
         with self.lock:
-            return self.results.get(task_id, {'status': 'unknown'})
+            record = self.results.get(task_id)
+            if record is not None:
+                return record.to_dict()
+
+            if task_id > self.task_counter or task_id <= 0:
+                return {'status': 'unknown'}
+
+        # Résultat évincé de la mémoire : le chercher dans l'archive
+        try:
+            archived = self.archive.load(task_id)
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture de l'archive pour la tâche {task_id}: {str(e)}")
+            archived = None
+
+        return archived or {'status': 'unknown'}
 
     def wait_for_task(self, task_id, timeout=None):
         """
@@ -134,6 +479,9 @@ class TaskQueue:
         self.stop_event.clear()
         workers = []
 
+        # Reprendre les tâches persistées d'une session précédente
+        self.resume_durable_tasks()
+
         for i in range(num_workers):
             worker = threading.Thread(target=self._worker_thread, args=(i,))
             worker.daemon = True
@@ -171,16 +519,23 @@ class TaskQueue:
             int: Nombre de tâches supprimées
         """
         with self.lock:
-            # Compter les tâches
-            count = self.task_queue.qsize()
+            count = 0
 
-            # Créer une nouvelle file d'attente
-            self.task_queue = queue.PriorityQueue()
+            # Vider la file et marquer les tâches comme annulées
+            while True:
+                try:
+                    record = self.task_queue.get_nowait()
+                except queue.Empty:
+                    break
 
-            # Marquer les tâches comme annulées
-            for task_id, result in self.results.items():
-                if result['status'] == 'pending':
-                    self.results[task_id]['status'] = 'cancelled'
+                self.task_queue.task_done()
+                if record.status == 'pending':
+                    self._set_status(record, 'cancelled')
+                    if record.durable_id is not None:
+                        self.durable_store.cancel(record.durable_id)
+                count += 1
+
+            self._apply_retention()
 
             logger.info(f"{count} tâche(s) supprimée(s) de la file d'attente")
             return count
@@ -193,24 +548,61 @@ class TaskQueue:
             dict: Informations sur la file d'attente
         """
         with self.lock:
-            pending_count = self.task_queue.qsize()
+            return {
+                'queue_size': self.task_queue.qsize(),
+                'status_counts': dict(self.status_counts),
+                'jobs': self.task_queue.get_jobs_status(),
+                'in_memory_results': len(self.results),
+                'processing_active': not self.stop_event.is_set()
+            }
 
-            # Compter les tâches par statut
-            status_counts = {'pending': 0, 'running': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+    def _apply_retention(self):
+        """
+        Évince les résultats terminés les plus anciens selon la politique de rétention
+        et les transfère dans l'archive SQLite
 
-            for result in self.results.values():
-                status = result.get('status', 'unknown')
-                if status in status_counts:
-                    status_counts[status] += 1
+        Returns:
+            int: Nombre de résultats évincés
+        """
+        evicted = []
 
-            # Ajouter le nombre en attente
-            status_counts['pending'] = pending_count
+        with self.lock:
+            limit = self.max_results if self.max_results is not None else float('inf')
+            cutoff = time.time() - self.retention_seconds if self.retention_seconds else None
 
-            return {
-                'queue_size': pending_count,
-                'status_counts': status_counts,
-                'processing_active': not self.stop_event.is_set()
-            }
+            while self._finished:
+                record = next(iter(self._finished.values()))
+                too_many = len(self._finished) > limit
+                too_old = cutoff is not None and record.end_time < cutoff
+
+                if not (too_many or too_old):
+                    break
+
+                self._finished.popitem(last=False)
+                evicted.append(record)
+
+        if evicted:
+            # Les enregistrements restent lisibles en mémoire jusqu'à la fin de l'archivage
+            try:
+                self.archive.store(evicted)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'archivage de {len(evicted)} résultat(s): {str(e)}")
+
+                # Archivage échoué : les résultats restent en mémoire, en tête de file,
+                # et seront de nouveau évincés (et archivés) à la prochaine rétention
+                with self.lock:
+                    for record in reversed(evicted):
+                        if self.results.get(record.id) is record and record.id not in self._finished:
+                            self._finished[record.id] = record
+                            self._finished.move_to_end(record.id, last=False)
+                return 0
+
+            with self.lock:
+                for record in evicted:
+                    if self.results.get(record.id) is record:
+                        del self.results[record.id]
+
+        return len(evicted)
 
     def _worker_thread(self, worker_id):
         """
@@ -225,12 +617,17 @@ class TaskQueue:
             try:
                 # Récupérer une tâche avec un timeout
                 try:
-                    priority, task = self.task_queue.get(timeout=1.0)
+                    record = self.task_queue.get(timeout=1.0)
                 except queue.Empty:
                     continue
 
-                task_id = task['id']
-                platform = task['platform']
+                task_id = record.id
+                platform = record.platform
+
+                # Tâche annulée entre-temps
+                if record.status != 'pending':
+                    self.task_queue.task_done()
+                    continue
 
                 logger.debug(f"Worker {worker_id} traite la tâche {task_id} pour {platform}")
 
@@ -243,24 +640,29 @@ class TaskQueue:
 
                         # Remettre la tâche dans la file d'attente avec un délai
                         time.sleep(5)  # Attendre un peu avant de réessayer
-                        self.task_queue.put((priority, task))
+                        self._schedule(record)
                         self.task_queue.task_done()
                         continue
 
+                if record.durable_id is not None:
+                    self._run_durable(worker_id, record)
+                    continue
+
                 # Marquer comme en cours d'exécution
                 with self.lock:
-                    self.results[task_id]['status'] = 'running'
-                    self.results[task_id]['start_time'] = datetime.now()
+                    func, args, kwargs = record.func, record.args, record.kwargs
+                    self._set_status(record, 'running')
+                    record.start_time = time.time()
 
                 # Exécuter la tâche
                 try:
-                    result = task['func'](*task['args'], **task['kwargs'])
+                    result = func(*args, **kwargs)
 
                     # Marquer comme terminée
                     with self.lock:
-                        self.results[task_id]['status'] = 'completed'
-                        self.results[task_id]['end_time'] = datetime.now()
-                        self.results[task_id]['result'] = result
+                        record.end_time = time.time()
+                        record.result = result
+                        self._set_status(record, 'completed')
 
                     # Enregistrer l'utilisation si disponible
                     if self.scheduler:
@@ -271,15 +673,18 @@ class TaskQueue:
                 except Exception as e:
                     # Marquer comme échouée
                     with self.lock:
-                        self.results[task_id]['status'] = 'failed'
-                        self.results[task_id]['end_time'] = datetime.now()
-                        self.results[task_id]['error'] = str(e)
+                        record.end_time = time.time()
+                        record.error = str(e)
+                        self._set_status(record, 'failed')
 
                     logger.error(f"Échec de la tâche {task_id}: {str(e)}")
 
                 # Marquer la tâche comme terminée dans la file d'attente
                 self.task_queue.task_done()
 
+                # Appliquer la politique de rétention
+                self._apply_retention()
+
                 # Appliquer le cooldown si nécessaire
                 if self.scheduler:
                     cooldown = self.scheduler.get_cooldown_time(platform)
@@ -291,4 +696,94 @@ class TaskQueue:
                 logger.error(f"Erreur dans le worker {worker_id}: {str(e)}")
                 time.sleep(1)  # Éviter une boucle d'erreurs trop rapide
 
-        logger.debug(f"Worker {worker_id} arrêté")
\ No newline at end of file
+        logger.debug(f"Worker {worker_id} arrêté")
+
+    def _schedule(self, record):
+        """Place (ou replace) une tâche dans son travail en conservant sa date d'ajout"""
+        self.task_queue.put(record, job_id=record.job_id, priority=record.priority,
+                            deadline=record.deadline, enqueued_at=record.added_time)
+
+    def _requeue(self, record):
+        """Remet une tâche en cours dans la file (à appeler sous self.lock)"""
+        self.status_counts[record.status] -= 1
+        self.status_counts['pending'] += 1
+        record.status = 'pending'
+        self._schedule(record)
+
+    def _run_durable(self, worker_id, record):
+        """
+        Exécute une tâche durable sous bail, avec heartbeat et persistance du résultat
+
+        Args:
+            worker_id (int): ID du worker
+            record (TaskRecord): Tâche à exécuter
+        """
+        store = self.durable_store
+        owner = store.owner_id(worker_id)
+        platform = record.platform
+
+        if not store.claim(record.durable_id, owner):
+            stored = store.get(record.durable_id)
+
+            # Terminée entre-temps par un autre processus
+            if stored and stored['status'] in FINISHED_STATUSES:
+                with self.lock:
+                    record.result = stored['result']
+                    record.error = stored['error']
+                    self._set_status(record, stored['status'])
+            else:
+                # Bail encore détenu ailleurs : réessayer plus tard
+                time.sleep(1)
+                self._schedule(record)
+
+            self.task_queue.task_done()
+            return
+
+        with self.lock:
+            handler = self.handlers.get(record.func)
+            args, kwargs = record.args, record.kwargs
+            self._set_status(record, 'running')
+            record.start_time = time.time()
+
+        try:
+            if handler is None:
+                raise SchedulingError(f"Gestionnaire '{record.func}' non enregistré")
+
+            with LeaseKeeper(store, record.durable_id, owner) as keeper:
+                result = handler(*args, **kwargs)
+
+            if keeper.lost or not store.complete(record.durable_id, owner, result):
+                # Bail perdu : la tâche a pu être reprise par un autre worker, dont le résultat fait foi.
+                # Elle est replanifiée et adoptera le résultat persistant une fois terminée ailleurs.
+                logger.warning(f"Tâche durable {record.id}: bail perdu, résultat local abandonné")
+                with self.lock:
+                    self._requeue(record)
+                self.task_queue.task_done()
+                return
+
+            with self.lock:
+                record.end_time = time.time()
+                record.result = result
+                self._set_status(record, 'completed')
+
+            if self.scheduler:
+                self.scheduler.register_usage(platform)
+
+            logger.debug(f"Tâche durable {record.id} terminée avec succès")
+
+        except Exception as e:
+            status = store.fail(record.durable_id, owner, str(e))
+
+            with self.lock:
+                if status == 'pending':
+                    # Nouvelle tentative : remettre la tâche en attente
+                    self._requeue(record)
+                else:
+                    record.end_time = time.time()
+                    record.error = str(e)
+                    self._set_status(record, 'failed')
+
+            logger.error(f"Échec de la tâche durable {record.id}: {str(e)}")
+
+        self.task_queue.task_done()
+        self._apply_retention()
@@ -1,13 +1,16 @@
-import cv2
-import numpy as np
-import pyautogui
-import pytesseract
-import pyperclip
 import time
 import os
 from difflib import SequenceMatcher
 from utils.logger import logger
 from utils.exceptions import InterfaceDetectionError
+from utils.lazy_import import lazy_import
+
+# Dépendances lourdes chargées au premier usage
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+pyautogui = lazy_import('pyautogui')
+pytesseract = lazy_import('pytesseract')
+pyperclip = lazy_import('pyperclip')
 
 try:
     import pygetwindow as gw
@@ -1,12 +1,15 @@
 # core/vision/recognizer.py
-import pytesseract
-import cv2
-import numpy as np
 import os
 import platform
 import subprocess
 from utils.logger import logger
 from utils.exceptions import OCRError
+from utils.lazy_import import lazy_import
+
+# Dépendances lourdes chargées au premier usage
+pytesseract = lazy_import('pytesseract')
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
 
 
 class TextRecognizer:
@@ -6,10 +6,15 @@ Liris/core/vision/utils.py
 Utilitaires pour le traitement d'images et la vision par ordinateur
 """
 
-import cv2
-import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
 import logging
+from utils.lazy_import import lazy_import
+
+# Dépendances lourdes chargées au premier usage
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+Image = lazy_import('PIL.Image')
+ImageEnhance = lazy_import('PIL.ImageEnhance')
+ImageFilter = lazy_import('PIL.ImageFilter')
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +81,7 @@ class ImageProcessingUtils:
             return image
 
     @staticmethod
-    def apply_threshold(image, threshold=127, max_value=255, threshold_type=cv2.THRESH_BINARY):
+    def apply_threshold(image, threshold=127, max_value=255, threshold_type=None):
         """
         Applique un seuillage à une image
 
@@ -84,11 +89,14 @@ class ImageProcessingUtils:
             image: Image à seuiller
             threshold (int): Valeur de seuil
             max_value (int): Valeur maximale
-            threshold_type: Type de seuillage OpenCV
+            threshold_type: Type de seuillage OpenCV (cv2.THRESH_BINARY par défaut)
 
         Returns:
             Image seuillée
         """
+        if threshold_type is None:
+            threshold_type = cv2.THRESH_BINARY
+
         try:
             if isinstance(image, np.ndarray):
                 gray = ImageProcessingUtils.convert_to_grayscale(image)
@@ -179,18 +187,23 @@ class ImageProcessingUtils:
             return image
 
     @staticmethod
-    def find_contours(image, mode=cv2.RETR_EXTERNAL, method=cv2.CHAIN_APPROX_SIMPLE):
+    def find_contours(image, mode=None, method=None):
         """
         Trouve les contours dans une image
 
         Args:
             image: Image binaire
-            mode: Mode de récupération des contours
-            method: Méthode d'approximation des contours
+            mode: Mode de récupération des contours (cv2.RETR_EXTERNAL par défaut)
+            method: Méthode d'approximation des contours (cv2.CHAIN_APPROX_SIMPLE par défaut)
 
         Returns:
             Liste des contours
         """
+        if mode is None:
+            mode = cv2.RETR_EXTERNAL
+        if method is None:
+            method = cv2.CHAIN_APPROX_SIMPLE
+
         try:
             if not isinstance(image, np.ndarray):
                 image = np.array(image)
@@ -355,18 +368,21 @@ class ImageProcessingUtils:
             return image
 
     @staticmethod
-    def template_match(image, template, method=cv2.TM_CCOEFF_NORMED):
+    def template_match(image, template, method=None):
         """
         Recherche de motif par template matching
 
         Args:
             image: Image source
             template: Template à rechercher
-            method: Méthode de matching
+            method: Méthode de matching (cv2.TM_CCOEFF_NORMED par défaut)
 
         Returns:
             Résultat du matching et coordonnées du meilleur match
         """
+        if method is None:
+            method = cv2.TM_CCOEFF_NORMED
+
         try:
             if not isinstance(image, np.ndarray):
                 image = np.array(image)
@@ -13,7 +13,6 @@ from datetime import datetime
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QSettings
 
-from ui.main_window import MainWindow
 from ui.localization.translator import translator, tr
 from ui.widgets.language_selector import LanguageSelector
 from utils.logger import logger
@@ -86,6 +85,9 @@ def main():
 
         # Créer la fenêtre principale
         print("3. Création de la fenêtre principale...")
+        # Import différé : la fenêtre principale charge l'ensemble des onglets et modules,
+        # inutile tant que QApplication et le sélecteur de langue ne sont pas affichés
+        from ui.main_window import MainWindow
         window = MainWindow()
         print("   ✓ Fenêtre principale créée")
 
@@ -7,6 +7,9 @@ from utils.exceptions import ContentAnalysisError
 from templates.content_analysis.structured_prompts import get_analysis_prompt
 from templates.content_analysis.text_prompts import get_summary_prompt
 
+# Taille maximale d'un prompt pour lequel la couverture (hedging) est autorisée
+HEDGE_MAX_PROMPT_CHARS = 4000
+
 
 class ContentAnalyzer:
     """
@@ -56,7 +59,7 @@ class ContentAnalyzer:
                 available = self.conductor.get_available_platforms()
                 if not available:
                     raise ContentAnalysisError("Aucune plateforme disponible")
-                platform = available[0]
+                platform = self.conductor.choose_platform(available)
 
             # Créer la session d'analyse
             analysis_id = f"analysis_{int(time.time())}"
@@ -139,7 +142,7 @@ class ContentAnalyzer:
                 available = self.conductor.get_available_platforms()
                 if not available:
                     raise ContentAnalysisError("Aucune plateforme disponible")
-                platform = available[0]
+                platform = self.conductor.choose_platform(available)
 
             # Créer la session d'analyse
             analysis_id = f"analysis_{int(time.time())}"
@@ -220,9 +223,10 @@ class ContentAnalyzer:
             # Mettre à jour le statut
             analysis['status'] = 'running'
 
-            # Envoyer le prompt
+            # Envoyer le prompt (seules les petites analyses suivent la politique de couverture)
+            hedge = None if len(prompt) <= HEDGE_MAX_PROMPT_CHARS else False
             response = self.conductor.send_prompt(
-                platform, prompt, mode=mode, sync=True, timeout=timeout
+                platform, prompt, mode=mode, sync=True, timeout=timeout, hedge=hedge
             )
 
             # Analyser la réponse
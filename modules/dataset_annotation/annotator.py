@@ -1,10 +1,12 @@
 import json
 import csv
+import hashlib
 import threading
 import time
 from datetime import datetime
 from utils.logger import logger
 from utils.exceptions import DatabaseError, AIAutomationError
+from core.scheduling.durable_queue import run_checkpointed
 from .templates import get_annotation_prompt
 
 
@@ -13,18 +15,24 @@ class DatasetAnnotator:
     Classe pour l'annotation de datasets avec l'aide de l'IA
     """
 
-    def __init__(self, conductor, database=None):
+    # Annotations écrites par transaction pour un dataset stocké en base
+    ANNOTATION_BATCH_SIZE = 50
+
+    def __init__(self, conductor, database=None, task_store=None):
         """
         Initialise l'annotateur de dataset
 
         Args:
             conductor: Chef d'orchestre pour exécuter les opérations
             database (Database, optional): Connexion à la base de données
+            task_store (DurableTaskStore, optional): Stockage durable permettant de reprendre
+                une annotation interrompue là où elle s'est arrêtée
         """
         logger.info("Initialisation de l'annotateur de dataset")
 
         self.conductor = conductor
         self.database = database
+        self.task_store = task_store
 
         # Registre des annotations en cours
         self.active_annotations = {}
@@ -37,7 +45,8 @@ class DatasetAnnotator:
         Annote un dataset complet
 
         Args:
-            dataset_path (str): Chemin vers le dataset
+            dataset_path (str|int): Chemin vers le dataset, ou ID d'un dataset stocké en base
+                (éléments lus et annotations écrites par lots dans dataset_items)
             annotation_config (dict): Configuration de l'annotation
             platform (str, optional): Plateforme IA à utiliser
             sync (bool): Mode synchrone
@@ -52,18 +61,26 @@ class DatasetAnnotator:
                 available = self.conductor.get_available_platforms()
                 if not available:
                     raise AIAutomationError("Aucune plateforme disponible")
-                platform = available[0]
+                platform = self.conductor.choose_platform(available)
 
             # Créer l'ID d'annotation
             annotation_id = f"annotation_{int(time.time())}"
 
-            # Charger le dataset
-            dataset = self._load_dataset(dataset_path)
+            # Charger le dataset (les datasets stockés en base sont lus au fil de l'annotation)
+            dataset_id = dataset_path if isinstance(dataset_path, int) else None
+            if dataset_id is not None:
+                if self.database is None:
+                    raise AIAutomationError("Base de données requise pour annoter un dataset stocké")
+                dataset = None
+            else:
+                dataset = self._load_dataset(dataset_path)
 
             # Initialiser l'annotation
             annotation = {
                 'id': annotation_id,
+                'job_id': self._make_job_id(dataset_path, annotation_config),
                 'dataset_path': dataset_path,
+                'dataset_id': dataset_id,
                 'platform': platform,
                 'config': annotation_config,
                 'start_time': datetime.now().isoformat(),
@@ -95,6 +112,40 @@ class DatasetAnnotator:
             logger.error(f"Erreur lors de l'annotation du dataset: {str(e)}")
             raise AIAutomationError(f"Échec de l'annotation: {str(e)}")
 
+    def _make_job_id(self, dataset_path, annotation_config):
+        """
+        Calcule un identifiant stable pour une annotation (même dataset, même configuration)
+
+        Args:
+            dataset_path (str): Chemin vers le dataset
+            annotation_config (dict): Configuration de l'annotation
+
+        Returns:
+            str: Identifiant du travail d'annotation
+        """
+        key = json.dumps([dataset_path, annotation_config], sort_keys=True, default=str)
+        return f"annotation:{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+
+    def _make_item_key(self, job_id, item_index, item, prompt):
+        """
+        Calcule la clé d'idempotence d'un élément
+
+        Le contenu de l'élément et le prompt rendu font partie de la clé : si le fichier
+        du dataset ou le modèle de prompt change, l'élément est annoté de nouveau au lieu
+        de reprendre l'annotation persistée de l'ancienne version.
+
+        Args:
+            job_id (str): Identifiant du travail d'annotation
+            item_index (int): Position de l'élément
+            item: Élément à annoter
+            prompt (str): Prompt rendu pour l'élément
+
+        Returns:
+            str: Clé d'idempotence de l'élément
+        """
+        content = json.dumps([item, prompt], sort_keys=True, default=str)
+        return f"{job_id}:{item_index}:{hashlib.sha1(content.encode('utf-8')).hexdigest()}"
+
     def _load_dataset(self, dataset_path):
         """
         Charge un dataset depuis un fichier
@@ -119,13 +170,35 @@ class DatasetAnnotator:
             logger.error(f"Erreur lors du chargement du dataset: {str(e)}")
             raise AIAutomationError(f"Échec du chargement: {str(e)}")
 
+    def _iter_items(self, annotation, dataset):
+        """
+        Parcourt les éléments à annoter
+
+        Args:
+            annotation (dict): Informations sur l'annotation
+            dataset (list): Dataset chargé depuis un fichier (None pour un dataset stocké)
+
+        Returns:
+            tuple: (nombre d'éléments, itérable de (position, élément))
+        """
+        dataset_id = annotation.get('dataset_id')
+        if dataset_id is None:
+            return len(dataset), enumerate(dataset)
+
+        items = self.database.iter_dataset_items(dataset_id)
+        return (self.database.count_dataset_items(dataset_id),
+                ((row['item_index'], row['data']) for row in items))
+
     def _execute_annotation(self, annotation, dataset, timeout=None):
         """
         Exécute l'annotation du dataset
 
+        Pour un dataset stocké en base, les résultats ne sont pas conservés en mémoire :
+        ils sont écrits par lots dans dataset_items et restent consultables pendant l'exécution.
+
         Args:
             annotation (dict): Informations sur l'annotation
-            dataset (list): Dataset à annoter
+            dataset (list): Dataset à annoter (None pour un dataset stocké)
             timeout (float, optional): Délai maximum d'attente
 
         Returns:
@@ -134,20 +207,24 @@ class DatasetAnnotator:
         annotation_id = annotation['id']
         platform = annotation['platform']
         config = annotation['config']
+        start_time = time.time()
 
         try:
             # Mettre à jour le statut
             annotation['status'] = 'running'
+            resumed_count = 0
+            pending = []
 
             # Préparer le prompt
             prompt_template = get_annotation_prompt(config.get('type', 'classification'))
 
             results = []
-            total_items = len(dataset)
+            dataset_id = annotation.get('dataset_id')
+            total_items, items = self._iter_items(annotation, dataset)
 
-            for i, item in enumerate(dataset):
+            for done, (i, item) in enumerate(items, 1):
                 # Vérifier l'interruption
-                if timeout is not None and time.time() - float(annotation['start_time']) > timeout:
+                if timeout is not None and time.time() - start_time > timeout:
                     raise AIAutomationError("Timeout atteint")
 
                 # Préparer le prompt pour cet élément
@@ -157,38 +234,51 @@ class DatasetAnnotator:
                     schema=config.get('schema', {})
                 )
 
-                # Envoyer le prompt
-                response = self.conductor.send_prompt(
-                    platform, prompt, mode="standard", sync=True, timeout=30
-                )
-
-                # Analyser la réponse
-                if response and 'result' in response:
-                    result = {
-                        'item_index': i,
-                        'original': item,
-                        'annotation': response['result'].get('response', ''),
-                        'status': 'completed'
-                    }
+                if self.task_store is not None:
+                    # Point de reprise : un élément déjà annoté n'est jamais renvoyé
+                    result, reused = run_checkpointed(
+                        self.task_store, self._make_item_key(annotation['job_id'], i, item, prompt),
+                        self._annotate_item,
+                        platform, prompt, i, item, job_id=annotation['job_id'], platform=platform
+                    )
+                    resumed_count += int(reused)
                 else:
-                    raise AIAutomationError("Pas de résultat valide reçu")
+                    result = self._annotate_item(platform, prompt, i, item)
 
-                results.append(result)
+                if dataset_id is None:
+                    results.append(result)
+                    annotation['results'] = results
+                else:
+                    pending.append((i, result['annotation'], result['status']))
+                    if len(pending) >= self.ANNOTATION_BATCH_SIZE:
+                        self.database.record_item_annotations(dataset_id, pending)
+                        pending = []
 
                 # Mettre à jour la progression
-                annotation['progress'] = int((i + 1) / total_items * 100)
-                annotation['results'] = results
+                annotation['progress'] = int(done / total_items * 100)
+
+                logger.debug(f"Annotation {annotation_id}: {done}/{total_items} complété")
 
-                logger.debug(f"Annotation {annotation_id}: {i+1}/{total_items} complété")
+            if pending:
+                self.database.record_item_annotations(dataset_id, pending)
 
             # Marquer comme terminée
             annotation['status'] = 'completed'
             annotation['end_time'] = datetime.now().isoformat()
 
+            if resumed_count:
+                logger.info(f"Annotation {annotation_id}: {resumed_count} élément(s) repris d'une exécution précédente")
             logger.info(f"Annotation {annotation_id} terminée avec succès")
             return annotation
 
         except Exception as e:
+            # Conserver les annotations déjà obtenues
+            if pending:
+                try:
+                    self.database.record_item_annotations(dataset_id, pending)
+                except DatabaseError as db_error:
+                    logger.error(f"Annotations non enregistrées: {str(db_error)}")
+
             # Marquer comme échouée
             annotation['status'] = 'failed'
             annotation['error'] = str(e)
@@ -197,6 +287,59 @@ class DatasetAnnotator:
             logger.error(f"Échec de l'annotation {annotation_id}: {str(e)}")
             return annotation
 
+    def _annotate_item(self, platform, prompt, item_index, item):
+        """
+        Annote un élément du dataset
+
+        Args:
+            platform (str): Plateforme IA à utiliser
+            prompt (str): Prompt préparé pour l'élément
+            item_index (int): Position de l'élément dans le dataset
+            item: Élément à annoter
+
+        Returns:
+            dict: Résultat de l'annotation de l'élément
+        """
+        response = self.conductor.send_prompt(
+            platform, prompt, mode="standard", sync=True, timeout=30
+        )
+
+        # Analyser la réponse
+        if response and 'result' in response:
+            return {
+                'item_index': item_index,
+                'original': item,
+                'annotation': response['result'].get('response', ''),
+                'status': 'completed'
+            }
+
+        raise AIAutomationError("Pas de résultat valide reçu")
+
+    def _iter_results(self, annotation):
+        """
+        Parcourt les résultats d'une annotation (depuis dataset_items pour un dataset stocké)
+
+        Args:
+            annotation (dict): Informations sur l'annotation
+
+        Yields:
+            dict: item_index, original, annotation, status
+        """
+        dataset_id = annotation.get('dataset_id')
+        if dataset_id is None:
+            yield from annotation['results']
+            return
+
+        for row in self.database.iter_dataset_items(dataset_id):
+            if row['annotation_status'] is None:
+                continue
+            yield {
+                'item_index': row['item_index'],
+                'original': row['data'],
+                'annotation': row['annotation'],
+                'status': row['annotation_status']
+            }
+
     def get_annotation_status(self, annotation_id):
         """
         Récupère le statut d'une annotation
@@ -272,6 +415,8 @@ class DatasetAnnotator:
 
             # Exporter
             if format == 'json':
+                if annotation.get('dataset_id') is not None:
+                    annotation['results'] = list(self._iter_results(annotation))
                 with open(output_path, 'w', encoding='utf-8') as f:
                     json.dump(annotation, f, indent=2, ensure_ascii=False)
             elif format == 'csv':
@@ -279,7 +424,7 @@ class DatasetAnnotator:
                     writer = csv.writer(f)
                     writer.writerow(['item_index', 'original', 'annotation', 'status'])
 
-                    for result in annotation['results']:
+                    for result in self._iter_results(annotation):
                         writer.writerow([
                             result['item_index'],
                             json.dumps(result['original']),
@@ -0,0 +1,274 @@
+import json
+import random
+import re
+import threading
+from utils.lazy_import import lazy_import, is_available
+
+# Signatures vectorisées si NumPy est installé (chargé au premier lot), Python pur sinon
+HAS_NUMPY = is_available('numpy')
+np = lazy_import('numpy')
+
+# Similarité de Jaccard (estimée) à partir de laquelle deux lignes sont des quasi-doublons
+DEFAULT_THRESHOLD = 0.8
+
+# Nombre de fonctions de hachage par signature MinHash
+DEFAULT_NUM_PERM = 64
+
+# Taille des shingles (caractères)
+DEFAULT_SHINGLE_SIZE = 5
+
+_MASK64 = (1 << 64) - 1
+_SHINGLE_BASE = 1099511628211
+_NORMALIZE = re.compile(r'[\W_]+')
+
+# Longueur maximale d'une ligne citée
+LABEL_LENGTH = 120
+
+
+def normalize_text(text):
+    """Texte normalisé pour la comparaison (minuscules, ponctuation et espaces réduits)"""
+    return _NORMALIZE.sub(' ', str(text).lower()).strip()
+
+
+def row_text(row):
+    """
+    Texte comparé d'une ligne de dataset
+
+    Args:
+        row (dict/list/str): Objet JSON, ligne CSV ou texte
+
+    Returns:
+        str: Texte normalisé (valeurs dans l'ordre des clés triées pour un objet)
+    """
+    if isinstance(row, dict):
+        return normalize_text(' '.join(str(row[key]) for key in sorted(row, key=str)))
+    if isinstance(row, (list, tuple)):
+        return normalize_text(' '.join(str(value) for value in row))
+    return normalize_text(row)
+
+
+def _row_label(row, length=LABEL_LENGTH):
+    """Forme lisible et courte d'une ligne (citée dans les prompts de complément)"""
+    if isinstance(row, dict):
+        label = json.dumps(row, ensure_ascii=False, default=str)
+    elif isinstance(row, (list, tuple)):
+        label = ','.join(str(value) for value in row)
+    else:
+        label = str(row)
+    return label if len(label) <= length else label[:length - 1] + '…'
+
+
+def _band_layout(threshold, num_perm):
+    """
+    Choisit le découpage LSH (bandes, lignes par bande) pour un seuil
+
+    Le seuil effectif (1/b)^(1/r) est pris juste en dessous du seuil demandé : les
+    candidats en trop sont écartés par la vérification de similarité.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        effective = (1 / bands) ** (1 / rows)
+        if effective <= threshold and (best is None or effective > best[2]):
+            best = (bands, rows, effective)
+    return (best[0], best[1]) if best else (num_perm, 1)
+
+
+class NearDuplicateFilter:
+    """
+    Détection des quasi-doublons par signatures MinHash et index LSH
+
+    Chaque ligne est réduite à ses shingles de caractères ; sa signature MinHash estime
+    la similarité de Jaccard avec les lignes déjà retenues. L'index LSH (bandes de la
+    signature) limite la comparaison aux candidats probables, ce qui garde un coût
+    constant par ligne quel que soit le nombre de lignes retenues. Les signatures d'un
+    lot sont calculées en une passe NumPy quand il est disponible.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM,
+                 shingle_size=DEFAULT_SHINGLE_SIZE, seed=1):
+        """
+        Initialise le filtre
+
+        Args:
+            threshold (float): Similarité estimée à partir de laquelle une ligne est un doublon
+            num_perm (int): Nombre de fonctions de hachage par signature
+            shingle_size (int): Taille des shingles en caractères
+            seed (int): Graine des fonctions de hachage
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.band_rows = _band_layout(threshold, num_perm)
+
+        # Hachage multiply-shift : ((a * h + b) mod 2^64) >> 32, a impair
+        generator = random.Random(seed)
+        self._perms = [(generator.getrandbits(64) | 1, generator.getrandbits(64)) for _ in range(num_perm)]
+
+        self._texts = []
+        self._labels = []
+        self._signatures = []
+        self._hits = []
+        self._exact = {}
+        self._buckets = [{} for _ in range(self.bands)]
+
+        self.seen_count = 0
+        self.duplicate_count = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _shingle_hashes(self, text):
+        """Hachages (polynomiaux, 64 bits) des shingles d'un texte"""
+        k = min(self.shingle_size, len(text)) or 1
+        codes = [ord(char) for char in text] or [0]
+        hashes = []
+        for start in range(len(codes) - k + 1):
+            value = 0
+            for code in codes[start:start + k]:
+                value = (value * _SHINGLE_BASE + code) & _MASK64
+            hashes.append(value)
+        return hashes
+
+    def _signature_python(self, text):
+        hashes = self._shingle_hashes(text)
+        return tuple(min(((a * h + b) & _MASK64) >> 32 for h in hashes) for a, b in self._perms)
+
+    def _signatures_numpy(self, texts):
+        """Signatures d'un lot de textes en une passe (shingles de toutes les lignes concaténés)"""
+        chunks = []
+        offsets = []
+        position = 0
+        for text in texts:
+            codes = np.frombuffer((text or '\0').encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+            k = min(self.shingle_size, len(codes))
+            count = len(codes) - k + 1
+            hashes = np.zeros(count, dtype=np.uint64)
+            for j in range(k):
+                hashes = hashes * np.uint64(_SHINGLE_BASE) + codes[j:j + count]
+            chunks.append(hashes)
+            offsets.append(position)
+            position += count
+
+        multipliers = np.array([a for a, _ in self._perms], dtype=np.uint64)
+        increments = np.array([b for _, b in self._perms], dtype=np.uint64)
+        hashes = np.concatenate(chunks)
+
+        # (shingles x permutations), arithmétique modulo 2^64 native des uint64
+        values = (hashes[:, None] * multipliers[None, :] + increments[None, :]) >> np.uint64(32)
+        return [tuple(row) for row in np.minimum.reduceat(values, offsets, axis=0).tolist()]
+
+    def signatures(self, texts):
+        """
+        Signatures MinHash d'un lot de textes normalisés
+
+        Returns:
+            list: Une signature (tuple d'entiers) par texte
+        """
+        if not texts:
+            return []
+        if HAS_NUMPY:
+            return self._signatures_numpy(texts)
+        return [self._signature_python(text) for text in texts]
+
+    def _similarity(self, first, second):
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def _band_keys(self, signature):
+        rows = self.band_rows
+        return [signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def filter(self, rows):
+        """
+        Sépare les lignes uniques des quasi-doublons et indexe les lignes uniques
+
+        Les doublons sont recherchés parmi les lignes déjà retenues et parmi les lignes
+        précédentes du même lot.
+
+        Args:
+            rows (list): Lignes à filtrer
+
+        Returns:
+            tuple: (lignes uniques, [(ligne, ligne retenue proche (forme courte), similarité)])
+        """
+        texts = [row_text(row) for row in rows]
+        signatures = self.signatures(texts)
+
+        unique = []
+        duplicates = []
+        with self.lock:
+            for row, text, signature in zip(rows, texts, signatures):
+                self.seen_count += 1
+                match, similarity = self._find_match(text, signature)
+
+                if match is not None:
+                    self.duplicate_count += 1
+                    self._hits[match] += 1
+                    duplicates.append((row, self._labels[match], similarity))
+                    continue
+
+                index = len(self._texts)
+                self._texts.append(text)
+                self._labels.append(_row_label(row))
+                self._signatures.append(signature)
+                self._hits.append(0)
+                self._exact.setdefault(text, index)
+                for bucket, key in zip(self._buckets, self._band_keys(signature)):
+                    bucket.setdefault(key, []).append(index)
+                unique.append(row)
+
+        return unique, duplicates
+
+    def _find_match(self, text, signature):
+        """Ligne retenue la plus proche au-delà du seuil (index, similarité) ou (None, 0)"""
+        exact = self._exact.get(text)
+        if exact is not None:
+            return exact, 1.0
+
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+
+        best, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = self._similarity(signature, self._signatures[candidate])
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        return best, best_similarity
+
+    def avoid_hints(self, limit=5):
+        """
+        Lignes retenues à citer comme "à éviter" dans un prompt de complément
+
+        Les lignes ayant attiré le plus de doublons passent en premier, complétées par
+        les dernières lignes retenues.
+
+        Args:
+            limit (int): Nombre maximal de lignes
+
+        Returns:
+            list: Lignes sous forme courte (LABEL_LENGTH caractères au plus)
+        """
+        with self.lock:
+            ranked = sorted((i for i, hits in enumerate(self._hits) if hits), key=lambda i: self._hits[i],
+                            reverse=True)[:limit]
+            chosen = set(ranked)
+            for index in range(len(self._texts) - 1, -1, -1):
+                if len(ranked) >= limit:
+                    break
+                if index not in chosen:
+                    ranked.append(index)
+            return [self._labels[i] for i in ranked]
+
+    def stats(self):
+        """Statistiques du filtre (lignes vues, retenues, doublons)"""
+        with self.lock:
+            return {
+                'seen': self.seen_count,
+                'unique': len(self._texts),
+                'duplicates': self.duplicate_count,
+                'threshold': self.threshold,
+                'bands': self.bands,
+                'band_rows': self.band_rows
+            }
@@ -5,7 +5,32 @@ import time
 from datetime import datetime
 from utils.logger import logger
 from utils.exceptions import DatabaseError, AIAutomationError
-from .templates import get_generation_prompt
+from core.data.parser import ResponseParser
+from .templates import get_generation_prompt, get_regeneration_prompt
+from .validation import compile_schema
+from .dedup import NearDuplicateFilter, DEFAULT_THRESHOLD
+
+# Cycles de complément au plus (entrées manquantes ou invalides redemandées)
+MAX_REGENERATION_ROUNDS = 3
+
+# Erreurs de validation rappelées dans un prompt de complément
+MAX_REPORTED_ERRORS = 5
+
+# Entrées existantes citées comme "à ne pas reproduire" dans un prompt de complément
+MAX_AVOID_HINTS = 5
+
+# Taille des lots : budget de réponse de la plateforme / tokens estimés par entrée
+DEFAULT_RESPONSE_TOKENS = 2000
+DEFAULT_TOKENS_PER_ITEM = 40
+RESPONSE_FILL_RATIO = 0.75
+CHARS_PER_TOKEN = 4
+MIN_CHUNK_SIZE = 5
+MAX_CHUNK_SIZE = 200
+
+# Échecs consécutifs après lesquels une plateforme est écartée d'une génération par lots
+MAX_CHUNK_FAILURES = 2
+
+CHUNK_INSTRUCTIONS = "\nLot {index} d'une génération plus large : proposez des entrées variées, différentes des autres lots."
 
 
 class DatasetGenerator:
@@ -26,6 +51,9 @@ class DatasetGenerator:
         self.conductor = conductor
         self.database = database
 
+        # Extraction tolérante du JSON des réponses
+        self.parser = ResponseParser()
+
         # Registre des générations en cours
         self.active_generations = {}
 
@@ -46,12 +74,16 @@ class DatasetGenerator:
             dict/str: Résultats de la génération ou ID de la génération (async)
         """
         try:
-            # Choisir une plateforme disponible
+            # Choisir une plateforme disponible (les autres servent aux générations par lots)
+            candidates = generation_config.get('platforms')
             if platform is None:
-                available = self.conductor.get_available_platforms()
+                available = candidates or self.conductor.get_available_platforms()
                 if not available:
                     raise AIAutomationError("Aucune plateforme disponible")
-                platform = available[0]
+                platform = self.conductor.choose_platform(available)
+                candidates = available
+            elif not candidates:
+                candidates = [platform]
 
             # Créer l'ID de génération
             generation_id = f"generation_{int(time.time())}"
@@ -61,6 +93,7 @@ class DatasetGenerator:
                 'id': generation_id,
                 'config': generation_config,
                 'platform': platform,
+                'platforms': list(candidates),
                 'start_time': datetime.now().isoformat(),
                 'status': 'created',
                 'results': [],
@@ -94,71 +127,476 @@ class DatasetGenerator:
         """
         Exécute la génération du dataset
 
+        Les lignes de chaque réponse sont validées contre le schéma de la configuration :
+        les lignes valides sont conservées et seules les entrées manquantes ou invalides
+        sont redemandées. Avec 'chunked': True dans la configuration (opt-in), la génération
+        est découpée en lots répartis sur les plateformes disponibles (_run_chunked).
+
         Args:
             generation (dict): Informations sur la génération
-            timeout (float, optional): Délai maximum d'attente
+            timeout (float, optional): Délai maximum d'attente (toutes les requêtes)
 
         Returns:
             dict: Résultats de la génération
         """
         generation_id = generation['id']
-        platform = generation['platform']
         config = generation['config']
 
         try:
             # Mettre à jour le statut
             generation['status'] = 'running'
 
-            # Préparer le prompt
-            prompt_template = get_generation_prompt(config.get('format', 'csv'))
+            format = config.get('format', 'csv')
+            count = max(1, int(config.get('count', 10)))
+            deadline = time.time() + timeout if timeout else None
+
+            # Schéma compilé une fois pour toute la génération
+            state = {
+                'format': format,
+                'validator': compile_schema(config.get('schema', '')) if format in ('json', 'csv') else None,
+                'header': None,
+                'binding': None,
+                'rows': [],
+                'stored': 0,
+                'rejected': 0,
+                'errors': {},
+                'flagged': [],
+                'tokens_per_item': float(config.get('tokens_per_item', DEFAULT_TOKENS_PER_ITEM))
+            }
+            state['dedup'], state['dedup_action'] = self._create_dedup_filter(config)
 
-            # Prompt basique
-            prompt = prompt_template.format(
-                description=config.get('description', ''),
-                count=config.get('count', 10),
-                schema=config.get('schema', ''),
-                instructions=config.get('instructions', '')
-            )
+            if config.get('chunked', False):
+                self._run_chunked(generation, state, count, deadline)
+            else:
+                self._run_single(generation, state, count, deadline)
+
+            rows = state['rows']
+            if not rows:
+                raise AIAutomationError("Aucune entrée valide générée")
+
+            generation['results'] = [state['header']] + rows if state['header'] else rows
+            generation['rejected_count'] = state['rejected']
+            generation['validation_errors'] = dict(state['errors'])
+            if state['dedup'] is not None:
+                generation['duplicate_count'] = state['dedup'].duplicate_count
+                generation['flagged_duplicates'] = state['flagged']
+            if len(rows) < count:
+                generation['missing'] = count - len(rows)
+                logger.warning(f"Génération {generation_id}: {len(rows)}/{count} entrées valides")
+
+            # Enregistrer dans la base de données si disponible (lignes pas encore enregistrées)
+            self._store_rows(generation, state)
+
+            generation['status'] = 'completed'
+            generation['end_time'] = datetime.now().isoformat()
+            generation['progress'] = 100
+
+            logger.info(f"Génération {generation_id} terminée avec succès")
+            return generation
+
+        except Exception as e:
+            # Marquer comme échouée
+            generation['status'] = 'failed'
+            generation['error'] = str(e)
+            generation['end_time'] = datetime.now().isoformat()
+
+            logger.error(f"Échec de la génération {generation_id}: {str(e)}")
+            return generation
+
+    def _run_single(self, generation, state, count, deadline):
+        """
+        Génère le dataset sur une seule plateforme, compléments compris
+
+        Les entrées manquantes ou invalides sont redemandées au plus
+        max_regeneration_rounds fois.
+
+        Args:
+            generation (dict): Informations sur la génération
+            state (dict): État de la génération
+            count (int): Nombre d'entrées visé
+            deadline (float, optional): Échéance (time.time())
+        """
+        generation_id = generation['id']
+        platform = generation['platform']
+        config = generation['config']
+        format = state['format']
+        max_rounds = max(0, int(config.get('max_regeneration_rounds', MAX_REGENERATION_ROUNDS)))
+
+        prompt = self._build_prompt(get_generation_prompt(format), config, count)
+        rounds = 0
+
+        while True:
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                if not state['rows']:
+                    raise AIAutomationError("Timeout atteint")
+                logger.warning(f"Génération {generation_id}: délai atteint, complément interrompu")
+                break
 
             # Envoyer le prompt
             response = self.conductor.send_prompt(
-                platform, prompt, mode="standard", sync=True, timeout=timeout
+                platform, prompt, mode="standard", sync=True, timeout=remaining
             )
 
-            # Analyser la réponse
-            if response and 'result' in response:
-                raw_data = response['result'].get('response', '')
+            if not response or 'result' not in response:
+                if not state['rows']:
+                    raise AIAutomationError("Pas de résultat valide reçu")
+                logger.warning(f"Génération {generation_id}: complément sans réponse, arrêt")
+                break
 
-                # Parser les résultats selon le format
-                parsed_data = self._parse_generation_result(raw_data, config.get('format', 'csv'))
+            raw_data = response['result'].get('response', '')
+            accepted = self._collect_rows(self._parse_generation_result(raw_data, format), state, count)
 
-                generation['results'] = parsed_data
-                generation['status'] = 'completed'
-                generation['end_time'] = datetime.now().isoformat()
-                generation['progress'] = 100
+            missing = count - len(state['rows'])
+            generation['progress'] = min(99, int(len(state['rows']) * 100 / count))
+            logger.debug(f"Génération {generation_id}, cycle {rounds}: {accepted} ligne(s) valide(s), "
+                         f"{max(missing, 0)} manquante(s)")
 
-                # Enregistrer dans la base de données si disponible
-                if self.database:
-                    self._save_dataset_to_db(generation)
+            # Arrêt : objectif atteint, cycles épuisés ou complément sans aucune ligne valide
+            if missing <= 0 or rounds >= max_rounds or (rounds > 0 and accepted == 0):
+                break
 
-                logger.info(f"Génération {generation_id} terminée avec succès")
-                return generation
-            else:
-                raise AIAutomationError("Pas de résultat valide reçu")
+            rounds += 1
+            prompt = self._build_prompt(get_regeneration_prompt(format), config, missing,
+                                        errors=self._format_errors(state),
+                                        avoid=self._format_avoid_hints(state))
+
+        generation['rounds'] = rounds
+
+    def _chunk_size(self, platform, config, state):
+        """
+        Nombre d'entrées demandées par prompt à une plateforme
+
+        La taille découle du budget de réponse de la plateforme (limits.tokens_per_prompt
+        de son profil) et du nombre estimé de tokens par entrée, réévalué à chaque lot reçu.
+        La clé 'chunk_size' de la configuration impose une taille fixe.
+
+        Args:
+            platform (str): Plateforme
+            config (dict): Configuration de la génération
+            state (dict): État de la génération (tokens_per_item)
+
+        Returns:
+            int: Taille de lot
+        """
+        if config.get('chunk_size'):
+            return max(1, int(config['chunk_size']))
+
+        profile = None
+        if hasattr(self.conductor, 'get_platform_profile'):
+            profile = self.conductor.get_platform_profile(platform)
+        limits = (profile or {}).get('limits', {}) if isinstance(profile, dict) else {}
+        budget = limits.get('tokens_per_prompt') or DEFAULT_RESPONSE_TOKENS
+
+        size = int(budget * RESPONSE_FILL_RATIO / max(state['tokens_per_item'], 1.0))
+        return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, size))
+
+    def _plan_chunks(self, generation, state, missing):
+        """
+        Répartit les lots nécessaires entre les plateformes (conductor.distribute_batch)
+
+        Returns:
+            dict: Nombre de lots par plateforme
+        """
+        platforms = generation['platforms']
+        config = generation['config']
+        sizes = [self._chunk_size(platform, config, state) for platform in platforms]
+        chunk_count = -(-missing // max(1, sum(sizes) // len(sizes)))
+
+        allocation = {}
+        if hasattr(self.conductor, 'distribute_batch'):
+            allocation = self.conductor.distribute_batch(chunk_count, platforms) or {}
+        if not allocation:
+            # Routeur indisponible : répartition égale
+            allocation = {platform: -(-chunk_count // len(platforms)) for platform in platforms}
+        return {platform: n for platform, n in allocation.items() if n > 0}
+
+    def _chunk_prompt(self, generation, state, size, index):
+        """Prompt d'un lot : consignes de diversité, doublons et erreurs déjà constatés"""
+        config = dict(generation['config'])
+        config['instructions'] = (config.get('instructions', '') + CHUNK_INSTRUCTIONS.format(index=index)).strip()
+
+        if not state['rows']:
+            return self._build_prompt(get_generation_prompt(state['format']), config, size)
+        return self._build_prompt(get_regeneration_prompt(state['format']), config, size,
+                                  errors=self._format_errors(state),
+                                  avoid=self._format_avoid_hints(state))
+
+    def _run_chunked(self, generation, state, count, deadline):
+        """
+        Génère le dataset par lots répartis entre les plateformes disponibles
+
+        Les plateformes partagent l'automatisation du conducteur (souris, clavier,
+        navigateur) : les lots sont envoyés l'un après l'autre, en alternant entre les
+        plateformes selon la répartition de leur capacité estimée. Les lignes valides
+        d'un lot sont enregistrées dès sa réception, la progression reflète les entrées
+        valides obtenues, et plus aucun lot n'est envoyé une fois l'objectif atteint.
+        Le nombre total de lots est borné, et une plateforme en échec répété est écartée.
+
+        Args:
+            generation (dict): Informations sur la génération
+            state (dict): État de la génération
+            count (int): Nombre d'entrées visé
+            deadline (float, optional): Échéance (time.time())
+        """
+        generation_id = generation['id']
+        format = state['format']
+        config = generation['config']
+
+        allocation = self._plan_chunks(generation, state, count)
+        if not allocation:
+            raise AIAutomationError("Aucune plateforme disponible pour la génération par lots")
+
+        max_rounds = max(0, int(config.get('max_regeneration_rounds', MAX_REGENERATION_ROUNDS)))
+        max_chunks = sum(allocation.values()) * (1 + max_rounds)
+        failures = dict.fromkeys(allocation, 0)
+        sent = 0
+        stats = generation['chunks'] = {'planned': sum(allocation.values()), 'sent': 0, 'completed': 0,
+                                        'failed': 0}
+
+        logger.info(f"Génération {generation_id}: {count} entrées en lots sur "
+                    f"{', '.join(f'{p} ({n})' for p, n in allocation.items())}")
+
+        while len(state['rows']) < count and sent < max_chunks:
+            remaining = deadline - time.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"Génération {generation_id}: délai atteint, lots interrompus")
+                break
+
+            # Plateforme ayant le plus de lots restants : alternance proportionnelle à la répartition
+            platform = max(allocation, key=allocation.get, default=None)
+            if platform is None or allocation[platform] <= 0:
+                # Lots épuisés avant l'objectif : nouvelle répartition, dans la limite du total
+                missing = count - len(state['rows'])
+                allocation = {p: n for p, n in self._plan_chunks(generation, state, missing).items()
+                              if failures.get(p, 0) < MAX_CHUNK_FAILURES}
+                if not allocation:
+                    break
+                continue
+
+            size = min(self._chunk_size(platform, config, state), count - len(state['rows']))
+            prompt = self._chunk_prompt(generation, state, size, sent + 1)
+            allocation[platform] -= 1
+            sent += 1
+            stats['sent'] = sent
+
+            try:
+                response = self.conductor.send_prompt(platform, prompt, mode="standard", sync=True,
+                                                      timeout=remaining)
+                if not response or 'result' not in response:
+                    raise AIAutomationError("Pas de résultat valide reçu")
+            except Exception as e:
+                failures[platform] = failures.get(platform, 0) + 1
+                stats['failed'] += 1
+                logger.warning(f"Génération {generation_id}: lot de {size} en échec sur {platform}: {str(e)}")
+                if failures[platform] >= MAX_CHUNK_FAILURES:
+                    logger.warning(f"Génération {generation_id}: {platform} écartée après "
+                                   f"{failures[platform]} échecs")
+                    del allocation[platform]
+                continue
+
+            failures[platform] = 0
+            raw_data = response['result'].get('response', '')
+            parsed = self._parse_generation_result(raw_data, format)
+            accepted = self._collect_rows(parsed, state, count)
+            self._update_tokens_per_item(state, raw_data, len(parsed))
+            self._store_rows(generation, state)
+
+            stats['completed'] += 1
+            generation['progress'] = min(99, int(len(state['rows']) * 100 / count))
+            logger.debug(f"Génération {generation_id}: lot {platform} -> {accepted}/{size} entrée(s), "
+                         f"{len(state['rows'])}/{count}")
+
+        generation['rounds'] = max(0, sent - stats['planned'])
+
+    def _update_tokens_per_item(self, state, raw_data, item_count):
+        """Réévalue les tokens par entrée (moyenne glissante) à partir d'une réponse reçue"""
+        if item_count <= 0 or not raw_data:
+            return
+        observed = len(raw_data) / CHARS_PER_TOKEN / item_count
+        state['tokens_per_item'] = 0.5 * state['tokens_per_item'] + 0.5 * observed
+
+    def _store_rows(self, generation, state):
+        """
+        Enregistre en base les lignes valides pas encore enregistrées
+
+        Le dataset est créé au premier enregistrement (sans fichier : les éléments sont
+        stockés dans dataset_items) ; l'en-tête CSV est enregistré en premier élément.
+
+        Args:
+            generation (dict): Données de génération
+            state (dict): État de la génération
+        """
+        if not self.database:
+            return
+
+        rows = state['rows'][state['stored']:]
+        if not rows:
+            return
+
+        try:
+            config = generation['config']
+            if 'dataset_id' not in generation:
+                generation['dataset_id'] = self.database.record_dataset(
+                    name=config.get('name', f"Dataset {generation['id']}"),
+                    dataset_type=config.get('type', 'generated'),
+                    format=config.get('format', 'csv'),
+                    item_count=0,
+                    filepath=""
+                )
+                logger.debug(f"Dataset {generation['dataset_id']} créé en base de données")
+
+            items = rows
+            if state['stored'] == 0 and state['header']:
+                items = [state['header']] + rows
+
+            # Insertion groupée des éléments, item_count est tenu à jour à chaque lot
+            self.database.add_dataset_items(generation['dataset_id'], items)
+            state['stored'] += len(rows)
 
         except Exception as e:
-            # Marquer comme échouée
-            generation['status'] = 'failed'
-            generation['error'] = str(e)
-            generation['end_time'] = datetime.now().isoformat()
+            logger.error(f"Erreur lors de la sauvegarde en DB: {str(e)}")
 
-            logger.error(f"Échec de la génération {generation_id}: {str(e)}")
-            return generation
+    def _create_dedup_filter(self, config):
+        """
+        Crée le filtre de quasi-doublons d'une génération
+
+        La clé 'dedup' de la configuration vaut True (par défaut), False, ou un dictionnaire
+        (threshold, action: 'drop' pour écarter et redemander, 'flag' pour conserver et signaler).
+
+        Returns:
+            tuple: (NearDuplicateFilter ou None, action)
+        """
+        options = config.get('dedup', True)
+        if not options:
+            return None, None
+        if not isinstance(options, dict):
+            options = {}
+
+        action = options.get('action', 'drop')
+        if action not in ('drop', 'flag'):
+            raise AIAutomationError(f"Action de déduplication inconnue: {action}")
+
+        return NearDuplicateFilter(threshold=float(options.get('threshold', DEFAULT_THRESHOLD))), action
+
+    def _build_prompt(self, template, config, count, errors='', avoid=''):
+        """
+        Remplit un template de génération
+
+        Args:
+            template (str): Template (get_generation_prompt / get_regeneration_prompt)
+            config (dict): Configuration de la génération
+            count (int): Nombre d'entrées demandées
+            errors (str): Erreurs de validation à rappeler (complément)
+            avoid (str): Entrées existantes à ne pas reproduire (complément)
+
+        Returns:
+            str: Prompt
+        """
+        schema = config.get('schema', '')
+        if isinstance(schema, (dict, list)):
+            schema = json.dumps(schema, ensure_ascii=False, indent=2)
+
+        return template.format(
+            description=config.get('description', ''),
+            count=count,
+            schema=schema,
+            instructions=config.get('instructions', ''),
+            errors=errors,
+            avoid=avoid
+        )
+
+    def _format_errors(self, state):
+        """Erreurs de validation les plus fréquentes, une par ligne"""
+        errors = state['errors']
+        if not errors:
+            if state['dedup'] is not None and state['dedup'].duplicate_count:
+                return "- Entrées en double ou trop proches d'entrées existantes"
+            return "- Réponse incomplète ou mal formée"
+        frequent = sorted(errors.items(), key=lambda item: item[1], reverse=True)[:MAX_REPORTED_ERRORS]
+        return "\n".join(f"- {error} ({n} fois)" for error, n in frequent)
+
+    def _format_avoid_hints(self, state):
+        """Entrées existantes à ne pas reproduire, une par ligne"""
+        if state['dedup'] is None:
+            return "- Aucune"
+        hints = state['dedup'].avoid_hints(MAX_AVOID_HINTS)
+        return "\n".join(f"- {hint}" for hint in hints) if hints else "- Aucune"
+
+    def _collect_rows(self, rows, state, count):
+        """
+        Valide les lignes d'une réponse et conserve les lignes valides
+
+        Pour le CSV, l'en-tête de la première réponse est conservé et associé au schéma ;
+        les en-têtes répétés par les réponses de complément sont ignorés. Les lignes
+        valides passent ensuite par le filtre de quasi-doublons de la génération : écartées
+        (et donc redemandées) ou conservées et signalées selon l'action configurée.
+
+        Args:
+            rows (list): Lignes extraites de la réponse
+            state (dict): État de la génération (validateur, en-tête, lignes, rejets, doublons)
+            count (int): Nombre d'entrées visé
+
+        Returns:
+            int: Nombre de lignes valides ajoutées
+        """
+        validator = state['validator']
+        kept = state['rows']
+        errors = state['errors']
+        before = len(kept)
+        valid = []
+
+        for index, row in enumerate(rows):
+            if isinstance(row, list) and index == 0:
+                if state['header'] is None:
+                    if validator.is_header(row) or not validator:
+                        state['header'] = row
+                        state['binding'] = validator.bind_header(row)
+                        continue
+                elif validator.is_header(row) or \
+                        [cell.lower() for cell in row] == [cell.lower() for cell in state['header']]:
+                    continue
+
+            if validator is None:
+                error = None if row not in ('', None) else "ligne vide"
+            else:
+                error = validator.validate(row, state['binding'])
+
+            if error:
+                state['rejected'] += 1
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                valid.append(row)
+
+        dedup = state['dedup']
+        if dedup is None or not valid:
+            kept.extend(valid[:count - len(kept)])
+            return len(kept) - before
+
+        unique, duplicates = dedup.filter(valid)
+        if state['dedup_action'] == 'flag':
+            # Doublons conservés, signalés par leur position dans les résultats
+            duplicate_ids = {id(row): (match, similarity) for row, match, similarity in duplicates}
+            for row in valid[:count - len(kept)]:
+                if id(row) in duplicate_ids:
+                    match, similarity = duplicate_ids[id(row)]
+                    state['flagged'].append({'index': len(kept), 'similar_to': match,
+                                             'similarity': round(similarity, 3)})
+                kept.append(row)
+        else:
+            kept.extend(unique[:count - len(kept)])
+
+        if duplicates:
+            logger.debug(f"{len(duplicates)} quasi-doublon(s) sur {len(valid)} ligne(s) valide(s)")
+        return len(kept) - before
 
     def _parse_generation_result(self, raw_data, format):
         """
         Parse les résultats de génération selon le format
 
+        L'analyse est tolérante : les lignes exploitables sont toujours retournées (un
+        tableau JSON tronqué garde ses éléments complets), la validation se fait ligne à ligne.
+
         Args:
             raw_data (str): Données brutes
             format (str): Format des données
@@ -168,57 +606,28 @@ class DatasetGenerator:
         """
         try:
             if format == 'json':
-                # Nettoyer le JSON
-                cleaned_data = raw_data.strip()
-                if cleaned_data.startswith('```json'):
-                    cleaned_data = cleaned_data[7:]
-                if cleaned_data.endswith('```'):
-                    cleaned_data = cleaned_data[:-3]
-
-                return json.loads(cleaned_data)
+                data = self.parser.extract_json_data(raw_data, salvage_truncated=True)
+                if isinstance(data, dict):
+                    # Tableau enveloppé ({"data": [...]}) ou objet unique
+                    lists = [value for value in data.values() if isinstance(value, list)]
+                    return lists[0] if len(data) == 1 and lists else [data]
+                return data if isinstance(data, list) else []
 
             elif format == 'csv':
-                # Parser le CSV
-                lines = raw_data.strip().split('\n')
+                # Parser le CSV (délimiteurs de bloc de code et lignes vides ignorés)
+                lines = [line for line in raw_data.strip().split('\n')
+                         if line.strip() and not line.lstrip().startswith('```')]
                 reader = csv.reader(lines)
-                return list(reader)
+                return [[cell.strip() for cell in row] for row in reader]
 
             else:
                 # Format non reconnu, retourner en liste
-                return raw_data.strip().split('\n')
+                return [line for line in raw_data.strip().split('\n') if line.strip()]
 
         except Exception as e:
             logger.error(f"Erreur lors du parsing des résultats: {str(e)}")
             return []
 
-    def _save_dataset_to_db(self, generation):
-        """
-        Sauvegarde le dataset généré dans la base de données
-
-        Args:
-            generation (dict): Données de génération
-        """
-        try:
-            config = generation['config']
-            results = generation['results']
-
-            # Sauvegarder le dataset
-            dataset_id = self.database.record_dataset(
-                name=config.get('name', f"Dataset {generation['id']}"),
-                dataset_type=config.get('type', 'generated'),
-                format=config.get('format', 'csv'),
-                item_count=len(results),
-                filepath=f"generated_{generation['id']}.{config.get('format', 'csv')}"
-            )
-
-            # Mettre à jour la génération avec l'ID du dataset
-            generation['dataset_id'] = dataset_id
-
-            logger.debug(f"Dataset {dataset_id} enregistré en base de données")
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde en DB: {str(e)}")
-
     def get_generation_status(self, generation_id):
         """
         Récupère le statut d'une génération
@@ -74,4 +74,44 @@ INSTRUCTIONS SUPPLÉMENTAIRES:
 
 Fournissez les données dans le format demandé, sans texte supplémentaire.
 
-DATASET:"""
\ No newline at end of file
+DATASET:"""
+
+def get_regeneration_prompt(format="csv"):
+    """
+    Retourne le template de prompt de complément (entrées manquantes ou invalides)
+    """
+    if format == "csv":
+        output = """Fournissez UNIQUEMENT le contenu CSV, rien d'autre. Pas de texte explicatif avant ou après.
+Format: la même ligne d'en-tête dans la première ligne, puis les nouvelles données.
+
+CSV:"""
+    elif format == "json":
+        output = """Fournissez UNIQUEMENT le JSON valide, sans texte explicatif.
+Format: Array d'objets JSON contenant uniquement les nouvelles entrées.
+
+```json"""
+    else:
+        output = """Fournissez uniquement les nouvelles entrées, dans le même format, sans texte supplémentaire.
+
+DATASET:"""
+
+    return """Complétez le dataset suivant en générant de NOUVELLES entrées.
+
+DESCRIPTION:
+{description}
+
+NOMBRE D'ENTRÉES À GÉNÉRER: {count}
+
+SCHÉMA (à respecter strictement):
+{schema}
+
+INSTRUCTIONS SUPPLÉMENTAIRES:
+{instructions}
+
+ERREURS À ÉVITER (entrées précédentes rejetées):
+{errors}
+
+ENTRÉES DÉJÀ GÉNÉRÉES À NE PAS REPRODUIRE (ni sous une forme proche):
+{avoid}
+
+""" + output
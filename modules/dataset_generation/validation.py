@@ -0,0 +1,333 @@
+import json
+import re
+from collections import namedtuple
+
+# Règle compilée d'un champ : check(valeur) retourne un message d'erreur ou None
+FieldRule = namedtuple('FieldRule', ['name', 'required', 'check'])
+
+_MISSING = object()
+
+# Noms de types acceptés dans les schémas (anglais, abréviations, français)
+TYPE_ALIASES = {
+    'string': 'string', 'str': 'string', 'text': 'string', 'texte': 'string', 'chaine': 'string',
+    'chaîne': 'string',
+    'integer': 'integer', 'int': 'integer', 'entier': 'integer',
+    'number': 'number', 'float': 'number', 'double': 'number', 'decimal': 'number', 'nombre': 'number',
+    'réel': 'number',
+    'boolean': 'boolean', 'bool': 'boolean', 'booléen': 'boolean', 'booleen': 'boolean',
+    'array': 'array', 'list': 'array', 'liste': 'array', 'tableau': 'array',
+    'object': 'object', 'dict': 'object', 'objet': 'object',
+    'any': 'any'
+}
+
+_TRUE_VALUES = frozenset(('true', 'vrai', 'yes', 'oui', '1'))
+_FALSE_VALUES = frozenset(('false', 'faux', 'no', 'non', '0'))
+
+# Champ d'un schéma textuel : "nom: type", "nom (type, optionnel)", "- nom", "nom?"
+_TEXT_FIELD = re.compile(
+    r'^[\s\-\*•]*[`"\']?(?P<name>[^\W\d][\w\-]*)(?P<optional>\?)?[`"\']?\s*'
+    r'(?:[:(=]\s*(?P<spec>[^)]*)\)?)?\s*$'
+)
+_TEXT_SEPARATORS = re.compile(r'[\n,;](?![^(]*\))')
+_OPTIONAL_WORDS = re.compile(r'\b(optionnel|optional|facultatif)\b', re.IGNORECASE)
+
+
+def _coerce_integer(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise ValueError
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return float(value.strip().replace(',', '.'))
+    raise ValueError
+
+
+def _coerce_boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError
+
+
+def _coerce_string(value):
+    if isinstance(value, (dict, list, bool)) or value is None:
+        raise ValueError
+    return value if isinstance(value, str) else str(value)
+
+
+def _coerce_array(value):
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value.strip().startswith('['):
+        decoded = json.loads(value)
+        if isinstance(decoded, list):
+            return decoded
+    raise ValueError
+
+
+def _coerce_object(value):
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.strip().startswith('{'):
+        decoded = json.loads(value)
+        if isinstance(decoded, dict):
+            return decoded
+    raise ValueError
+
+
+# Les valeurs CSV sont du texte : chaque type accepte aussi sa représentation textuelle
+_COERCERS = {
+    'string': _coerce_string,
+    'integer': _coerce_integer,
+    'number': _coerce_number,
+    'boolean': _coerce_boolean,
+    'array': _coerce_array,
+    'object': _coerce_object
+}
+
+
+def _compile_field(name, spec, required):
+    """
+    Compile la spécification d'un champ en règle
+
+    Args:
+        name (str): Nom du champ
+        spec (dict/str/None): Type seul ou dictionnaire (type, enum, minimum, maximum,
+            min_length/minLength, max_length/maxLength, pattern, required)
+        required (bool): Champ obligatoire par défaut
+
+    Returns:
+        FieldRule: Règle compilée
+    """
+    if isinstance(spec, str):
+        spec = {'type': spec}
+    elif not isinstance(spec, dict):
+        spec = {}
+
+    if isinstance(spec.get('required'), bool):
+        required = spec['required']
+
+    field_type = spec.get('type', 'any')
+    if isinstance(field_type, list):
+        # Type JSON Schema multiple ("string", "null") : seul le premier type non nul compte
+        non_null = [t for t in field_type if t != 'null']
+        required = required and len(non_null) == len(field_type)
+        field_type = non_null[0] if non_null else 'any'
+    field_type = TYPE_ALIASES.get(str(field_type).strip().lower(), 'any')
+
+    coerce = _COERCERS.get(field_type)
+    enum = spec.get('enum')
+    allowed = frozenset(str(v) for v in enum) if enum else None
+    minimum = spec.get('minimum')
+    maximum = spec.get('maximum')
+    min_length = spec.get('min_length', spec.get('minLength'))
+    max_length = spec.get('max_length', spec.get('maxLength'))
+    pattern = re.compile(spec['pattern']) if spec.get('pattern') else None
+
+    def check(value):
+        if value is None or value == '':
+            return f"{name}: valeur vide" if required else None
+
+        if coerce is not None:
+            try:
+                value = coerce(value)
+            except (ValueError, TypeError):
+                return f"{name}: {field_type} attendu"
+
+        if allowed is not None and str(value) not in allowed:
+            return f"{name}: valeur hors liste ({value})"
+        if minimum is not None and isinstance(value, (int, float)) and value < minimum:
+            return f"{name}: inférieur à {minimum}"
+        if maximum is not None and isinstance(value, (int, float)) and value > maximum:
+            return f"{name}: supérieur à {maximum}"
+        if isinstance(value, (str, list)):
+            if min_length is not None and len(value) < min_length:
+                return f"{name}: longueur inférieure à {min_length}"
+            if max_length is not None and len(value) > max_length:
+                return f"{name}: longueur supérieure à {max_length}"
+        if pattern is not None and not pattern.fullmatch(str(value)):
+            return f"{name}: format invalide"
+        return None
+
+    return FieldRule(name, required, check)
+
+
+def _parse_text_schema(text):
+    """
+    Interprète un schéma décrit en texte libre
+
+    Returns:
+        list: Règles des champs, vide si le texte n'est pas une liste de champs reconnaissable
+    """
+    rules = []
+    for piece in _TEXT_SEPARATORS.split(text):
+        if not piece.strip():
+            continue
+        match = _TEXT_FIELD.match(piece)
+        if not match:
+            return []
+
+        spec = (match.group('spec') or '').strip()
+        optional = bool(match.group('optional')) or bool(_OPTIONAL_WORDS.search(spec))
+        field_type = spec.split()[0].strip(',').lower() if spec else 'any'
+        if field_type not in TYPE_ALIASES:
+            # Type non reconnu ("nom: description du champ") : seule la présence est vérifiée
+            field_type = 'any'
+        rules.append(_compile_field(match.group('name').strip(), field_type, not optional))
+    return rules
+
+
+class RowValidator:
+    """
+    Validateur de lignes compilé à partir du schéma d'une génération
+
+    Les règles sont compilées une seule fois ; la validation d'une ligne ne fait ensuite
+    qu'un appel de fonction par champ. Un schéma vide ou non interprétable donne un
+    validateur permissif qui n'écarte que les lignes vides.
+    """
+
+    def __init__(self, rules, allow_extra=True):
+        """
+        Initialise le validateur
+
+        Args:
+            rules (list): Règles des champs (FieldRule)
+            allow_extra (bool): Accepter les champs absents du schéma
+        """
+        self.rules = tuple(rules)
+        self.field_names = tuple(rule.name for rule in self.rules)
+        self.allow_extra = allow_extra
+        self._known = frozenset(self.field_names)
+        # Un en-tête CSV doit nommer au moins tous les champs obligatoires
+        self._header_names = frozenset(rule.name.lower() for rule in self.rules if rule.required) or \
+            frozenset(name.lower() for name in self.field_names)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def is_header(self, row):
+        """Indique si une ligne CSV est l'en-tête (noms des champs du schéma)"""
+        if not self.rules:
+            return False
+        return self._header_names <= {str(cell).strip().lower() for cell in row}
+
+    def bind_header(self, header):
+        """
+        Associe les règles aux colonnes d'un en-tête CSV
+
+        Returns:
+            tuple: (nombre de colonnes, [(index ou None, règle)])
+        """
+        positions = {str(cell).strip().lower(): index for index, cell in enumerate(header)}
+        return len(header), [(positions.get(rule.name.lower()), rule) for rule in self.rules]
+
+    def validate(self, row, binding=None):
+        """
+        Valide une ligne
+
+        Args:
+            row (dict/list/str): Ligne générée (objet JSON, ligne CSV ou texte)
+            binding (tuple, optional): Colonnes CSV (bind_header) ; ordre du schéma par défaut
+
+        Returns:
+            str: Message d'erreur, None si la ligne est valide
+        """
+        if row is None or row == '' or row == [] or row == {}:
+            return "ligne vide"
+
+        if isinstance(row, dict):
+            for rule in self.rules:
+                value = row.get(rule.name, _MISSING)
+                if value is _MISSING:
+                    # Tolère une différence de casse sur le nom du champ
+                    value = next((v for k, v in row.items() if str(k).lower() == rule.name.lower()), None)
+                error = rule.check(value)
+                if error:
+                    return error
+            if not self.allow_extra:
+                extra = [key for key in row if key not in self._known]
+                if extra:
+                    return f"champs inattendus: {', '.join(map(str, extra))}"
+            return None
+
+        if isinstance(row, (list, tuple)):
+            if binding is None:
+                if not self.rules:
+                    return None
+                width, columns = len(self.rules), list(enumerate(self.rules))
+            else:
+                width, columns = binding
+            if len(row) != width:
+                return f"{len(row)} colonnes au lieu de {width}"
+            for index, rule in columns:
+                error = rule.check(row[index] if index is not None else None)
+                if error:
+                    return error
+            return None
+
+        return "ligne non structurée" if self.rules else None
+
+
+def compile_schema(schema):
+    """
+    Compile le schéma d'une configuration de génération en validateur de lignes
+
+    Formes acceptées :
+        - JSON Schema d'objet ({"type": "object", "properties": {...}, "required": [...]})
+          ou de tableau d'objets ({"type": "array", "items": {...}}) ; seules les propriétés
+          listées dans "required" sont obligatoires
+        - dictionnaire {champ: type} ou {champ: {type, enum, minimum, pattern...}} (champs obligatoires)
+        - liste de noms de champs (tous obligatoires)
+        - texte : JSON de l'une des formes ci-dessus, ou liste "champ: type" séparée
+          par des virgules ou des retours à la ligne
+
+    Args:
+        schema (dict/list/str): Schéma de la configuration
+
+    Returns:
+        RowValidator: Validateur compilé (permissif si le schéma est vide ou non interprétable)
+    """
+    if isinstance(schema, str):
+        text = schema.strip()
+        if not text:
+            return RowValidator([])
+        if text[0] in '{[':
+            try:
+                return compile_schema(json.loads(text))
+            except ValueError:
+                pass
+        return RowValidator(_parse_text_schema(text))
+
+    if isinstance(schema, (list, tuple)):
+        return RowValidator([_compile_field(str(name), None, True) for name in schema if str(name).strip()])
+
+    if not isinstance(schema, dict) or not schema:
+        return RowValidator([])
+
+    if schema.get('type') == 'array' and isinstance(schema.get('items'), dict):
+        return compile_schema(schema['items'])
+
+    if isinstance(schema.get('properties'), dict):
+        # JSON Schema : les propriétés sont facultatives sauf si elles figurent dans "required"
+        required = schema.get('required')
+        required = set(required) if isinstance(required, list) else set()
+        rules = [_compile_field(name, spec, name in required) for name, spec in schema['properties'].items()]
+        return RowValidator(rules, allow_extra=schema.get('additionalProperties', True) is not False)
+
+    return RowValidator([_compile_field(str(name), spec, True) for name, spec in schema.items()])
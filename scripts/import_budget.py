@@ -0,0 +1,222 @@
+# scripts/import_budget.py
+
+"""
+Mesure le temps d'import des modules de l'application et vérifie un budget
+
+Chaque module est importé dans un interpréteur neuf lancé avec `python -X importtime` ;
+la sortie est analysée pour produire un rapport (temps cumulé, modules les plus coûteux)
+et le script échoue (code 1) si un module dépasse son budget ou charge une dépendance
+lourde qui doit rester différée (voir utils/lazy_import.py).
+
+Usage:
+    python scripts/import_budget.py
+    python scripts/import_budget.py --module core.data --top 20
+    python scripts/import_budget.py --json --skip-missing
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dépendances qui ne doivent être chargées qu'au premier usage
+HEAVY_MODULES = ('cv2', 'numpy', 'pandas', 'pytesseract', 'pyautogui', 'pyarrow', 'openpyxl', 'PIL')
+GUI_MODULES = ('PyQt5',)
+
+# Budget par module : (temps cumulé maximal en ms, paquets interdits à l'import)
+DEFAULT_BUDGETS = {
+    # Le paquet core.data n'importe ses classes qu'au premier accès : chaque sous-module
+    # a son propre budget, sans celui des autres
+    'core.data': (20, HEAVY_MODULES + GUI_MODULES),
+    'core.data.database': (150, HEAVY_MODULES + GUI_MODULES),
+    'core.data.exporter': (150, HEAVY_MODULES + GUI_MODULES),
+    'core.data.parser': (80, HEAVY_MODULES + GUI_MODULES),
+    'core.interaction.mouse': (100, HEAVY_MODULES + GUI_MODULES),
+    'core.interaction.keyboard': (100, HEAVY_MODULES + GUI_MODULES),
+    'core.interaction.screen': (100, HEAVY_MODULES + GUI_MODULES),
+    'core.vision': (120, HEAVY_MODULES + GUI_MODULES),
+    'core.scheduling': (150, HEAVY_MODULES + GUI_MODULES),
+    # StateBasedAutomation hérite de QObject : PyQt5 est requis dès l'import
+    'core.orchestration': (300, HEAVY_MODULES),
+    'modules.dataset_generation': (200, HEAVY_MODULES + GUI_MODULES),
+    'modules.dataset_annotation': (200, HEAVY_MODULES + GUI_MODULES),
+    'modules.brainstorming': (200, HEAVY_MODULES + GUI_MODULES),
+    'modules.content_analysis': (200, HEAVY_MODULES + GUI_MODULES),
+}
+
+IMPORT_TIME_RE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$')
+MISSING_MODULE_RE = re.compile(r"No module named '([^']+)'")
+
+
+def parse_importtime(stderr):
+    """
+    Analyse la sortie de `python -X importtime`
+
+    Args:
+        stderr (str): Sortie d'erreur de l'interpréteur
+
+    Returns:
+        list: Dictionnaires (name, self_us, cumulative_us, depth) dans l'ordre de sortie
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append({
+            'name': name,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+            # La profondeur est codée par deux espaces par niveau après le séparateur
+            'depth': max(len(indent) - 1, 0) // 2
+        })
+    return entries
+
+
+def measure_import(module, repeat=3):
+    """
+    Importe un module dans des interpréteurs neufs et garde la mesure la plus rapide
+
+    Args:
+        module (str): Nom complet du module
+        repeat (int): Nombre de mesures
+
+    Returns:
+        dict: Mesure (cumulative_ms, entries) ou erreur (error, missing)
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, env.get('PYTHONPATH')]))
+    env.pop('PYTHONIMPORTTIME', None)
+
+    best = None
+    for _ in range(max(repeat, 1)):
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=ROOT_DIR, env=env, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            lines = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+            missing = MISSING_MODULE_RE.search(process.stderr)
+            return {
+                'module': module,
+                'error': lines[-1] if lines else f"code de retour {process.returncode}",
+                'missing': missing.group(1) if missing else None
+            }
+
+        entries = parse_importtime(process.stderr)
+        target = next((entry for entry in reversed(entries) if entry['name'] == module), None)
+        cumulative_us = target['cumulative_us'] if target else sum(
+            entry['cumulative_us'] for entry in entries if entry['depth'] == 0)
+
+        if best is None or cumulative_us < best['cumulative_us']:
+            best = {'module': module, 'cumulative_us': cumulative_us, 'entries': entries}
+
+    best['cumulative_ms'] = best['cumulative_us'] / 1000
+    return best
+
+
+def check_budget(result, budget_ms, forbidden):
+    """
+    Compare une mesure à son budget
+
+    Returns:
+        list: Violations constatées (vide si le budget est respecté)
+    """
+    violations = []
+    if result['cumulative_ms'] > budget_ms:
+        violations.append(f"{result['cumulative_ms']:.1f} ms > budget {budget_ms} ms")
+
+    roots = sorted({entry['name'].split('.')[0] for entry in result['entries']
+                    if entry['name'].split('.')[0] in forbidden})
+    if roots:
+        violations.append("dépendances lourdes chargées à l'import: " + ", ".join(roots))
+    return violations
+
+
+def slowest_imports(result, top):
+    """Modules importés les plus coûteux (temps cumulé), hors module mesuré"""
+    entries = [entry for entry in result['entries'] if entry['name'] != result['module']]
+    return sorted(entries, key=lambda e: e['cumulative_us'], reverse=True)[:top]
+
+
+def format_report(result, top):
+    """Rapport texte d'une mesure : modules les plus coûteux (temps cumulé et propre)"""
+    lines = [f"{result['module']}: {result['cumulative_ms']:.1f} ms"]
+
+    lines.append(f"  {'cumulé (ms)':>12} {'propre (ms)':>12}  module")
+    for entry in slowest_imports(result, top):
+        lines.append(f"  {entry['cumulative_us'] / 1000:12.1f} {entry['self_us'] / 1000:12.1f}  "
+                     f"{'  ' * entry['depth']}{entry['name']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget de temps d'import des modules Liris")
+    parser.add_argument('--module', action='append',
+                        help="Module à mesurer (répétable, tous les modules budgétés par défaut)")
+    parser.add_argument('--budget-ms', type=float, help="Budget commun remplaçant les budgets par défaut")
+    parser.add_argument('--top', type=int, default=10, help="Modules les plus coûteux affichés")
+    parser.add_argument('--repeat', type=int, default=3, help="Mesures par module (la plus rapide est gardée)")
+    parser.add_argument('--skip-missing', action='store_true',
+                        help="Ignorer les modules dont une dépendance tierce n'est pas installée")
+    parser.add_argument('--json', action='store_true', help="Sortie JSON")
+    args = parser.parse_args(argv)
+
+    modules = args.module or list(DEFAULT_BUDGETS)
+    failed = False
+    report = []
+
+    for module in modules:
+        budget_ms, forbidden = DEFAULT_BUDGETS.get(module, (150, HEAVY_MODULES + GUI_MODULES))
+        if args.budget_ms is not None:
+            budget_ms = args.budget_ms
+
+        result = measure_import(module, args.repeat)
+
+        if 'error' in result:
+            # Une dépendance tierce absente de l'environnement n'est pas une régression
+            skipped = bool(args.skip_missing and result['missing'] and
+                           result['missing'].split('.')[0] not in ('core', 'modules', 'utils', 'ui', 'config'))
+            status = 'skipped' if skipped else 'error'
+            failed = failed or not skipped
+            report.append({'module': module, 'status': status, 'error': result['error']})
+            if not args.json:
+                print(f"{'⚠️' if skipped else '❌'} {module}: import impossible ({result['error']})")
+            continue
+
+        violations = check_budget(result, budget_ms, forbidden)
+        failed = failed or bool(violations)
+        report.append({
+            'module': module,
+            'status': 'fail' if violations else 'ok',
+            'cumulative_ms': round(result['cumulative_ms'], 1),
+            'budget_ms': budget_ms,
+            'violations': violations,
+            'top': [{'name': e['name'], 'cumulative_ms': round(e['cumulative_us'] / 1000, 1),
+                     'self_ms': round(e['self_us'] / 1000, 1)}
+                    for e in slowest_imports(result, args.top)]
+        })
+
+        if not args.json:
+            print(("❌ " if violations else "✅ ") + format_report(result, args.top))
+            for violation in violations:
+                print(f"   → {violation}")
+            print()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif failed:
+        print("❌ Budget d'import dépassé")
+    else:
+        print("✅ Budget d'import respecté")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from core.data import columnar
+
+pytestmark = pytest.mark.skipif(not columnar.HAS_PYARROW, reason="pyarrow non installé")
+
+
+def test_parquet_schema_widens_across_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = ([{'id': i, 'score': None, 'label': i, 'status': 'ok'} for i in range(3)]
+            + [{'id': 3, 'score': 4, 'label': 'texte', 'status': 'ok'}]
+            + [{'id': 4, 'score': 0.5, 'label': 5, 'status': 'ko', 'extra': {'k': 1}}])
+    path, count = columnar.write_parquet(rows, str(tmp_path / "out.parquet"), row_group_size=3)
+
+    assert count == 5
+    table = pq.read_table(path)
+    types = {field.name: str(field.type) for field in table.schema}
+    assert types['id'] == 'int64'
+    assert types['score'] == 'double'
+    assert types['label'] == 'string'
+    assert types['status'].startswith('dictionary')
+    assert types['extra'] == 'string'
+
+    data = table.to_pylist()
+    assert [row['score'] for row in data] == [None, None, None, 4.0, 0.5]
+    assert [row['label'] for row in data] == ['0', '1', '2', 'texte', '5']
+    assert data[0]['extra'] is None
+    assert json.loads(data[4]['extra']) == {'k': 1}
+
+
+def test_parquet_with_explicit_schema_ignores_unknown_keys(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    schema = pa.schema([('id', pa.int64()), ('platform', pa.dictionary(pa.int32(), pa.string()))])
+    rows = ({'id': i, 'platform': 'chatgpt', 'unknown': i} for i in range(5))
+    path, count = columnar.write_parquet(rows, str(tmp_path / "out.parquet"), schema=schema, row_group_size=2)
+
+    assert count == 5
+    table = pq.read_table(path)
+    assert table.schema.names == ['id', 'platform']
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert table.column('id').to_pylist() == list(range(5))
+
+
+def test_parquet_empty_input_writes_a_valid_file(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path, count = columnar.write_parquet(iter(()), str(tmp_path / "empty.parquet"))
+    assert count == 0
+    assert pq.read_table(path).num_rows == 0
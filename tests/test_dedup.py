@@ -0,0 +1,81 @@
+import pytest
+
+from modules.dataset_generation import dedup
+from modules.dataset_generation.dedup import NearDuplicateFilter, row_text
+
+
+ROWS = [
+    {"question": "Quelle est la capitale de la France ?", "answer": "Paris"},
+    {"question": "Quel est le plus long fleuve d'Afrique ?", "answer": "Le Nil"},
+    {"question": "Combien de côtés a un hexagone ?", "answer": "Six"},
+]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param and not dedup.is_available('numpy'):
+        pytest.skip("NumPy non installé")
+    monkeypatch.setattr(dedup, "HAS_NUMPY", request.param)
+    return request.param
+
+
+def test_row_text_ignores_case_punctuation_and_key_order():
+    first = {"b": "Bonjour, le MONDE !", "a": 1}
+    second = {"a": "1", "b": "bonjour le monde"}
+    assert row_text(first) == row_text(second) == "1 bonjour le monde"
+    assert row_text(["A", "b"]) == row_text("a; B")
+
+
+def test_exact_and_near_duplicates_are_rejected(backend):
+    flt = NearDuplicateFilter(threshold=0.7)
+    unique, duplicates = flt.filter(ROWS)
+    assert unique == ROWS
+    assert duplicates == []
+
+    exact = {"answer": "paris", "question": "quelle est la capitale de la france"}
+    near = {"question": "Quelle est la capitale de la France ??", "answer": "Paris."}
+    other = {"question": "Quelle est la couleur du ciel ?", "answer": "Bleu"}
+    unique, duplicates = flt.filter([exact, near, other])
+
+    assert unique == [other]
+    assert [row for row, _, _ in duplicates] == [exact, near]
+    assert duplicates[0][2] == 1.0
+    assert duplicates[1][2] >= 0.7
+    assert "capitale" in duplicates[0][1]
+    assert flt.stats()["seen"] == 6
+    assert flt.stats()["unique"] == len(flt) == 4
+    assert flt.stats()["duplicates"] == 2
+
+
+def test_duplicates_within_a_single_batch(backend):
+    flt = NearDuplicateFilter()
+    unique, duplicates = flt.filter(["Une ligne de test", "une ligne de test.", "Autre chose"])
+    assert unique == ["Une ligne de test", "Autre chose"]
+    assert len(duplicates) == 1
+
+
+def test_numpy_and_python_signatures_match():
+    if not dedup.is_available('numpy'):
+        pytest.skip("NumPy non installé")
+    flt = NearDuplicateFilter(num_perm=16)
+    texts = [row_text(row) for row in ROWS] + ["", "abc"]
+    assert flt._signatures_numpy(texts) == [flt._signature_python(text) for text in texts]
+
+
+def test_avoid_hints_rank_most_duplicated_rows_first(backend):
+    flt = NearDuplicateFilter()
+    flt.filter(["premier exemple", "deuxième exemple", "troisième exemple"])
+    flt.filter(["deuxième exemple", "Deuxième exemple !", "premier exemple"])
+
+    hints = flt.avoid_hints(limit=3)
+    assert hints[:2] == ["deuxième exemple", "premier exemple"]
+    assert hints[2] == "troisième exemple"
+    assert flt.avoid_hints(limit=1) == ["deuxième exemple"]
+
+
+def test_long_labels_are_truncated():
+    flt = NearDuplicateFilter()
+    flt.filter(["x" * 500])
+    label = flt.avoid_hints()[0]
+    assert len(label) == dedup.LABEL_LENGTH
+    assert label.endswith("…")
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import time
+
+from core.scheduling.durable_queue import DurableTaskStore, run_checkpointed
+from core.scheduling.queue import TaskQueue
+
+
+def _store(tmp_path, **options):
+    return DurableTaskStore(str(tmp_path / "queue.db"), **options)
+
+
+def _steal_lease(db_path, task_id, owner='other', lease_seconds=30):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("UPDATE durable_tasks SET lease_owner = ?, lease_expires = ? WHERE id = ?",
+                     (owner, time.time() + lease_seconds, task_id))
+    finally:
+        conn.close()
+
+
+def test_idempotency_key_returns_existing_task(tmp_path):
+    store = _store(tmp_path)
+    first = store.enqueue('handler', idempotency_key='step-1')
+    second = store.enqueue('handler', idempotency_key='step-1')
+
+    assert first == second
+    assert len(store.list_unfinished()) == 1
+
+
+def test_claim_is_exclusive_until_lease_expires(tmp_path):
+    store = _store(tmp_path, lease_seconds=0.2)
+    task_id = store.enqueue('handler')
+
+    assert store.claim(task_id, 'worker-a')
+    assert not store.claim(task_id, 'worker-b')
+
+    time.sleep(0.3)
+    assert store.claim(task_id, 'worker-b')
+    assert not store.heartbeat(task_id, 'worker-a')
+    assert store.heartbeat(task_id, 'worker-b')
+
+
+def test_complete_requires_lease_owner(tmp_path):
+    store = _store(tmp_path)
+    task_id = store.enqueue('handler')
+    store.claim(task_id, 'worker-a')
+
+    assert not store.complete(task_id, 'worker-b', {'value': 1})
+    assert store.complete(task_id, 'worker-a', {'value': 1})
+
+    task = store.get(task_id)
+    assert task['status'] == 'completed'
+    assert task['result'] == {'value': 1}
+
+
+def test_fail_retries_until_max_attempts(tmp_path):
+    store = _store(tmp_path, max_attempts=2)
+    task_id = store.enqueue('handler')
+
+    store.claim(task_id, 'worker')
+    assert store.fail(task_id, 'worker', 'boom') == 'pending'
+    store.claim(task_id, 'worker')
+    assert store.fail(task_id, 'worker', 'boom') == 'failed'
+
+
+def test_recover_expired_requeues_abandoned_tasks(tmp_path):
+    store = _store(tmp_path, lease_seconds=0.1)
+    task_id = store.enqueue('handler')
+    store.claim(task_id, 'crashed-worker')
+
+    time.sleep(0.2)
+    assert store.recover_expired() == 1
+    assert store.get(task_id)['status'] == 'pending'
+
+
+def test_run_checkpointed_reuses_persisted_result(tmp_path):
+    store = _store(tmp_path)
+    calls = []
+
+    def step(value):
+        calls.append(value)
+        return {'double': value * 2}
+
+    assert run_checkpointed(store, 'job:1', step, 21) == ({'double': 42}, False)
+    assert run_checkpointed(store, 'job:1', step, 21) == ({'double': 42}, True)
+    assert calls == [21]
+
+
+def test_run_checkpointed_prefers_result_of_lease_winner(tmp_path):
+    store = _store(tmp_path)
+
+    def step():
+        task = store.get_by_key('job:lost')
+        _steal_lease(store.db_path, task['id'])
+        store.complete(task['id'], 'other', 'theirs')
+        return 'mine'
+
+    assert run_checkpointed(store, 'job:lost', step) == ('theirs', True)
+
+
+def test_queue_resumes_unfinished_durable_tasks(tmp_path):
+    db_path = str(tmp_path / "queue.db")
+    store = DurableTaskStore(db_path)
+    store.enqueue('double', args=[4])
+
+    queue = TaskQueue(archive_path=db_path, durable_store=DurableTaskStore(db_path))
+    queue.register_handler('double', lambda value: value * 2)
+    assert queue.resume_durable_tasks() == 1
+
+    queue.start_processing(1)
+    try:
+        task_id = next(iter(queue.results))
+        queue.wait_for_task(task_id, timeout=5)
+        assert queue.get_task_result(task_id)['status'] == 'completed'
+        assert store.get(1)['result'] == 8
+    finally:
+        queue.stop_processing()
+
+
+def test_queue_adopts_result_when_lease_is_lost(tmp_path):
+    db_path = str(tmp_path / "queue.db")
+    store = DurableTaskStore(db_path)
+    queue = TaskQueue(archive_path=db_path, durable_store=store)
+    calls = []
+
+    def handler():
+        calls.append(1)
+        _steal_lease(db_path, 1)
+        return 'mine'
+
+    queue.register_handler('handler', handler)
+    task_id = queue.add_task('handler', 'platform')
+    queue.start_processing(1)
+    try:
+        deadline = time.time() + 5
+        while store.get(1)['lease_owner'] != 'other' and time.time() < deadline:
+            time.sleep(0.05)
+        assert store.complete(1, 'other', 'theirs')
+
+        queue.wait_for_task(task_id, timeout=5)
+        result = queue.get_task_result(task_id)
+        assert result['status'] == 'completed'
+        assert result['result'] == 'theirs'
+        assert calls == [1]
+    finally:
+        queue.stop_processing()
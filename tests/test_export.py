@@ -0,0 +1,102 @@
+import csv
+import gzip
+import json
+import os
+
+import pytest
+
+from core.data.database import Database
+from core.data.exporter import DataExporter
+from core.data.streaming import write_csv, write_json_array, write_jsonl
+
+
+class _Config:
+    def __init__(self, export_dir):
+        self.export_dir = export_dir
+
+    def get_export_config(self):
+        return {'export_dir': self.export_dir}
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return DataExporter(_Config(str(tmp_path / "exports")))
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_jsonl_streams_a_generator_and_reports_progress(tmp_path):
+    reports = []
+    rows = ({'index': i, 'text': f"ligne {i}"} for i in range(2500))
+    path, count = write_jsonl(rows, str(tmp_path / "out.jsonl"), compress=True,
+                              progress=lambda done, total: reports.append(done), total=2500)
+
+    assert count == 2500
+    assert path.endswith('.jsonl.gz')
+    assert not os.path.exists(path + '.partial')
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert [json.loads(line)['index'] for line in f] == list(range(2500))
+    assert reports == [1000, 2000, 2500]
+
+
+def test_json_array_is_valid_json(tmp_path):
+    path, count = write_json_array([{'a': 1}, {'b': [1, 2]}], str(tmp_path / "out.json"))
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == [{'a': 1}, {'b': [1, 2]}]
+    assert count == 2
+
+    path, count = write_json_array(iter(()), str(tmp_path / "empty.json"))
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == []
+    assert count == 0
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    def rows():
+        yield {'a': 1}
+        raise RuntimeError("source interrompue")
+
+    target = tmp_path / "out.jsonl"
+    with pytest.raises(RuntimeError):
+        write_jsonl(rows(), str(target))
+    assert os.listdir(tmp_path) == []
+
+
+def test_csv_uses_explicit_fieldnames(tmp_path):
+    rows = [{'a': 1}, {'a': 2, 'b': {'x': 1}}]
+    path, _ = write_csv(rows, str(tmp_path / "out.csv"), fieldnames=['a', 'b'])
+    assert _read_csv(path) == [{'a': '1', 'b': ''}, {'a': '2', 'b': '{"x": 1}'}]
+
+
+def test_dataset_csv_export_includes_late_keys(database, exporter):
+    dataset_id = database.record_dataset("test", "qa", "json", 3, "")
+    database.add_dataset_items(dataset_id, [{'question': 'q1'},
+                                            {'question': 'q2', 'answer': 'a2'},
+                                            {'source': 's3', 'question': 'q3'}])
+
+    path = exporter.export_dataset_items(database, dataset_id, format='csv')
+    rows = _read_csv(path)
+    assert list(rows[0]) == ['question', 'answer', 'source']
+    assert rows[1] == {'question': 'q2', 'answer': 'a2', 'source': ''}
+    assert rows[2]['source'] == 's3'
+
+
+def test_dataset_xlsx_export_includes_late_keys(database, exporter):
+    openpyxl = pytest.importorskip("openpyxl")
+    dataset_id = database.record_dataset("test", "qa", "json", 2, "")
+    database.add_dataset_items(dataset_id, [{'question': 'q1'}, {'question': 'q2', 'answer': 'a2'}])
+
+    path = exporter.export_dataset_items(database, dataset_id, format='xlsx')
+    sheet = openpyxl.load_workbook(path).active
+    assert [list(row) for row in sheet.iter_rows(values_only=True)] == [
+        ['question', 'answer'], ['q1', None], ['q2', 'a2']]
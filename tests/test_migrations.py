@@ -0,0 +1,97 @@
+import glob
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from core.data.database import Database, ensure_schema
+from core.data.migrations import DatabaseMigration
+from core.data.schema import LATEST_SCHEMA_VERSION, SCHEMA_MIGRATIONS
+
+# Base livrée avec le dépôt, antérieure aux migrations versionnées
+LEGACY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "liris.db")
+
+EXPECTED_TABLES = {'platforms', 'ai_sessions', 'prompts', 'responses', 'content_blobs', 'datasets',
+                   'dataset_items', 'rollup_hourly', 'rollup_daily', 'task_results', 'prompt_cache',
+                   'durable_tasks'}
+
+
+def _tables(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+
+
+def _backups(db_path):
+    return glob.glob(f"{db_path}.bak_*")
+
+
+def _count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_migrations_are_contiguous():
+    assert sorted(SCHEMA_MIGRATIONS) == list(range(1, LATEST_SCHEMA_VERSION + 1))
+
+
+def test_new_database_reaches_latest_version(tmp_path):
+    db_path = str(tmp_path / "new.db")
+    Database(db_path).close()
+
+    assert DatabaseMigration(db_path).get_current_version() == LATEST_SCHEMA_VERSION
+    assert EXPECTED_TABLES <= _tables(db_path)
+    assert _backups(db_path) == []
+
+
+def test_reopening_up_to_date_database_is_a_no_op(tmp_path):
+    db_path = str(tmp_path / "new.db")
+    Database(db_path).close()
+    Database(db_path).close()
+
+    assert DatabaseMigration(db_path).get_current_version() == LATEST_SCHEMA_VERSION
+    assert _backups(db_path) == []
+
+
+@pytest.mark.skipif(not os.path.exists(LEGACY_DB), reason="base historique absente")
+def test_legacy_database_is_backed_up_then_migrated(tmp_path):
+    db_path = str(tmp_path / "liris.db")
+    shutil.copy(LEGACY_DB, db_path)
+    platforms_before = _count(db_path, 'platforms')
+
+    Database(db_path).close()
+
+    assert DatabaseMigration(db_path).get_current_version() == LATEST_SCHEMA_VERSION
+    assert EXPECTED_TABLES <= _tables(db_path)
+    assert _count(db_path, 'platforms') == platforms_before
+
+    backups = _backups(db_path)
+    assert len(backups) == 1
+    assert '.bak_v0_' in backups[0]
+    assert 'schema_migrations' not in _tables(backups[0])
+
+
+def test_tables_created_before_their_migration_are_kept(tmp_path):
+    db_path = str(tmp_path / "early.db")
+    Database(db_path).close()
+
+    # Base en v9 dont durable_tasks a été créée directement par la file durable
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("DELETE FROM schema_migrations WHERE version = 10")
+        conn.execute("INSERT INTO durable_tasks (handler, status, created_at, updated_at) "
+                     "VALUES ('handler', 'pending', 0, 0)")
+    finally:
+        conn.close()
+    assert DatabaseMigration(db_path).get_current_version() == 9
+
+    ensure_schema(db_path)
+
+    assert DatabaseMigration(db_path).get_current_version() == LATEST_SCHEMA_VERSION
+    assert _count(db_path, 'durable_tasks') == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from core.data.database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+def _walk(list_page, page_size, **filters):
+    rows, cursor = [], None
+    while True:
+        page = list_page(cursor=cursor, page_size=page_size, **filters)
+        assert len(page.rows) <= page_size
+        rows.extend(page.rows)
+        if page.next_cursor is None:
+            return rows
+        cursor = page.next_cursor
+
+
+@pytest.fixture
+def prompts(database):
+    sessions = {platform: database.create_session(platform) for platform in ('chatgpt', 'claude')}
+    ids = [database.record_prompt(sessions['chatgpt' if i % 3 else 'claude'], f"prompt {i}", 2,
+                                  'generation' if i % 2 else 'analysis')
+           for i in range(23)]
+    # Horodatages partagés : l'ID départage les lignes de même horodatage
+    database.conn.execute("UPDATE prompts SET timestamp = CASE WHEN id % 2 THEN '2026-01-01' ELSE '2026-01-02' END")
+    database.conn.commit()
+    return ids
+
+
+@pytest.mark.parametrize("page_size", [1, 5, 23, 100])
+@pytest.mark.parametrize("descending", [True, False])
+def test_prompt_pages_visit_every_row_once(database, prompts, page_size, descending):
+    rows = _walk(database.list_prompts_page, page_size, descending=descending)
+    assert sorted(row.id for row in rows) == sorted(prompts)
+
+    keys = [(row.timestamp, row.id) for row in rows]
+    assert keys == sorted(keys, reverse=descending)
+
+
+def test_prompt_pages_apply_filters(database, prompts):
+    rows = _walk(database.list_prompts_page, 4, platform='claude', operation_type='analysis')
+    assert [row.id for row in rows]
+    assert all(row.platform == 'claude' and row.operation_type == 'analysis' for row in rows)
+    assert len(rows) == len([i for i in range(23) if i % 3 == 0 and i % 2 == 0])
+
+
+def test_dataset_pages_visit_every_row_once(database):
+    ids = [database.record_dataset(f"dataset_{i}%", "qa", "json", i, "") for i in range(12)]
+    database.conn.execute("UPDATE datasets SET creation_date = '2026-01-01'")
+    database.conn.commit()
+
+    rows = _walk(database.list_datasets_page, 5)
+    assert [row.id for row in rows] == sorted(ids, reverse=True)
+
+    # Les caractères génériques de LIKE sont pris littéralement
+    assert [row.name for row in _walk(database.list_datasets_page, 5, name="_1%")] == ["dataset_1%"]
+    assert database.list_datasets_page(page_size=5, name="zzz").rows == []
+
+
+def test_empty_table_has_no_next_page(database):
+    page = database.list_responses_page(page_size=10)
+    assert page.rows == []
+    assert page.next_cursor is None
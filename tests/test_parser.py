@@ -0,0 +1,70 @@
+import types
+
+import pytest
+
+from core.data import parser
+from core.data.parser import ResponseParser, scan_json_payloads
+
+
+@pytest.fixture
+def response_parser():
+    return ResponseParser()
+
+
+RESPONSE = """Voici le résultat :
+```json
+{"items": [{"id": 1}, {"id": 2}]}
+```
+1. Premier point
+- Second point
+"""
+
+
+def test_scan_json_payloads_skips_braces_in_free_text():
+    payloads = scan_json_payloads('Un {texte} entre accolades puis {"a": [1, {"b": "}"}]} et [1, 2]')
+    assert [payload[2] for payload in payloads] == [{"a": [1, {"b": "}"}]}, [1, 2]]
+
+
+def test_truncated_array_is_salvaged_on_request(response_parser):
+    truncated = 'Résultat : [{"id": 1}, {"id": 2}, {"id":'
+    assert response_parser.extract_json_data(truncated) is None
+    assert response_parser.extract_json_data(truncated, salvage_truncated=True) == [{"id": 1}, {"id": 2}]
+
+
+def test_parse_many_fields(response_parser):
+    [result] = response_parser.parse_many([RESPONSE], workers=1, error_patterns=["quota"])
+    assert result['json'] == {"items": [{"id": 1}, {"id": 2}]}
+    assert result['list_items'] == ["Premier point", "Second point"]
+    assert result['code_blocks'][0]['language'] == 'json'
+    assert result['error'] is None
+    assert result['text'].startswith("Voici le résultat")
+
+
+def test_parse_many_isolates_unparsable_responses(response_parser):
+    results = response_parser.parse_many([RESPONSE, 42, None, "[1, 2]"], fields=('text', 'json'), workers=1)
+
+    assert results[0]['json'] == {"items": [{"id": 1}, {"id": 2}]}
+    assert results[1]['parse_error'].startswith("TypeError")
+    assert results[2] == {'text': '', 'json': None}
+    assert results[3]['json'] == [1, 2]
+
+
+def test_parse_many_falls_back_when_process_pool_is_unavailable(response_parser, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise OSError("processus interdits")
+
+    monkeypatch.setattr(parser, "PROCESS_POOL_THRESHOLD", 2)
+    monkeypatch.setattr(parser, "concurrent_process", types.SimpleNamespace(ProcessPoolExecutor=unavailable))
+
+    results = response_parser.parse_many(["[1]", "[2]", 42], fields=('json',), workers=4)
+    assert [result.get('json') for result in results] == [[1], [2], None]
+    assert 'parse_error' in results[2]
+
+
+def test_parse_many_process_pool_keeps_order(response_parser, monkeypatch):
+    monkeypatch.setattr(parser, "PROCESS_POOL_THRESHOLD", 4)
+    responses = [f'{{"index": {i}}}' for i in range(10)] + [42]
+
+    results = response_parser.parse_many(responses, fields=('json',), workers=2, chunk_size=3)
+    assert [result['json']['index'] for result in results[:10]] == list(range(10))
+    assert 'parse_error' in results[10]
@@ -0,0 +1,69 @@
+import pytest
+
+from core.scheduling.queue import TaskQueue
+
+
+@pytest.fixture
+def task_queue(tmp_path):
+    queue = TaskQueue(max_results=2, archive_path=str(tmp_path / "archive.db"))
+    yield queue
+    queue.stop_processing()
+
+
+def _run_all(queue, funcs):
+    task_ids = [queue.add_task(func, 'platform') for func in funcs]
+    workers = queue.start_processing(1)
+    for task_id in task_ids:
+        assert queue.wait_for_task(task_id, timeout=5) is not None
+
+    # Les workers appliquent aussi la rétention : attendre leur arrêt avant d'inspecter la file
+    queue.stop_processing()
+    for worker in workers:
+        worker.join(timeout=5)
+    return task_ids
+
+
+def test_evicted_results_are_served_from_archive(task_queue):
+    task_ids = _run_all(task_queue, [lambda i=i: {'value': i} for i in range(5)] + [lambda: 1 / 0])
+    task_queue._apply_retention()
+
+    assert len(task_queue.results) <= 2
+    for index, task_id in enumerate(task_ids[:5]):
+        result = task_queue.get_task_result(task_id)
+        assert result['status'] == 'completed'
+        assert result['result'] == {'value': index}
+
+    failed = task_queue.get_task_result(task_ids[-1])
+    assert failed['status'] == 'failed'
+    assert 'division' in failed['error']
+    assert task_queue.get_task_result(999)['status'] == 'unknown'
+
+
+def test_archive_failure_keeps_results_for_next_eviction(task_queue, monkeypatch):
+    store = task_queue.archive.store
+
+    def broken_store(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(task_queue.archive, 'store', broken_store)
+    task_ids = _run_all(task_queue, [lambda i=i: i for i in range(4)])
+
+    assert task_queue._apply_retention() == 0
+    assert all(task_queue.get_task_result(task_id)['result'] == index
+               for index, task_id in enumerate(task_ids))
+    assert list(task_queue._finished) == task_ids
+
+    monkeypatch.setattr(task_queue.archive, 'store', store)
+    assert task_queue._apply_retention() == 2
+    assert all(task_queue.get_task_result(task_id)['result'] == index
+               for index, task_id in enumerate(task_ids))
+    assert list(task_queue._finished) == task_ids[2:]
+
+
+def test_status_counts_follow_transitions(task_queue):
+    _run_all(task_queue, [lambda: 'ok', lambda: 'ok', lambda: 1 / 0])
+
+    counts = task_queue.get_queue_status()['status_counts']
+    assert counts['completed'] == 2
+    assert counts['failed'] == 1
+    assert counts['pending'] == counts['running'] == 0
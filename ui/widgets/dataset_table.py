@@ -20,6 +20,9 @@ class DatasetTable(QtWidgets.QWidget):
     dataset_created = pyqtSignal(int)
     dataset_deleted = pyqtSignal(int)
 
+    # Nombre de datasets chargés à chaque page (la suite se charge au défilement)
+    PAGE_SIZE = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -27,6 +30,10 @@ class DatasetTable(QtWidgets.QWidget):
         self.exporter = None
         self.current_dataset_id = None
 
+        # Pagination par clé : curseur de la page suivante (None = fin de liste)
+        self._next_cursor = None
+        self._loading_page = False
+
         # Couleurs du thème
         self.primary_color = "#A23B2D"  # Rouge brique
         self.secondary_color = "#D35A4A"  # Rouge brique clair
@@ -262,6 +269,9 @@ class DatasetTable(QtWidgets.QWidget):
         self.datasets_table.itemSelectionChanged.connect(self._on_selection_changed)
         self.datasets_table.cellDoubleClicked.connect(self._on_dataset_double_clicked)
 
+        # Chargement de la page suivante en arrivant en bas du tableau
+        self.datasets_table.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
         list_layout.addWidget(self.datasets_table)
 
         # Panneau de droite: détails du dataset
@@ -385,52 +395,67 @@ class DatasetTable(QtWidgets.QWidget):
         self.status_label.setText(message)
 
     def refresh_list(self):
-        """Actualise la liste des datasets"""
+        """Actualise la liste des datasets (première page)"""
         # Vérifier la disponibilité de la base de données
         if not self.database:
             self.update_status(tr("datasets.database_unavailable"))
             return
 
-        try:
-            # Effacer la sélection actuelle
-            self.current_dataset_id = None
-            self.datasets_table.clearSelection()
+        # Effacer la sélection actuelle
+        self.current_dataset_id = None
+        self.datasets_table.clearSelection()
 
-            # Effacer le tableau
-            self.datasets_table.setRowCount(0)
+        # Effacer le tableau
+        self.datasets_table.setRowCount(0)
+        self._next_cursor = None
 
-            # Récupérer la liste des datasets
-            datasets = self.database.get_all_datasets()
+        self._load_page()
 
-            if not datasets:
-                self.update_status(tr("datasets.no_datasets"))
-                return
+    def _load_page(self, cursor=None):
+        """
+        Charge une page de datasets et l'ajoute au tableau
 
-            # Filtre de recherche
-            search_text = self.search_edit.text().lower()
+        Args:
+            cursor (tuple, optional): Curseur de la page à charger (None = première page)
+        """
+        if self._loading_page:
+            return
 
-            # Remplir le tableau
-            for dataset in datasets:
-                # Filtrer selon la recherche
-                if search_text and search_text not in dataset.get('name', '').lower():
-                    continue
+        self._loading_page = True
+        try:
+            # Filtre de recherche (appliqué par la requête, pas après lecture)
+            search_text = self.search_edit.text().strip()
 
+            page = self.database.list_datasets_page(
+                cursor=cursor,
+                page_size=self.PAGE_SIZE,
+                name=search_text if search_text else None
+            )
+            self._next_cursor = page.next_cursor
+
+            if not page.rows:
+                if cursor is None:
+                    self.update_status(tr("datasets.no_datasets"))
+                return
+
+            # Remplir le tableau
+            for dataset in page.rows:
                 # Ajouter une ligne
                 row = self.datasets_table.rowCount()
                 self.datasets_table.insertRow(row)
 
                 # ID
-                id_item = QtWidgets.QTableWidgetItem(str(dataset.get('id', '')))
+                id_item = QtWidgets.QTableWidgetItem(str(dataset.id))
                 id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
                 self.datasets_table.setItem(row, 0, id_item)
 
                 # Nom
-                name_item = QtWidgets.QTableWidgetItem(dataset.get('name', ''))
+                name_item = QtWidgets.QTableWidgetItem(dataset.name or '')
                 name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
                 self.datasets_table.setItem(row, 1, name_item)
 
                 # Date
-                date_str = dataset.get('created_at', '')
+                date_str = dataset.creation_date or ''
                 if date_str:
                     try:
                         date = datetime.fromisoformat(date_str)
@@ -445,9 +470,27 @@ class DatasetTable(QtWidgets.QWidget):
             # Mettre à jour le statut
             self.update_status(tr("datasets.datasets_displayed", count=self.datasets_table.rowCount()))
 
+            # Tableau sans barre de défilement : enchaîner la page suivante
+            if self._next_cursor is not None and self.datasets_table.verticalScrollBar().maximum() == 0:
+                QtCore.QTimer.singleShot(0, lambda: self._on_scroll(0))
+
         except Exception as e:
             logger.error(f"Erreur lors de l'actualisation de la liste: {str(e)}")
             self.update_status(tr("datasets.error", error=str(e)))
+            self._next_cursor = None
+
+        finally:
+            self._loading_page = False
+
+    def _on_scroll(self, value):
+        """
+        Charge la page suivante quand le défilement atteint le bas du tableau
+
+        Args:
+            value (int): Position de la barre de défilement
+        """
+        if self._next_cursor is not None and value >= self.datasets_table.verticalScrollBar().maximum():
+            self._load_page(self._next_cursor)
 
     def _on_search_changed(self, text):
         """
@@ -19,12 +19,19 @@ class PromptList(QtWidgets.QWidget):
     prompt_selected = pyqtSignal(int)
     prompt_deleted = pyqtSignal(int)
 
+    # Nombre de prompts chargés à chaque page (la suite se charge au défilement)
+    PAGE_SIZE = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.database = None
         self.current_prompt_id = None
 
+        # Pagination par clé : curseur de la page suivante (None = fin de liste)
+        self._next_cursor = None
+        self._loading_page = False
+
         # Couleurs du thème
         self.primary_color = "#A23B2D"  # Rouge brique
         self.secondary_color = "#D35A4A"  # Rouge brique clair
@@ -302,6 +309,9 @@ class PromptList(QtWidgets.QWidget):
         self.prompts_table.itemSelectionChanged.connect(self._on_selection_changed)
         self.prompts_table.cellDoubleClicked.connect(self._on_prompt_double_clicked)
 
+        # Chargement de la page suivante en arrivant en bas du tableau
+        self.prompts_table.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
         list_layout.addWidget(self.prompts_table)
 
         # Détail du prompt
@@ -391,57 +401,75 @@ class PromptList(QtWidgets.QWidget):
         self.status_label.setText(message)
 
     def refresh_list(self):
-        """Actualise la liste des prompts"""
+        """Actualise la liste des prompts (première page)"""
         # Vérifier la disponibilité de la base de données
         if not self.database:
             self.update_status(tr("history.database_unavailable"))
             return
 
-        try:
-            # Effacer la sélection actuelle
-            self.current_prompt_id = None
-            self.prompts_table.clearSelection()
-            self.prompt_edit.clear()
-            self.response_edit.clear()
-            self.metadata_table.setRowCount(0)
+        # Effacer la sélection actuelle
+        self.current_prompt_id = None
+        self.prompts_table.clearSelection()
+        self.prompt_edit.clear()
+        self.response_edit.clear()
+        self.metadata_table.setRowCount(0)
+
+        # Effacer le tableau
+        self.prompts_table.setRowCount(0)
+        self._next_cursor = None
+
+        self._load_page()
+
+    def _load_page(self, cursor=None):
+        """
+        Charge une page de prompts et l'ajoute au tableau
 
-            # Effacer le tableau
-            self.prompts_table.setRowCount(0)
+        Args:
+            cursor (tuple, optional): Curseur de la page à charger (None = première page)
+        """
+        if self._loading_page:
+            return
 
+        self._loading_page = True
+        try:
             # Récupérer les filtres
             platform = self.platform_combo.currentData()
             prompt_type = self.type_combo.currentData()
             search_text = self.search_edit.text()
 
-            # Récupérer la liste des prompts
-            prompts = self.database.get_prompts(
+            # Récupérer la page (lignes légères) puis les aperçus des seuls prompts affichés
+            page = self.database.list_prompts_page(
+                cursor=cursor,
+                page_size=self.PAGE_SIZE,
                 platform=platform if platform else None,
                 operation_type=prompt_type if prompt_type else None,
-                search=search_text if search_text else None,
-                limit=1000  # Limiter le nombre de résultats
+                search=search_text if search_text else None
             )
+            previews = self.database.get_prompt_previews([prompt.id for prompt in page.rows], length=201)
+            self._next_cursor = page.next_cursor
 
-            if not prompts:
-                self.update_status(tr("history.no_prompts_found"))
-                self.count_label.setText(tr("history.count", count=0))
+            if not page.rows:
+                if cursor is None:
+                    self.update_status(tr("history.no_prompts_found"))
+                    self.count_label.setText(tr("history.count", count=0))
                 return
 
             # Mettre à jour les plateformes disponibles
-            self._update_platforms(prompts)
+            self._update_platforms(page.rows)
 
             # Remplir le tableau
-            for prompt in prompts:
+            for prompt in page.rows:
                 # Ajouter une ligne
                 row = self.prompts_table.rowCount()
                 self.prompts_table.insertRow(row)
 
                 # ID
-                id_item = QtWidgets.QTableWidgetItem(str(prompt.get('id', '')))
+                id_item = QtWidgets.QTableWidgetItem(str(prompt.id))
                 id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
                 self.prompts_table.setItem(row, 0, id_item)
 
                 # Date
-                timestamp = prompt.get('timestamp', '')
+                timestamp = prompt.timestamp or ''
                 date_str = ""
 
                 if timestamp:
@@ -456,17 +484,17 @@ class PromptList(QtWidgets.QWidget):
                 self.prompts_table.setItem(row, 1, date_item)
 
                 # Plateforme
-                platform_item = QtWidgets.QTableWidgetItem(prompt.get('platform', ''))
+                platform_item = QtWidgets.QTableWidgetItem(prompt.platform or '')
                 platform_item.setFlags(platform_item.flags() & ~Qt.ItemIsEditable)
                 self.prompts_table.setItem(row, 2, platform_item)
 
                 # Type
-                type_item = QtWidgets.QTableWidgetItem(prompt.get('operation_type', ''))
+                type_item = QtWidgets.QTableWidgetItem(prompt.operation_type or '')
                 type_item.setFlags(type_item.flags() & ~Qt.ItemIsEditable)
                 self.prompts_table.setItem(row, 3, type_item)
 
                 # Contenu (aperçu)
-                content = prompt.get('content', '')
+                content = previews.get(prompt.id) or ''
                 preview = content[:50].replace('\n', ' ')
                 if len(content) > 50:
                     preview += "..."
@@ -481,40 +509,39 @@ class PromptList(QtWidgets.QWidget):
             self.update_status(tr("history.prompts_displayed", count=count))
             self.count_label.setText(tr("history.count", count=count))
 
+            # Tableau sans barre de défilement : enchaîner la page suivante
+            if self._next_cursor is not None and self.prompts_table.verticalScrollBar().maximum() == 0:
+                QtCore.QTimer.singleShot(0, lambda: self._on_scroll(0))
+
         except Exception as e:
             logger.error(f"Erreur lors de l'actualisation de la liste: {str(e)}")
             self.update_status(tr("history.error", error=str(e)))
+            self._next_cursor = None
 
-    def _update_platforms(self, prompts):
+        finally:
+            self._loading_page = False
+
+    def _on_scroll(self, value):
         """
-        Met à jour la liste des plateformes disponibles
+        Charge la page suivante quand le défilement atteint le bas du tableau
 
         Args:
-            prompts (list): Liste des prompts
+            value (int): Position de la barre de défilement
         """
-        # Sauvegarder la sélection actuelle
-        current_platform = self.platform_combo.currentData()
-
-        # Récupérer toutes les plateformes uniques
-        platforms = set()
+        if self._next_cursor is not None and value >= self.prompts_table.verticalScrollBar().maximum():
+            self._load_page(self._next_cursor)
 
-        for prompt in prompts:
-            platform = prompt.get('platform', '')
-            if platform:
-                platforms.add(platform)
-
-        # Mettre à jour le combo
-        self.platform_combo.clear()
-        self.platform_combo.addItem(tr("history.all"), "")
-
-        for platform in sorted(platforms):
-            self.platform_combo.addItem(platform, platform)
+    def _update_platforms(self, prompts):
+        """
+        Ajoute les plateformes d'une page à la liste des plateformes disponibles
 
-        # Restaurer la sélection si possible
-        if current_platform:
-            index = self.platform_combo.findData(current_platform)
-            if index >= 0:
-                self.platform_combo.setCurrentIndex(index)
+        Args:
+            prompts (list): Lignes PromptRow de la page
+        """
+        # Les plateformes connues restent (pas de clear : la sélection et le filtre sont conservés)
+        for platform in sorted({prompt.platform for prompt in prompts if prompt.platform}):
+            if self.platform_combo.findData(platform) < 0:
+                self.platform_combo.addItem(platform, platform)
 
     def _on_filter_changed(self):
         """Gère le changement des filtres"""
@@ -0,0 +1,89 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module chargé au premier accès à l'un de ses attributs
+
+    Remplace un import de premier niveau coûteux (cv2, pytesseract, pyautogui...) :
+    l'import réel n'a lieu qu'au premier usage, de sorte que le démarrage et les
+    modules qui n'utilisent pas la dépendance n'en paient pas le coût. Une dépendance
+    absente lève ImportError au premier usage, et non plus à l'import du module appelant.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+        object.__setattr__(self, '_lazy_module', None)
+
+    def _load(self):
+        """Importe le module réel (une seule fois, y compris entre threads)"""
+        module = object.__getattribute__(self, '_lazy_module')
+        if module is None:
+            with object.__getattribute__(self, '_lazy_lock'):
+                module = object.__getattribute__(self, '_lazy_module')
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    object.__setattr__(self, '_lazy_module', module)
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        # Les réglages de module (pyautogui.FAILSAFE...) s'appliquent au module réel
+        setattr(self._load(), attribute, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "chargé" if object.__getattribute__(self, '_lazy_module') is not None else "différé"
+        return f"<module paresseux '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Retourne un module dont l'import est différé jusqu'à son premier usage
+
+    Si le module est déjà importé, il est retourné tel quel.
+
+    Args:
+        name (str): Nom complet du module (ex: 'cv2', 'pyautogui')
+
+    Returns:
+        module: Module réel ou LazyModule
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    """Indique si un module (éventuellement paresseux) a été réellement importé"""
+    if isinstance(module, LazyModule):
+        return object.__getattribute__(module, '_lazy_module') is not None
+    return True
+
+
+def is_available(name):
+    """
+    Indique si un module est installé, sans l'importer
+
+    Args:
+        name (str): Nom complet du module
+
+    Returns:
+        bool: True si le module peut être importé
+    """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False